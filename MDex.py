@@ -2,24 +2,89 @@
 import os
 import sys
 import requests
-from fuzzywuzzy import fuzz
 import concurrent.futures
-from tqdm import tqdm
 import time
+import threading
+import queue
 import argparse
-from PIL import Image
-from fpdf import FPDF
-import inquirer
+# fuzzywuzzy, tqdm, PIL, fpdf, inquirer, yaml, asyncio and aiohttp are imported
+# where their stage runs, so scripted runs start without loading them.
+asyncio = aiohttp = None  # set by import_async_engine() when --engine async is selected
 import traceback
+import functools
+import json
+import io
+import inspect
+import heapq
+import bisect
+import collections
+import random
+import signal
+import multiprocessing
+from email.utils import parsedate_to_datetime
+import sqlite3
+import hashlib
+import html
+import zlib
+import zipfile
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlsplit, urlencode
 
 # --- Global Configurations ---
 API_BASE = "https://api.mangadex.org"
 DOWNLOAD_BASE_DIR = 'Downloads'
 MAX_RETRIES = 3
 MAX_THREADS = 4
-CHAPTER_DOWNLOAD_DELAY = 0.5
+MAX_THREADS_PER_HOST = 4
+ASYNC_MAX_REQUESTS = 64          # --max-threads default for --engine async (requests in flight)
+ASYNC_MAX_REQUESTS_PER_HOST = 16  # --per-host-threads default for --engine async
+API_RATE_LIMIT = 5.0          # requests/second to the API host
+API_BURST = 5
+AT_HOME_RATE_LIMIT = 40 / 60.0  # /at-home/server is limited separately (40/minute)
+AT_HOME_BURST = 40
+IMAGE_RATE_LIMIT = None       # requests/second per image host (None: only held back after a 429/Retry-After)
+IMAGE_BURST = 40
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 30.0
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "mdex")
+CACHE_TTL_SEARCH = 7 * 24 * 3600  # manga search results
+CACHE_TTL_CHAPTERS = 10 * 60      # chapter lists
+CACHE_TTL_AT_HOME = 5 * 60        # at-home baseUrls stay valid for ~15 minutes
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+CACHE_MAX_AGE = 30 * 24 * 3600
+PAGE_STORE_MAX_BYTES = 2 * 1024 * 1024 * 1024  # --page-store size cap (least recently used pages are evicted)
+TITLE_INDEX_MIN_SCORE = 90  # fuzzy score (0-100) a title index match needs with --fuzzy-title-index
+TITLE_MATCH_CELLS = 32 * 1024 * 1024  # scores computed per rapidfuzz cdist call (one byte each)
 CHAPTERS_PER_BATCH = 100
+CHAPTER_PAGE_WORKERS = 4
 ASSUMED_DPI = 72
+PROBE_HEAD_BYTES = 64 * 1024
+SYNC_STATE_FILENAME = ".mdex_sync.json"
+SYNC_OVERLAP = 15 * 60  # re-query this many seconds before the last sync to absorb clock skew
+WATCH_INTERVAL = 10 * 60  # --watch: seconds between checks of the watched series
+WATCH_FEED_INTERVAL = 6 * 3600  # --watch: poll every feed at least this often, to catch edited chapters
+METRICS_SAMPLES = 10000  # durations kept per stage for the report percentiles (totals count every call)
+RESOLVE_WORKERS = 1
+FETCH_WORKERS = 2
+PDF_WORKERS = min(8, os.cpu_count() or 1)
+PIPELINE_QUEUE_SIZE = 2
+SERIES_WORKERS = 2
+PAGE_MEMORY_WINDOW = 300
+PDF_PAGE_SIZE_PT = (595.28, 841.89)  # A4 portrait, FPDF's default page format
+TRANSFORM_WORKERS = PDF_WORKERS
+AUTO_SAVER_BELOW_BPS = 256 * 1024  # --quality auto: use data-saver pages when downloads run slower than this
+THROUGHPUT_SMOOTHING = 0.2
+BACKGROUND_PRIORITY = 1 << 32  # added to the scheduler priority of background (--quality preview) downloads
+NODE_HEALTH_SMOOTHING = 0.3
+NODE_MIN_SAMPLES = 4             # requests to a node before its error rate/latency can mark it degraded
+NODE_MAX_ERROR_RATE = 0.5
+NODE_MAX_CONSECUTIVE_ERRORS = 3
+NODE_SLOW_SECONDS = 10.0         # smoothed time per page above which a node counts as degraded
+NODE_FAILOVERS = 2               # image server re-resolutions allowed per chapter
+AT_HOME_REPORT_URL = "https://api.mangadex.network/report"
+TRANSFORM_QUALITY = 85
+GRAYSCALE_SAMPLE_SIZE = 64  # pages are shrunk to this many pixels per side before checking for colour
+GRAYSCALE_TOLERANCE = 12    # max channel spread still treated as grey (absorbs JPEG colour noise)
 
 # --- Language Data ---
 LANGUAGE_CHOICES = [
@@ -38,11 +103,16 @@ STRINGS = {
         "deleting_images": "🗑️ Removendo imagens originais para o Capítulo {}...",
         "delete_img_error": "   ⚠️ Erro ao remover imagem {}: {}",
         "delete_dir_error": "   ⚠️ Erro ao remover diretório {}: {}",
-        "download_summary_title": "\n--- Resumo da Criação de PDF ---", # Title updated
-        "summary_pdf_created": " PDF Criados: {}",             # New/Renamed
-        "summary_pdf_failed": " Falha na Criação de PDF: {}", # New/Renamed
+        "download_summary_title": "\n--- Resumo da Criação de {} ---", # Title updated
+        "summary_created": " Arquivos {} Criados: {}",        # New/Renamed
+        "summary_failed": " Falha na Criação de {}: {}",      # New/Renamed
         "summary_skipped": " Capítulos Ignorados: {}",       # New key
         "summary_footer": "--------------------------------\n", # Adjusted length
+        "batch_summary_title": "\n--- Resumo do Lote ---",
+        "batch_series_line": " • {}: {} criado(s), {} falha(s), {} ignorado(s)",
+        "batch_series_failed": " • {}: ⚠️ não processado",
+        "batch_series_failed_count": " Séries Não Processadas: {}",
+        "batch_duplicate_series": "⚠️ {}: mesma série que {}; processada uma vez.",
         # ... (restante das strings) ...
          "select_language_prompt": "🌍 Selecione o idioma para download:",
         "selected_language": "Idioma selecionado: {}",
@@ -58,11 +128,24 @@ STRINGS = {
         "unexpected_chapter_error": "Erro inesperado ao buscar capítulos: {}",
         "no_chapters_available": "⚠️ Nenhum capítulo disponível no idioma selecionado ({}).",
         "available_chapters": "\n📖 Capítulos Disponíveis:",
+        "streaming_chapters": "📖 {} capítulos disponíveis; baixando conforme a lista chega...",
+        "sync_delta": "🔄 Sincronização: {} capítulo(s) novo(s)/atualizado(s) desde {}.",
+        "sync_up_to_date": "✅ Já está atualizado.",
+        "watch_started": "👀 Acompanhando {} série(s), verificando a cada {} s. Ctrl+C para parar.",
+        "watch_new_chapters": "🆕 {}: {} capítulo(s) novo(s)/atualizado(s).",
+        "watch_stopped": "Acompanhamento encerrado.",
+        "bundle_adding_chapter": "📄 Adicionando o Capítulo {} ao volume...",
+        "bundle_created": "✅ PDF do volume criado com sucesso: {} ({} capítulos)",
+        "bundle_error": "⚠️ Erro ao criar o PDF do volume {}: {}",
+        "bundle_bookmark": "Capítulo {}",
+        "archive_created": "✅ Arquivo criado com sucesso: {}",
+        "archive_error": "⚠️ Erro ao criar {} para o Capítulo {}: {}",
         "chapter_prefix": "• Capítulo {}",
-        "chapters_range_prompt": "Digite os capítulos (ex: 1 5 10.5), 'all'/'todos', ou intervalo (ex: 20-25):",
+        "chapters_range_prompt": "Digite os capítulos (ex: 1 5 10.5), 'all'/'todos', intervalo (ex: 20-25), últimos:N, desde:AAAA-MM-DD ou vol:N:",
         "chapter_selection_empty_error": "⚠️ A seleção de capítulos não pode estar vazia.",
         "invalid_chapter_range_error": "⚠️ Intervalo de capítulos inválido. Números >= 0 e início <= fim.",
         "no_chapters_in_range": "⚠️ Nenhum capítulo encontrado no intervalo {}-{}.",
+        "no_chapters_for_selector": "⚠️ Nenhum capítulo corresponde a {}.",
         "invalid_chapter_number_format_range": "⚠️ Formato de número de capítulo inválido no intervalo.",
         "invalid_range_format": "⚠️ Formato de intervalo inválido ({}) Use XX-YY.",
         "invalid_chapter_number_provided": "⚠️ Entrada(s) de capítulo inválida(s): {}. Digite números >= 0, 'all'/'todos' ou intervalos.",
@@ -83,8 +166,19 @@ STRINGS = {
         "empty_dir_removed": "   Diretório vazio removido: {}",
         "process_chapter_failed": "⚠️ Falha ao processar o Capítulo {}.",
         "no_new_images": "Nenhuma imagem nova para baixar neste capítulo (já existem?).",
+        "page_store_incomplete": "⚠️ Capítulo {}: {} página(s) fora do armazenamento de páginas e nenhum servidor de imagens disponível.",
+        "group_filtered": "{} capítulo(s) excluído(s) pelos filtros de grupo.",
+        "duplicates_skipped": "{} upload(s) duplicado(s) ignorado(s) (política: {}).",
+        "offline_not_cached": "Modo offline: {} não está no cache.",
+        "title_index_hit": "📚 Mangá encontrado no índice de títulos: {}",
+        "title_index_batch": "📇 {} de {} séries encontradas no índice de títulos.",
+        "title_index_list": "📇 Lista {}: {} mangá(s) adicionados ao índice de títulos.",
         "no_images_downloaded": "⚠️ Nenhuma imagem baixada para o Capítulo {}.",
         "overall_download_progress": "Progresso Geral do Processamento", # Renamed progress bar title slightly
+        "quality_upgrade_progress": "Baixando originais",
+        "quality_upgraded": "⬆️ {} capítulo(s) atualizado(s) para a qualidade original.",
+        "node_failover": "🔁 Servidor de imagens {} degradado; trocando para {}.",
+        "chapter_reuploaded": "⚠️ Capítulo {}: reenviado com outro número de páginas durante o download; ignorado por enquanto.",
         "waiting_next_chapter": "⏳ Aguardando {} segundos...",
         "continue_prompt": "\nO que você gostaria de fazer agora?",
         "search_again_option": "Buscar outro mangá",
@@ -101,12 +195,21 @@ STRINGS = {
     },
     "en": {
         # --- Full English Strings with updated summary keys ---
-        "download_summary_title": "\n--- PDF Creation Summary ---",
-        "summary_pdf_created": " PDFs Created: {}",
-        "summary_pdf_failed": " PDF Creation Failed: {}",
+        "download_summary_title": "\n--- {} Creation Summary ---",
+        "summary_created": " {} Files Created: {}",
+        "summary_failed": " {} Creation Failed: {}",
         "summary_skipped": " Chapters Skipped: {}",
         "summary_footer": "--------------------------\n",
+        "batch_summary_title": "\n--- Batch Summary ---",
+        "batch_series_line": " • {}: {} created, {} failed, {} skipped",
+        "batch_series_failed": " • {}: ⚠️ not processed",
+        "batch_series_failed_count": " Series Not Processed: {}",
+        "batch_duplicate_series": "⚠️ {}: same series as {}; processed once.",
         "overall_download_progress": "Overall Processing Progress",
+        "quality_upgrade_progress": "Fetching originals",
+        "quality_upgraded": "⬆️ {} chapter(s) upgraded to original quality.",
+        "node_failover": "🔁 Image server {} degraded; switching to {}.",
+        "chapter_reuploaded": "⚠️ Chapter {}: re-uploaded with a different page count during the download; skipped for now.",
         # ... (rest of English strings) ...
         "select_language_prompt": "🌍 Select the download language:",
         "selected_language": "Selected language: {}",
@@ -122,11 +225,24 @@ STRINGS = {
         "unexpected_chapter_error": "Unexpected error fetching chapters: {}",
         "no_chapters_available": "⚠️ No chapters available in the selected language ({}).",
         "available_chapters": "\n📖 Available Chapters:",
+        "streaming_chapters": "📖 {} chapters available; downloading as the list arrives...",
+        "sync_delta": "🔄 Sync: {} new/updated chapter(s) since {}.",
+        "sync_up_to_date": "✅ Already up to date.",
+        "watch_started": "👀 Watching {} series, checking every {} s. Press Ctrl+C to stop.",
+        "watch_new_chapters": "🆕 {}: {} new/updated chapter(s).",
+        "watch_stopped": "Stopped watching.",
+        "bundle_adding_chapter": "📄 Adding Chapter {} to the bundle...",
+        "bundle_created": "✅ Bundle PDF created successfully: {} ({} chapters)",
+        "bundle_error": "⚠️ Error creating bundle PDF {}: {}",
+        "bundle_bookmark": "Chapter {}",
+        "archive_created": "✅ File created successfully: {}",
+        "archive_error": "⚠️ Error creating {} for Chapter {}: {}",
         "chapter_prefix": "• Chapter {}",
-        "chapters_range_prompt": "Enter chapters (e.g., 1 5 10.5), 'all'/'todos', or range (e.g., 20-25):",
+        "chapters_range_prompt": "Enter chapters (e.g., 1 5 10.5), 'all'/'todos', range (e.g., 20-25), latest:N, since:YYYY-MM-DD or vol:N:",
         "chapter_selection_empty_error": "⚠️ Chapter selection cannot be empty.",
         "invalid_chapter_range_error": "⚠️ Invalid chapter range. Numbers >= 0 and start <= end.",
         "no_chapters_in_range": "⚠️ No chapters found in range {}-{}.",
+        "no_chapters_for_selector": "⚠️ No chapters match {}.",
         "invalid_chapter_number_format_range": "⚠️ Invalid chapter number format in range.",
         "invalid_range_format": "⚠️ Invalid range format ({}). Use XX-YY.",
         "invalid_chapter_number_provided": "⚠️ Invalid chapter input(s): {}. Enter numbers >= 0, 'all'/'todos', or ranges.",
@@ -147,6 +263,13 @@ STRINGS = {
         "empty_dir_removed": "   Empty directory removed: {}",
         "process_chapter_failed": "⚠️ Failed to process Chapter {}.",
         "no_new_images": "No new images to download (already exist?).",
+        "page_store_incomplete": "⚠️ Chapter {}: {} page(s) missing from the page store and no image server available.",
+        "group_filtered": "{} chapter(s) excluded by group filters.",
+        "duplicates_skipped": "{} duplicate upload(s) skipped (policy: {}).",
+        "offline_not_cached": "Offline mode: {} is not cached.",
+        "title_index_hit": "📚 Manga found in the title index: {}",
+        "title_index_batch": "📇 {} of {} series resolved from the title index.",
+        "title_index_list": "📇 List {}: {} manga added to the title index.",
         "no_images_downloaded": "⚠️ No images downloaded for Chapter {}.",
         "creating_pdf": "📄 Creating PDF for Chapter {}...",
         "pdf_creation_success": "✅ PDF created successfully: {}",
@@ -170,12 +293,21 @@ STRINGS = {
     },
     "es": {
         # --- Full Spanish Strings with updated summary keys ---
-        "download_summary_title": "\n--- Resumen de Creación de PDF ---",
-        "summary_pdf_created": " PDFs Creados: {}",
-        "summary_pdf_failed": " Fallo Creación PDF: {}",
+        "download_summary_title": "\n--- Resumen de Creación de {} ---",
+        "summary_created": " Archivos {} Creados: {}",
+        "summary_failed": " Fallo Creación {}: {}",
         "summary_skipped": " Capítulos Omitidos: {}",
         "summary_footer": "----------------------------\n",
+        "batch_summary_title": "\n--- Resumen del Lote ---",
+        "batch_series_line": " • {}: {} creado(s), {} fallido(s), {} omitido(s)",
+        "batch_series_failed": " • {}: ⚠️ no procesado",
+        "batch_series_failed_count": " Series No Procesadas: {}",
+        "batch_duplicate_series": "⚠️ {}: misma serie que {}; procesada una vez.",
         "overall_download_progress": "Progreso General Procesamiento",
+        "quality_upgrade_progress": "Descargando originales",
+        "quality_upgraded": "⬆️ {} capítulo(s) actualizado(s) a la calidad original.",
+        "node_failover": "🔁 Servidor de imágenes {} degradado; cambiando a {}.",
+        "chapter_reuploaded": "⚠️ Capítulo {}: resubido con otro número de páginas durante la descarga; omitido por ahora.",
         # ... (rest of Spanish strings) ...
          "select_language_prompt": "🌍 Seleccione el idioma para descargar:",
         "selected_language": "Idioma seleccionado: {}",
@@ -191,11 +323,24 @@ STRINGS = {
         "unexpected_chapter_error": "Error inesperado al buscar capítulos: {}",
         "no_chapters_available": "⚠️ No hay capítulos disponibles en el idioma seleccionado ({}).",
         "available_chapters": "\n📖 Capítulos disponibles:",
+        "streaming_chapters": "📖 {} capítulos disponibles; descargando a medida que llega la lista...",
+        "sync_delta": "🔄 Sincronización: {} capítulo(s) nuevo(s)/actualizado(s) desde {}.",
+        "sync_up_to_date": "✅ Ya está actualizado.",
+        "watch_started": "👀 Siguiendo {} serie(s), comprobando cada {} s. Ctrl+C para detener.",
+        "watch_new_chapters": "🆕 {}: {} capítulo(s) nuevo(s)/actualizado(s).",
+        "watch_stopped": "Seguimiento detenido.",
+        "bundle_adding_chapter": "📄 Añadiendo el Capítulo {} al volumen...",
+        "bundle_created": "✅ PDF del volumen creado con éxito: {} ({} capítulos)",
+        "bundle_error": "⚠️ Error al crear el PDF del volumen {}: {}",
+        "bundle_bookmark": "Capítulo {}",
+        "archive_created": "✅ Archivo creado con éxito: {}",
+        "archive_error": "⚠️ Error al crear {} para el Capítulo {}: {}",
         "chapter_prefix": "• Capítulo {}",
-        "chapters_range_prompt": "Ingrese los capítulos (ej: 1 5 10.5), 'all'/'todos', o rango (ej: 20-25):",
+        "chapters_range_prompt": "Ingrese los capítulos (ej: 1 5 10.5), 'all'/'todos', rango (ej: 20-25), últimos:N, desde:AAAA-MM-DD o vol:N:",
         "chapter_selection_empty_error": "⚠️ La selección de capítulos no puede estar vacía.",
         "invalid_chapter_range_error": "⚠️ Rango de capítulos inválido. Números >= 0 y inicio <= fin.",
         "no_chapters_in_range": "⚠️ No se encontraron capítulos en el rango {}-{}.",
+        "no_chapters_for_selector": "⚠️ Ningún capítulo coincide con {}.",
         "invalid_chapter_number_format_range": "⚠️ Formato de número de capítulo inválido en el rango.",
         "invalid_range_format": "⚠️ Formato de rango inválido ({}). Use XX-YY.",
         "invalid_chapter_number_provided": "⚠️ Entrada(s) de capítulo(s) inválida(s): {}. Ingrese números >= 0, 'all'/'todos' o rangos.",
@@ -216,6 +361,13 @@ STRINGS = {
         "empty_dir_removed": "   Directorio vacío eliminado: {}",
         "process_chapter_failed": "⚠️ Falló el procesamiento del Capítulo {}.",
         "no_new_images": "No hay imágenes nuevas para descargar en este capítulo (¿ya existen?).",
+        "page_store_incomplete": "⚠️ Capítulo {}: {} página(s) fuera del almacén de páginas y ningún servidor de imágenes disponible.",
+        "group_filtered": "{} capítulo(s) excluido(s) por los filtros de grupo.",
+        "duplicates_skipped": "{} subida(s) duplicada(s) omitida(s) (política: {}).",
+        "offline_not_cached": "Modo sin conexión: {} no está en la caché.",
+        "title_index_hit": "📚 Manga encontrado en el índice de títulos: {}",
+        "title_index_batch": "📇 {} de {} series encontradas en el índice de títulos.",
+        "title_index_list": "📇 Lista {}: {} manga(s) añadidos al índice de títulos.",
         "no_images_downloaded": "⚠️ No se descargaron imágenes para el Capítulo {}.",
         "creating_pdf": "📄 Creando PDF para el Capítulo {}...",
         "pdf_creation_success": "✅ PDF creado con éxito: {}",
@@ -246,9 +398,839 @@ selected_strings = STRINGS["pt-br"]
 #  download_chapter_images, is_valid_chapter_number_string, select_chapters_by_range,
 #  parse_chapter_selection - unchanged from previous version)
 
+# --- Progress Bars ---
+quiet = False  # --quiet: no progress bars (tqdm is then never imported)
+
+class _NoProgress:
+    """Stands in for a tqdm bar under --quiet."""
+
+    def __init__(self, total=None, **kwargs):
+        self.total = total
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def update(self, n=1):
+        pass
+
+    def refresh(self):
+        pass
+
+def progress_bar(**kwargs):
+    """Returns a tqdm bar (imported on first use), or a no-op stand-in under --quiet."""
+    if quiet:
+        return _NoProgress(**kwargs)
+    from tqdm import tqdm
+    return tqdm(**kwargs)
+
+# --- Run Metrics ---
+class RunMetrics:
+    """Thread-safe per-stage timings, bytes, retries and error classes for --report/--prometheus."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.stages = {}
+        self.counters = {}
+
+    def _stage(self, stage):
+        return self.stages.setdefault(stage, {"calls": 0, "failures": 0, "seconds_total": 0.0,
+                                              "seconds": collections.deque(maxlen=METRICS_SAMPLES), "bytes": 0,
+                                              "retries": 0, "errors": {}})
+
+    def record(self, stage, seconds, size=0, failed=False, error=None):
+        """Records one finished call of stage."""
+        with self.lock:
+            stats = self._stage(stage)
+            stats["calls"] += 1
+            stats["seconds_total"] += seconds
+            stats["seconds"].append(seconds)
+            stats["bytes"] += size or 0
+            if failed or error:
+                stats["failures"] += 1
+            if error:
+                stats["errors"][error] = stats["errors"].get(error, 0) + 1
+
+    def attempt_error(self, stage, error, retried=True):
+        """Records a failed attempt inside a call, by error class, and whether it is retried."""
+        with self.lock:
+            stats = self._stage(stage)
+            if retried:
+                stats["retries"] += 1
+            stats["errors"][error] = stats["errors"].get(error, 0) + 1
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def snapshot(self):
+        """Returns the run report as a JSON-ready dict."""
+        finished = time.time()
+        with self.lock:
+            stages = {}
+            for stage, stats in sorted(self.stages.items()):
+                seconds = sorted(round(value, 6) for value in stats["seconds"])
+                stages[stage] = {
+                    "calls": stats["calls"], "failures": stats["failures"], "seconds_total": round(stats["seconds_total"], 6),
+                    "seconds_p50": percentile(seconds, 50), "seconds_p95": percentile(seconds, 95),
+                    "seconds_p99": percentile(seconds, 99), "seconds_max": seconds[-1] if seconds else None,
+                    "bytes": stats["bytes"], "retries": stats["retries"], "errors": dict(stats["errors"]),
+                }
+            counters = dict(self.counters)
+        return {"started_at": datetime.fromtimestamp(self.started, timezone.utc).isoformat(),
+                "finished_at": datetime.fromtimestamp(finished, timezone.utc).isoformat(),
+                "wall_seconds": round(finished - self.started, 6), "argv": sys.argv[1:],
+                "counters": {name: round(value, 6) for name, value in counters.items()}, "stages": stages}
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list (None when empty)."""
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))]
+
+def http_error_class(exc, status_code=None):
+    """Short error class for metrics: 'HTTP 503', 'Timeout', 'ConnectionError', ..."""
+    return f"HTTP {status_code}" if status_code and status_code >= 400 else type(exc).__name__
+
+def timed_stage(stage, failed=None, size=None):
+    """Decorator recording each call's duration under stage in run_metrics.
+
+    failed(result) marks a call as failed (default: result is None or False),
+    size(result, *args) gives the bytes it handled; exceptions are recorded
+    by class and re-raised. Works for plain and async functions.
+    """
+    def finish(started, result, args):
+        is_failed = failed(result) if failed else result is None or result is False
+        run_metrics.record(stage, time.perf_counter() - started,
+                           size(result, *args) if size and not is_failed else 0, failed=is_failed)
+
+    def wrap(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def timed_async(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    result = await func(*args, **kwargs)
+                except Exception as e:
+                    run_metrics.record(stage, time.perf_counter() - started, error=type(e).__name__)
+                    raise
+                finish(started, result, args)
+                return result
+            return timed_async
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                run_metrics.record(stage, time.perf_counter() - started, error=type(e).__name__)
+                raise
+            finish(started, result, args)
+            return result
+        return timed
+    return wrap
+
+def downloaded_size(result, img_url, img_path, session):
+    return len(result) if isinstance(result, bytes) else os.path.getsize(img_path)
+
+def write_run_report(path):
+    """Writes the run report (per-stage timings, bytes, retries, errors, counters) as JSON."""
+    tmp_path = path + ".part"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(run_metrics.snapshot(), f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
+
+def prometheus_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def write_prometheus_textfile(path):
+    """Writes the run's metrics in the Prometheus text format (for node_exporter's textfile collector)."""
+    report = run_metrics.snapshot()
+    lines = []
+
+    def metric(name, help_text, samples):
+        lines.append(f"# HELP mdex_last_run_{name} {help_text}")
+        lines.append(f"# TYPE mdex_last_run_{name} gauge")
+        for labels, value in samples:
+            label_text = ",".join(f'{key}="{prometheus_label(val)}"' for key, val in labels.items())
+            lines.append(f"mdex_last_run_{name}{{{label_text}}} {value}" if label_text else
+                         f"mdex_last_run_{name} {value}")
+
+    stages = report["stages"]
+    metric("timestamp_seconds", "Time the last run finished.", [({}, round(time.time(), 3))])
+    metric("wall_seconds", "Duration of the last run.", [({}, report["wall_seconds"])])
+    metric("stage_calls", "Calls per stage.", [({"stage": s}, v["calls"]) for s, v in stages.items()])
+    metric("stage_failures", "Failed calls per stage.", [({"stage": s}, v["failures"]) for s, v in stages.items()])
+    metric("stage_seconds", "Time spent per stage (summed over concurrent calls).",
+           [({"stage": s}, v["seconds_total"]) for s, v in stages.items()])
+    metric("stage_duration_seconds", "Per-call duration quantiles per stage.",
+           [({"stage": s, "quantile": q}, v[key]) for s, v in stages.items()
+            for q, key in (("0.5", "seconds_p50"), ("0.95", "seconds_p95"), ("0.99", "seconds_p99"))
+            if v[key] is not None])
+    metric("stage_bytes", "Bytes handled per stage.", [({"stage": s}, v["bytes"]) for s, v in stages.items()])
+    metric("stage_retries", "Retried attempts per stage.", [({"stage": s}, v["retries"]) for s, v in stages.items()])
+    metric("stage_errors", "Errors per stage and error class.",
+           [({"stage": s, "error": e}, n) for s, v in stages.items() for e, n in v["errors"].items()])
+    metric("counter", "Run counters.", [({"name": k}, v) for k, v in report["counters"].items()])
+
+    tmp_path = path + ".part"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(tmp_path, path)
+
+run_metrics = RunMetrics()
+
+# --- Rate Limiting ---
+class RateLimiter:
+    """Token bucket that also follows the server's rate-limit headers.
+
+    reserve() books a slot and returns how long the caller must wait before
+    sending, so the same limiter serves threads (time.sleep) and the async
+    engine (asyncio.sleep). With rate None there is no bucket and only the
+    server's Retry-After holds requests back.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        """Takes one token and returns the seconds to wait before using it."""
+        with self.lock:
+            now = time.monotonic()
+            if self.rate is None:
+                return max(0.0, self.blocked_until - now)
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            token_wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(token_wait, self.blocked_until - now)
+
+    def observe(self, status_code, headers):
+        """Adjusts the bucket from X-RateLimit-Remaining / Retry-After on a response."""
+        retry_after = parse_retry_after(headers)
+        remaining = headers.get("X-RateLimit-Remaining")
+        with self.lock:
+            if remaining is not None:
+                try:
+                    self.tokens = min(self.tokens, float(remaining))
+                except ValueError:
+                    pass
+            if retry_after is not None and (status_code == 429 or remaining == "0"):
+                self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+
+def parse_retry_after(headers):
+    """Returns the server-requested wait in seconds, or None."""
+    value = headers.get("Retry-After")
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    value = headers.get("X-RateLimit-Retry-After")  # MangaDex: unix timestamp
+    if value:
+        try:
+            return max(0.0, float(value) - time.time())
+        except ValueError:
+            pass
+    return None
+
+def backoff_delay(attempt):
+    """Jittered exponential backoff for retry number `attempt` (0-based)."""
+    delay = min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt))
+    return random.uniform(delay / 2, delay)
+
+_rate_limiters = {}
+_rate_limiters_lock = threading.Lock()
+
+def _rate_limiter(key, rate, burst):
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(key)
+        if limiter is None:
+            limiter = _rate_limiters[key] = RateLimiter(rate, burst)
+        return limiter
+
+def rate_limiters_for(url):
+    """Returns the limiters a request counts against, most specific first."""
+    parts = urlsplit(url)
+    if parts.path.startswith(("/data/", "/data-saver/")):
+        return [_rate_limiter(("image", parts.netloc), IMAGE_RATE_LIMIT, IMAGE_BURST)]
+    if parts.netloc != urlsplit(API_BASE).netloc:
+        return [_rate_limiter(("image", parts.netloc), IMAGE_RATE_LIMIT, IMAGE_BURST)]
+    api = _rate_limiter(("api", parts.netloc), API_RATE_LIMIT, API_BURST)
+    if parts.path.startswith("/at-home/"):
+        return [_rate_limiter(("at-home", parts.netloc), AT_HOME_RATE_LIMIT, AT_HOME_BURST), api]
+    return [api]
+
+def rate_limit_wait(url):
+    """Books a slot on every limiter for url and returns the longest wait."""
+    return max(limiter.reserve() for limiter in rate_limiters_for(url))
+
+def rate_limit_observe(url, status_code, headers):
+    rate_limiters_for(url)[0].observe(status_code, headers)
+
+class ThroughputMeter:
+    """Smoothed per-request image download speed in bytes/second (None until the first sample)."""
+
+    def __init__(self, smoothing=THROUGHPUT_SMOOTHING):
+        self.smoothing = smoothing
+        self.rate = None
+        self.lock = threading.Lock()
+
+    def record(self, size, seconds):
+        if size <= 0 or seconds <= 0:
+            return
+        sample = size / seconds
+        with self.lock:
+            self.rate = sample if self.rate is None else self.rate + self.smoothing * (sample - self.rate)
+
+image_throughput = ThroughputMeter()
+
+# --- MangaDex@Home Node Health ---
+class AtHomeReporter:
+    """Sends page download results to the MangaDex@Home report endpoint from a background thread."""
+
+    def __init__(self, url):
+        self.url = url
+        self._queue = queue.Queue(maxsize=1000)
+        self._thread = threading.Thread(target=self._run, name="mdex-at-home-report", daemon=True)
+        self._thread.start()
+
+    def report(self, img_url, success, size, seconds, cached):
+        if (urlsplit(img_url).hostname or "").endswith("mangadex.org"):
+            return  # only MangaDex@Home nodes are reported
+        try:
+            self._queue.put_nowait({"url": img_url, "success": success, "cached": cached, "bytes": size,
+                                    "duration": int(seconds * 1000)})
+        except queue.Full:
+            pass  # reports are best-effort
+
+    def _run(self):
+        session = requests.Session()
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            try:
+                session.post(self.url, json=item, timeout=10)
+            except requests.RequestException:
+                pass
+        session.close()
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join(timeout=10)
+
+at_home_reporter = None
+
+class NodeHealth:
+    """Per image node (baseUrl host) smoothed latency and error rate, used to fail over degraded nodes."""
+
+    def __init__(self):
+        self.nodes = {}
+        self.lock = threading.Lock()
+
+    def record(self, img_url, success, seconds, size=0, cached=False):
+        node = urlsplit(img_url).netloc
+        with self.lock:
+            stats = self.nodes.setdefault(node, {"requests": 0, "error_rate": 0.0, "consecutive_errors": 0,
+                                                 "latency": None})
+            stats["requests"] += 1
+            stats["error_rate"] += NODE_HEALTH_SMOOTHING * ((0.0 if success else 1.0) - stats["error_rate"])
+            if success:
+                stats["consecutive_errors"] = 0
+                latency = stats["latency"]
+                stats["latency"] = seconds if latency is None else latency + NODE_HEALTH_SMOOTHING * (seconds - latency)
+            else:
+                stats["consecutive_errors"] += 1
+        if at_home_reporter is not None:
+            at_home_reporter.report(img_url, success, size, seconds, cached)
+
+    def degraded(self, base_url):
+        with self.lock:
+            stats = self.nodes.get(urlsplit(base_url).netloc)
+            if stats is None:
+                return False
+            if stats["consecutive_errors"] >= NODE_MAX_CONSECUTIVE_ERRORS:
+                return True
+            return stats["requests"] >= NODE_MIN_SAMPLES and (
+                stats["error_rate"] > NODE_MAX_ERROR_RATE or (stats["latency"] or 0) > NODE_SLOW_SECONDS)
+
+node_health = NodeHealth()
+
+# --- Metadata Cache ---
+class CachedResponse:
+    """Response served from the metadata cache; quacks like requests.Response for api_get callers."""
+
+    def __init__(self, content, headers=None):
+        self.status_code = 200
+        self.headers = headers or {}
+        self.content = content
+        self.from_cache = True
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return json.loads(self.content)
+
+def cache_key(url, params=None):
+    return url + "?" + urlencode(sorted(_flatten_params(params)))
+
+def server_max_age(headers):
+    """Returns the freshness lifetime the server allows (Cache-Control/Expires), or None."""
+    cache_control = (headers.get("Cache-Control") or "").lower()
+    if "no-store" in cache_control or "no-cache" in cache_control:
+        return 0.0
+    for directive in cache_control.split(","):
+        name, _, value = directive.strip().partition("=")
+        if name == "max-age":
+            try:
+                return max(0.0, float(value))
+            except ValueError:
+                pass
+    expires = headers.get("Expires")
+    if expires:
+        try:
+            return max(0.0, parsedate_to_datetime(expires).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return 0.0
+    return None
+
+class MetadataCache:
+    """SQLite store of API responses keyed by URL + params, each with its own TTL.
+
+    Entries past their TTL are not served, but their ETag/Last-Modified are
+    kept so the next request can be revalidated with a conditional GET.
+    Least recently used entries are evicted beyond max_bytes, and anything
+    unused for max_age seconds is dropped.
+    """
+
+    def __init__(self, path, max_bytes=CACHE_MAX_BYTES, max_age=CACHE_MAX_AGE):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("""CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY, body BLOB NOT NULL, etag TEXT, last_modified TEXT,
+            expires_at REAL NOT NULL, last_access REAL NOT NULL, size INTEGER NOT NULL)""")
+        self.db.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+        self.db.commit()
+        self.total = 0
+        self.evict()
+
+    def get(self, key):
+        """Returns (CachedResponse, fresh, validators) or None."""
+        with self.lock:
+            row = self.db.execute("SELECT body, etag, last_modified, expires_at FROM responses WHERE key = ?",
+                                  (key,)).fetchone()
+            if row is None:
+                return None
+            self.db.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+            self.db.commit()
+        body, etag, last_modified, expires_at = row
+        validators = {}
+        if etag: validators["If-None-Match"] = etag
+        if last_modified: validators["If-Modified-Since"] = last_modified
+        return CachedResponse(body), time.time() < expires_at, validators
+
+    def put(self, key, body, headers, ttl):
+        """Stores a response for ttl seconds (never past what the server allows)."""
+        server_ttl = server_max_age(headers)
+        if server_ttl is not None:
+            ttl = min(ttl, server_ttl)
+        now = time.time()
+        with self.lock:
+            replaced = self.db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self.db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                            (key, body, headers.get("ETag"), headers.get("Last-Modified"),
+                             now + ttl, now, len(body)))
+            self.total += len(body) - (replaced[0] if replaced else 0)
+            self._trim()
+            self.db.commit()
+
+    def refresh(self, key, headers, ttl):
+        """Extends a revalidated (304) entry."""
+        server_ttl = server_max_age(headers)
+        if server_ttl is not None:
+            ttl = min(ttl, server_ttl)
+        with self.lock:
+            self.db.execute("UPDATE responses SET expires_at = ? WHERE key = ?", (time.time() + ttl, key))
+            self.db.commit()
+
+    def _trim(self):
+        """Deletes least recently used entries until the cache fits max_bytes (caller holds the lock)."""
+        while self.total > self.max_bytes:
+            rows = self.db.execute("SELECT key, size FROM responses ORDER BY last_access LIMIT 64").fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                if self.total <= self.max_bytes:
+                    break
+                self.db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.total -= size
+
+    def evict(self):
+        """Drops entries unused for max_age, then least recently used ones beyond max_bytes."""
+        with self.lock:
+            self.db.execute("DELETE FROM responses WHERE last_access < ?", (time.time() - self.max_age,))
+            self.total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            self._trim()
+            self.db.commit()
+
+    def close(self):
+        with self.lock:
+            self.db.commit()
+            self.db.close()
+
+# --- Page Store ---
+class PageStore:
+    """Content-addressed store of downloaded pages, keyed by the at-home chapter hash + page filename.
+
+    Page bytes live once per SHA-256 under blobs/, so identical pages (credit
+    and scanlator pages shared between chapters) take space only once. An
+    SQLite index maps page keys to blobs and remembers each chapter's page
+    list, so stored chapters can be rebuilt without an at-home lookup.
+    Least recently used pages are evicted beyond max_bytes.
+    """
+
+    def __init__(self, path, max_bytes=PAGE_STORE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.join(path, "blobs"), exist_ok=True)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(os.path.join(path, "index.sqlite3"), check_same_thread=False)
+        self.db.execute("""CREATE TABLE IF NOT EXISTS pages (
+            key TEXT PRIMARY KEY, digest TEXT NOT NULL, last_access REAL NOT NULL)""")
+        self.db.execute("CREATE INDEX IF NOT EXISTS pages_digest ON pages (digest)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS blobs (digest TEXT PRIMARY KEY, size INTEGER NOT NULL)")
+        self.db.execute("""CREATE TABLE IF NOT EXISTS chapters (
+            chapter_id TEXT PRIMARY KEY, hash TEXT NOT NULL, files TEXT NOT NULL, saver_files TEXT NOT NULL)""")
+        self.db.commit()
+        self.total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+        self.evict()
+
+    @staticmethod
+    def page_key(hash_val, img_file):
+        return f"{hash_val}/{img_file}"
+
+    def _blob_path(self, digest):
+        return os.path.join(self.path, "blobs", digest[:2], digest)
+
+    def get(self, key):
+        """Returns the stored page bytes, or None."""
+        with self.lock:
+            row = self.db.execute("SELECT digest FROM pages WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self.db.execute("UPDATE pages SET last_access = ? WHERE key = ?", (time.time(), key))
+        try:
+            with open(self._blob_path(row[0]), "rb") as f:
+                return f.read()
+        except OSError:
+            with self.lock:  # blob removed behind our back: forget the page
+                self.db.execute("DELETE FROM pages WHERE key = ?", (key,))
+                self.db.commit()
+            return None
+
+    def has(self, keys):
+        """True if every key is stored."""
+        keys = list(keys)
+        with self.lock:
+            found = 0
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                found += self.db.execute(f"SELECT COUNT(*) FROM pages WHERE key IN ({','.join('?' * len(chunk))})",
+                                         chunk).fetchone()[0]
+        return found == len(keys)
+
+    def put(self, key, data):
+        """Stores page bytes under key, writing the blob only if its content is new."""
+        digest = hashlib.sha256(data).hexdigest()
+        blob_path = self._blob_path(digest)
+        with self.lock:
+            known = self.db.execute("SELECT 1 FROM blobs WHERE digest = ?", (digest,)).fetchone()
+        if not known or not os.path.exists(blob_path):
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            tmp_path = f"{blob_path}.{threading.get_ident()}.part"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, blob_path)
+        with self.lock:
+            if self.db.execute("INSERT OR IGNORE INTO blobs VALUES (?, ?)", (digest, len(data))).rowcount:
+                self.total += len(data)
+            self.db.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?)", (key, digest, time.time()))
+            self.db.commit()
+        if self.total > self.max_bytes:
+            self.evict()
+
+    def put_chapter(self, chapter_id, server_info):
+        """Remembers a chapter's hash and page lists (immutable for a given hash)."""
+        with self.lock:
+            self.db.execute("INSERT OR REPLACE INTO chapters VALUES (?, ?, ?, ?)",
+                            (chapter_id, server_info["hash"], json.dumps(server_info["files"]),
+                             json.dumps(server_info.get("saver_files") or [])))
+            self.db.commit()
+
+    def chapter(self, chapter_id):
+        """Returns a stored chapter as server info without a base_url, or None."""
+        with self.lock:
+            row = self.db.execute("SELECT hash, files, saver_files FROM chapters WHERE chapter_id = ?",
+                                  (chapter_id,)).fetchone()
+        if row is None:
+            return None
+        return {"base_url": None, "hash": row[0], "files": json.loads(row[1]), "saver_files": json.loads(row[2])}
+
+    def evict(self):
+        """Drops least recently used pages, and blobs no page refers to, until the store fits max_bytes."""
+        with self.lock:
+            if self.total <= self.max_bytes:
+                return
+            for key, digest in self.db.execute("SELECT key, digest FROM pages ORDER BY last_access").fetchall():
+                if self.total <= self.max_bytes:
+                    break
+                self.db.execute("DELETE FROM pages WHERE key = ?", (key,))
+                if self.db.execute("SELECT 1 FROM pages WHERE digest = ? LIMIT 1", (digest,)).fetchone():
+                    continue  # still shared with another page
+                size = self.db.execute("SELECT size FROM blobs WHERE digest = ?", (digest,)).fetchone()[0]
+                self.db.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+                try:
+                    os.remove(self._blob_path(digest))
+                except OSError:
+                    pass
+                self.total -= size
+            self.db.commit()
+
+    def close(self):
+        with self.lock:
+            self.db.commit()
+            self.db.close()
+
+# --- Title Index ---
+def normalize_title(title):
+    """Case-folds a title and collapses its whitespace, the form titles are indexed and matched in."""
+    return " ".join(title.casefold().split())
+
+def manga_titles(manga):
+    """Every title and alt title (in any language) of a /manga item."""
+    attributes = manga.get("attributes") or {}
+    titles = list((attributes.get("title") or {}).values())
+    for alt_title in attributes.get("altTitles") or []:
+        titles.extend(alt_title.values())
+    return [title for title in titles if title]
+
+def best_title_matches(queries, choices, min_score):
+    """For each query, the choice indices sharing the best fuzz.ratio score and that score (None below min_score).
+
+    With rapidfuzz and numpy all queries are scored against all choices in
+    native cdist calls, a block of queries at a time. Otherwise each query is
+    scored in a loop (rapidfuzz's or fuzzywuzzy's ratio) against the choices
+    whose length does not already rule out min_score.
+    """
+    try:
+        from rapidfuzz import fuzz, process
+    except ImportError:
+        from fuzzywuzzy import fuzz
+        process = None
+    try:
+        import numpy
+    except ImportError:
+        numpy = None
+    results = []
+    if process is not None and numpy is not None:
+        block = max(1, TITLE_MATCH_CELLS // max(1, len(choices)))
+        for start in range(0, len(queries), block):
+            scores = process.cdist(queries[start:start + block], choices, scorer=fuzz.ratio, dtype=numpy.uint8,
+                                   score_cutoff=min_score, workers=-1)
+            for row in scores:
+                best = int(row.max()) if len(row) else 0
+                results.append((numpy.flatnonzero(row == best).tolist(), best) if best >= min_score else None)
+        return results
+
+    by_length = sorted(range(len(choices)), key=lambda n: len(choices[n]))
+    lengths = [len(choices[n]) for n in by_length]
+    for query in queries:
+        # ratio = 2 * matches / (len(a) + len(b)) cannot reach min_score outside these lengths
+        low = bisect.bisect_left(lengths, len(query) * min_score / (200 - min_score))
+        high = bisect.bisect_right(lengths, len(query) * (200 - min_score) / max(1, min_score))
+        best, hits = 0, []
+        for n in by_length[low:high]:
+            score = fuzz.ratio(query, choices[n])
+            if score > best:
+                best, hits = score, [n]
+            elif score == best:
+                hits.append(n)
+        results.append((hits, best) if hits and best >= min_score else None)
+    return results
+
+class TitleIndex:
+    """SQLite index of every known title and alt title of each manga, for resolving titles without the API.
+
+    Filled from search results, ID lookups and MangaDex lists (--index-list).
+    A title resolves when its normalized form belongs to a single manga.
+    With a min_score it also resolves when one manga holds the best fuzzy
+    score of at least min_score across all indexed titles.
+    """
+
+    def __init__(self, path, min_score=None):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.min_score = min_score
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS manga (id TEXT PRIMARY KEY, name TEXT NOT NULL, indexed_at REAL NOT NULL);
+            CREATE TABLE IF NOT EXISTS titles (title TEXT NOT NULL, manga_id TEXT NOT NULL,
+                                               PRIMARY KEY (title, manga_id)) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS titles_manga ON titles (manga_id);""")
+        self.db.commit()
+        self._choices = None  # (titles, their manga ids, display names), reloaded after add()
+
+    def __len__(self):
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM manga").fetchone()[0]
+
+    def add(self, mangas):
+        """Indexes /manga items (replacing their previous titles); returns how many were indexed."""
+        now = time.time()
+        count = 0
+        with self.lock:
+            for manga in mangas:
+                titles = {normalize_title(title) for title in manga_titles(manga)}
+                if not manga.get("id") or not titles:
+                    continue
+                self.db.execute("INSERT OR REPLACE INTO manga VALUES (?, ?, ?)",
+                                (manga["id"], manga_display_name(manga), now))
+                self.db.execute("DELETE FROM titles WHERE manga_id = ?", (manga["id"],))
+                self.db.executemany("INSERT INTO titles VALUES (?, ?)", [(title, manga["id"]) for title in titles])
+                count += 1
+            self.db.commit()
+            self._choices = None
+        return count
+
+    def match(self, queries):
+        """Resolves titles in one batch; returns (manga id, display name) or None for each."""
+        keys = [normalize_title(query) for query in queries]
+        with self.lock:
+            exact = {key: [row[0] for row in self.db.execute("SELECT manga_id FROM titles WHERE title = ?", (key,))]
+                     for key in set(keys)}
+            if self._choices is None:
+                rows = self.db.execute("SELECT title, manga_id FROM titles").fetchall()
+                self._choices = ([row[0] for row in rows], [row[1] for row in rows],
+                                 dict(self.db.execute("SELECT id, name FROM manga")))
+            titles, title_ids, names = self._choices
+
+        results = [None] * len(keys)
+        fuzzy = []
+        for n, key in enumerate(keys):
+            if len(exact[key]) == 1:
+                results[n] = (exact[key][0], names[exact[key][0]])
+            elif not exact[key] and key and self.min_score is not None:
+                fuzzy.append(n)
+        if fuzzy and titles:
+            for n, found in zip(fuzzy, best_title_matches([keys[n] for n in fuzzy], titles, self.min_score)):
+                ids = {title_ids[hit] for hit in found[0]} if found else ()
+                if len(ids) == 1:
+                    manga_id = ids.pop()
+                    results[n] = (manga_id, names[manga_id])
+        return results
+
+    def close(self):
+        with self.lock:
+            self.db.commit()
+            self.db.close()
+
+def index_manga_list(list_id, session):
+    """Adds every manga of a public MangaDex list to the title index; returns how many were added."""
+    resp = api_get(session, f"{API_BASE}/list/{list_id}", timeout=15, cache_ttl=CACHE_TTL_SEARCH)
+    resp.raise_for_status()
+    relationships = (resp.json().get("data") or {}).get("relationships") or []
+    manga_ids = [rel["id"] for rel in relationships if rel.get("type") == "manga"]
+    return len(fetch_mangas(manga_ids, session, cache_ttl=CACHE_TTL_SEARCH))
+
+def fetch_mangas(manga_ids, session, cache_ttl=None):
+    """Fetches the /manga items of many IDs, 100 per request, and adds them to the title index."""
+    mangas = []
+    for start in range(0, len(manga_ids), 100):
+        params = {"ids[]": manga_ids[start:start + 100], "limit": 100,
+                  "contentRating[]": ["safe", "suggestive", "erotica", "pornographic"]}
+        resp = api_get(session, f"{API_BASE}/manga", params=params, timeout=20, cache_ttl=cache_ttl)
+        resp.raise_for_status()
+        mangas.extend(resp.json().get("data") or [])
+    if title_index is not None:
+        title_index.add(mangas)
+    return mangas
+
+metadata_cache = None
+page_store = None
+title_index = None
+offline = False
+process_pools = {}
+_process_pool_lock = threading.Lock()
+
+@timed_stage("api_request", failed=lambda resp: resp.status_code >= 400)
+def api_get(session, url, params=None, timeout=15, cache_ttl=None, refresh=False):
+    """Rate-limited GET for API endpoints; retries 429/5xx/network errors with backoff.
+
+    With cache_ttl and an open metadata_cache, fresh entries are served
+    without touching the network and stale ones are revalidated; refresh
+    always fetches a new response (and caches it). When offline, cached
+    entries are served however old they are and anything else fails.
+    """
+    key = validators = cached = None
+    if cache_ttl and metadata_cache is not None:
+        key = cache_key(url, params)
+        hit = None if refresh else metadata_cache.get(key)
+        if hit:
+            cached, fresh, validators = hit
+            if fresh or offline:
+                run_metrics.count("api_cache_hits")
+                return cached
+    if offline:
+        raise requests.exceptions.ConnectionError(selected_strings["offline_not_cached"].format(url))
+
+    for attempt in range(MAX_RETRIES):
+        wait = rate_limit_wait(url)
+        if wait > 0:
+            run_metrics.count("rate_limit_wait_seconds", wait)
+            time.sleep(wait)
+        try:
+            resp = session.get(url, params=params, timeout=timeout, headers=validators)
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+            if attempt == MAX_RETRIES - 1:
+                raise
+            run_metrics.attempt_error("api_request", http_error_class(e))
+            time.sleep(backoff_delay(attempt))
+            continue
+        rate_limit_observe(url, resp.status_code, resp.headers)
+        if (resp.status_code == 429 or resp.status_code >= 500) and attempt < MAX_RETRIES - 1:
+            run_metrics.attempt_error("api_request", f"HTTP {resp.status_code}")
+            time.sleep(max(backoff_delay(attempt), parse_retry_after(resp.headers) or 0))
+            continue
+        if key is not None:
+            if resp.status_code == 304 and cached is not None:
+                run_metrics.count("api_revalidated")
+                metadata_cache.refresh(key, resp.headers, cache_ttl)
+                return cached
+            if resp.status_code == 200:
+                metadata_cache.put(key, resp.content, resp.headers, cache_ttl)
+        return resp
+
 def select_language():
     """Prompts the user to select a language."""
     global selected_strings
+    import inquirer
     questions = [
         inquirer.List(
             'language_code',
@@ -270,17 +1252,37 @@ def select_language():
     print(selected_strings["selected_language"].format(language_name))
     return language_code
 
+def manga_display_name(manga):
+    """Returns the English title of a /manga item, or its first title."""
+    return manga["attributes"]["title"].get("en") or \
+           next(iter(manga["attributes"]["title"].values()), "Unknown_Title")
+
+def sanitize_title(title):
+    """Makes a manga title safe to use as a folder name."""
+    safe_chars = set('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_-.() ')
+    return "".join(c for c in title if c in safe_chars).strip().replace(' ', '_')
+
+@timed_stage("search", failed=lambda result: result[0] is None)
 def search_manga(title, session):
-    """Searches for a manga by title via MangaDex API."""
+    """Searches for a manga by title, in the title index first and then via MangaDex API."""
+    if title_index is not None:
+        found = title_index.match([title])[0]
+        if found:
+            run_metrics.count("title_index_hits")
+            print(selected_strings["title_index_hit"].format(found[1]))
+            return found[0], sanitize_title(found[1])
+
     params = {"title": title, "limit": 10, "order[relevance]": "desc"}
     try:
-        resp = session.get(f"{API_BASE}/manga", params=params, timeout=15)
+        resp = api_get(session, f"{API_BASE}/manga", params=params, timeout=15, cache_ttl=CACHE_TTL_SEARCH)
         resp.raise_for_status()
     except requests.RequestException as e:
         print(selected_strings["search_manga_error"].format(e))
         return None, None
 
     data = resp.json()
+    if title_index is not None and data.get("data"):
+        title_index.add(data["data"])
     if not data.get("data"):
         print(selected_strings["no_manga_found"].format(title))
         return None, None
@@ -297,6 +1299,7 @@ def search_manga(title, session):
             break
 
     if not best_match:
+        from fuzzywuzzy import fuzz
         for manga in data["data"]:
             for manga_title_text in manga["attributes"]["title"].values():
                 score = fuzz.ratio(title_lower, manga_title_text.lower())
@@ -308,12 +1311,9 @@ def search_manga(title, session):
                     similar_matches.append((score, manga, display_title))
 
     if best_match and best_score >= 75:
-        manga_display_title = best_match["attributes"]["title"].get("en") or \
-                              next(iter(best_match["attributes"]["title"].values()), "Unknown_Title")
+        manga_display_title = manga_display_name(best_match)
         print(selected_strings["manga_found"].format(manga_display_title))
-        safe_chars = set('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_-.() ')
-        sanitized_title = "".join(c for c in manga_display_title if c in safe_chars).strip().replace(' ', '_')
-        return best_match["id"], sanitized_title
+        return best_match["id"], sanitize_title(manga_display_title)
 
     print(selected_strings["no_exact_match"].format(title))
     similar_matches.sort(key=lambda x: x[0], reverse=True)
@@ -322,6 +1322,24 @@ def search_manga(title, session):
 
     return None, None
 
+def get_manga_by_id(manga_id, session):
+    """Looks up a manga by its MangaDex ID; returns (id, sanitized title) like search_manga."""
+    try:
+        resp = api_get(session, f"{API_BASE}/manga/{manga_id}", timeout=15, cache_ttl=CACHE_TTL_SEARCH)
+        resp.raise_for_status()
+        manga = resp.json().get("data")
+    except (requests.RequestException, ValueError) as e:
+        print(selected_strings["search_manga_error"].format(e))
+        return None, None
+    if not manga:
+        print(selected_strings["no_manga_found"].format(manga_id))
+        return None, None
+    if title_index is not None:
+        title_index.add([manga])
+    manga_display_title = manga_display_name(manga)
+    print(selected_strings["manga_found"].format(manga_display_title))
+    return manga["id"], sanitize_title(manga_display_title)
+
 def sort_key(chap):
     """Sorts chapters numerically, placing non-numeric ones at the end."""
     try:
@@ -329,135 +1347,701 @@ def sort_key(chap):
     except (ValueError, TypeError):
         return float('inf')
 
-def get_chapters(manga_id, lang, session):
-    """Fetches and returns a sorted list of available chapters."""
-    chapters = []
-    offset = 0
+@timed_stage("chapter_list_page")
+def fetch_chapter_page(manga_id, lang, session, offset, limit=CHAPTERS_PER_BATCH, updated_since=None,
+                       by_volume=True):
+    """Fetches one /chapter page and returns the decoded JSON.
+
+    Pages are ordered by volume, then chapter; without by_volume only by
+    chapter, so every upload of a chapter number is adjacent even when
+    groups disagree on its volume.
+    """
+    params = {
+        "manga": manga_id,
+        "translatedLanguage[]": lang,
+        "includes[]": "scanlation_group",
+        "order[chapter]": "asc",
+        "limit": limit,
+        "offset": offset,
+        "contentRating[]": ["safe", "suggestive", "erotica", "pornographic"]
+    }
+    if by_volume:
+        params = {"order[volume]": "asc", **params}
+    if updated_since:
+        params["updatedAtSince"] = updated_since
+    resp = api_get(session, f"{API_BASE}/chapter", params=params, timeout=20, cache_ttl=CACHE_TTL_CHAPTERS)
+    resp.raise_for_status()
+    return resp.json()
+
+def chapter_from_item(item):
+    """Converts a /chapter API item into the chapter dict used throughout the script."""
+    attributes = item["attributes"]
+    chap_number = attributes.get("chapter")
+    chap_title = attributes.get("title")
+    display_str = str(chap_number) if chap_number is not None else chap_title if chap_title else "N/A"
+    groups = [rel for rel in item.get("relationships", []) if rel.get("type") == "scanlation_group"]
+    return {"id": item["id"], "number": chap_number, "display": display_str,
+            "volume": attributes.get("volume"), "updatedAt": attributes.get("updatedAt"),
+            "publishAt": attributes.get("publishAt"), "pages": attributes.get("pages"),
+            "groups": [(rel.get("attributes") or {}).get("name") or rel["id"] for rel in groups],
+            "group_ids": [rel["id"] for rel in groups]}
+
+def iter_chapter_pages(manga_id, lang, session, updated_since=None, by_volume=True):
+    """Yields (total, chapters) per /chapter page, in offset order (see fetch_chapter_page for by_volume).
+
+    The first page tells us `total`; the remaining offsets are then
+    requested concurrently (the API rate limiter still applies) and merged
+    back in order as they complete.
+    """
     limit = CHAPTERS_PER_BATCH
-    total_chapters = None
+    first = fetch_chapter_page(manga_id, lang, session, 0, limit, updated_since, by_volume)
+    total = first.get("total", 0)
+    first_batch = first.get("data", [])
+    yield total, [chapter_from_item(item) for item in first_batch]
+    if not first_batch or len(first_batch) >= total:
+        return
 
-    print(f"{selected_strings['fetching_chapters']} ({lang})...")
-    with tqdm(total=None, desc=selected_strings["fetching_chapters"], unit=selected_strings["chapter"], leave=False) as pbar:
-        while True:
-            params = {
-                "manga": manga_id,
-                "translatedLanguage[]": lang,
-                "includes[]": "scanlation_group",
-                "order[volume]": "asc",
-                "order[chapter]": "asc",
-                "limit": limit,
-                "offset": offset,
-                "contentRating[]": ["safe", "suggestive", "erotica", "pornographic"]
-            }
-            try:
-                resp = session.get(f"{API_BASE}/chapter", params=params, timeout=20)
-                resp.raise_for_status()
-                data = resp.json()
-
-                if total_chapters is None:
-                    total_chapters = data.get("total", 0)
-                    pbar.total = total_chapters
-
-                current_batch = data.get("data", [])
-                if not current_batch: break
-
-                for item in current_batch:
-                    attributes = item["attributes"]
-                    chap_number = attributes.get("chapter")
-                    chap_title = attributes.get("title")
-                    display_str = str(chap_number) if chap_number is not None else chap_title if chap_title else "N/A"
-                    chapters.append({"id": item["id"], "number": chap_number, "display": display_str})
-                    pbar.update(1)
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=CHAPTER_PAGE_WORKERS)
+    try:
+        futures = [executor.submit(fetch_chapter_page, manga_id, lang, session, offset, limit, updated_since, by_volume)
+                   for offset in range(limit, total, limit)]
+        for future in futures:
+            yield total, [chapter_from_item(item) for item in future.result().get("data", [])]
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
 
-                offset += len(current_batch)
-                if total_chapters is not None and offset >= total_chapters: break
+def stream_chapters(manga_id, lang, session):
+    """Returns (total, iterator) yielding chapters in chapter-number order as their pages arrive.
 
-            except requests.RequestException as e:
-                print(f"\n{selected_strings['search_chapters_error'].format(e)}")
-                return []
-            except Exception as e:
-                 print(f"\n{selected_strings['unexpected_chapter_error'].format(e)}")
-                 return []
+    Used when every chapter is wanted, so downloads can start before the
+    whole list has been paginated. The feed is not ordered by volume, which
+    dedup_chapter_stream relies on to see all uploads of a number together.
+    Raises on failure of the first page; later failures are reported and
+    end the stream.
+    """
+    pages = iter_chapter_pages(manga_id, lang, session, by_volume=False)
+    total, first_batch = next(pages)
+
+    def chapters():
+        yield from first_batch
+        try:
+            for _, batch in pages:
+                yield from batch
+        except requests.RequestException as e:
+            print(f"\n{selected_strings['search_chapters_error'].format(e)}")
+        except Exception as e:
+            print(f"\n{selected_strings['unexpected_chapter_error'].format(e)}")
+
+    return total, chapters()
+
+@timed_stage("chapter_list", failed=lambda chapters: not chapters)
+def get_chapters(manga_id, lang, session, updated_since=None):
+    """Fetches and returns a sorted list of available chapters (optionally only those updated since a timestamp)."""
+    chapters = []
+
+    print(f"{selected_strings['fetching_chapters']} ({lang})...")
+    with progress_bar(total=None, desc=selected_strings["fetching_chapters"], unit=selected_strings["chapter"], leave=False) as pbar:
+        try:
+            for total_chapters, batch in iter_chapter_pages(manga_id, lang, session, updated_since):
+                pbar.total = total_chapters
+                chapters.extend(batch)
+                pbar.update(len(batch))
+        except requests.RequestException as e:
+            print(f"\n{selected_strings['search_chapters_error'].format(e)}")
+            return []
+        except Exception as e:
+             print(f"\n{selected_strings['unexpected_chapter_error'].format(e)}")
+             return []
 
     chapters.sort(key=sort_key)
     print(f"\n{selected_strings['fetching_chapters']} - Done. {len(chapters)} chapters found.")
-    return chapters
+    return ChapterList(chapters)
+
+def content_range_start(headers):
+    """First byte offset of a 206 response's Content-Range ("bytes START-END/TOTAL"), or None."""
+    unit, _, spec = headers.get("Content-Range", "").partition(" ")
+    start = spec.partition("-")[0]
+    return int(start) if unit == "bytes" and start.isdigit() else None
+
+def expected_image_size(status_code, headers):
+    """Full size of the image being downloaded, from Content-Range or Content-Length; None if unknown."""
+    if headers.get("Content-Encoding", "identity") != "identity":
+        return None  # lengths refer to the encoded body
+    if status_code == 206:
+        total = headers.get("Content-Range", "").rpartition("/")[2]
+        return int(total) if total.isdigit() else None
+    length = headers.get("Content-Length", "")
+    return int(length) if length.isdigit() else None
 
+@timed_stage("page_download", size=downloaded_size)
 def download_image(img_url, img_path, session):
-    """Downloads a single image with retries."""
-    img_filename = os.path.basename(img_path)
+    """Downloads a single image with retries, resuming interrupted transfers with Range requests.
+
+    Writes it to img_path and returns True/False, or with img_path None
+    returns the page bytes (None on failure) without touching the disk.
+    Files are written to img_path + ".part" and renamed once their size
+    matches the server's; a failed download keeps its .part so the next
+    attempt (or run) continues from where it stopped.
+    """
+    img_filename = os.path.basename(img_path or urlsplit(img_url).path)
+    part_path = img_path + ".part" if img_path else None
+    buffer = bytearray()
     for attempt in range(MAX_RETRIES):
         img_resp = None
+        wait = rate_limit_wait(img_url)
+        if wait > 0:
+            run_metrics.count("rate_limit_wait_seconds", wait)
+            time.sleep(wait)
+        if part_path:
+            offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        else:
+            offset = len(buffer)
         try:
-            img_resp = session.get(img_url, stream=True, timeout=25)
+            started = time.monotonic()
+            img_resp = session.get(img_url, stream=True, timeout=25,
+                                   headers={"Range": f"bytes={offset}-"} if offset else None)
+            rate_limit_observe(img_url, img_resp.status_code, img_resp.headers)
+            if img_resp.status_code == 416:
+                if expected_image_size(206, img_resp.headers) == offset:  # already complete, only the rename was lost
+                    if part_path is None:
+                        return bytes(buffer)
+                    os.replace(part_path, img_path)
+                    return True
+                buffer.clear()  # the partial data does not fit the file any more: start over
+                if part_path and os.path.exists(part_path):
+                    os.remove(part_path)
+                run_metrics.attempt_error("page_download", "HTTP 416",
+                                          retried=attempt + 1 < MAX_RETRIES)
+                continue
             img_resp.raise_for_status()
-            with open(img_path, 'wb') as f:
-                for chunk in img_resp.iter_content(chunk_size=16384):
-                    f.write(chunk)
-            if os.path.getsize(img_path) > 0:
-                 return True
+            if offset and (img_resp.status_code != 206 or content_range_start(img_resp.headers) != offset):
+                offset = 0  # Range ignored: the body is the whole file
+            expected = expected_image_size(img_resp.status_code, img_resp.headers)
+            if part_path:
+                with open(part_path, 'ab' if offset else 'wb') as f:
+                    for chunk in img_resp.iter_content(chunk_size=65536):
+                        f.write(chunk)
+                received = os.path.getsize(part_path)
             else:
-                 print(f"\nEmpty file downloaded: {img_filename}, attempt {attempt + 1}/{MAX_RETRIES}...")
-                 try: os.remove(img_path)
-                 except OSError: pass
-                 time.sleep(1)
+                del buffer[offset:]
+                for chunk in img_resp.iter_content(chunk_size=65536):
+                    buffer.extend(chunk)
+                received = len(buffer)
+
+            if received == 0 or (expected is not None and received > expected):
+                print(f"\nEmpty file downloaded: {img_filename}, attempt {attempt + 1}/{MAX_RETRIES}..."
+                      if received == 0 else
+                      f"\nOversized download discarded: {img_filename} ({received}/{expected} bytes)")
+                node_health.record(img_url, False, time.monotonic() - started)
+                run_metrics.attempt_error("page_download", "Empty" if received == 0 else "Oversized",
+                                          retried=attempt + 1 < MAX_RETRIES)
+                buffer.clear()
+                if part_path:
+                    os.remove(part_path)
+                time.sleep(backoff_delay(attempt))
+                continue
+            if expected is not None and received < expected:
+                print(f"\nIncomplete download: {img_filename} ({received}/{expected} bytes), "
+                      f"attempt {attempt + 1}/{MAX_RETRIES}...")
+                node_health.record(img_url, False, time.monotonic() - started)
+                run_metrics.attempt_error("page_download", "Incomplete",
+                                          retried=attempt + 1 < MAX_RETRIES)
+                time.sleep(backoff_delay(attempt))
+                continue
+            elapsed = time.monotonic() - started
+            image_throughput.record(received - offset, elapsed)
+            node_health.record(img_url, True, elapsed, received - offset,
+                               img_resp.headers.get("X-Cache", "").startswith("HIT"))
+            if part_path is None:
+                return bytes(buffer)
+            os.replace(part_path, img_path)
+            return True
 
         except requests.exceptions.Timeout:
              print(f"\n{selected_strings['download_timeout'].format(img_filename, attempt + 1, MAX_RETRIES)}")
-             time.sleep(3 + attempt)
+             node_health.record(img_url, False, time.monotonic() - started)
+             run_metrics.attempt_error("page_download", "Timeout",
+                                       retried=attempt + 1 < MAX_RETRIES)
+             time.sleep(backoff_delay(attempt))
         except requests.RequestException as e:
-            if img_resp is not None and 400 <= img_resp.status_code < 500:
+            status_code = img_resp.status_code if img_resp is not None else None
+            if status_code != 429:
+                node_health.record(img_url, False, time.monotonic() - started)
+            if status_code is not None and 400 <= status_code < 500 and status_code != 429:
+                 run_metrics.attempt_error("page_download", http_error_class(e, status_code), retried=False)
                  print(f"\n{selected_strings['download_failed'].format(img_filename, e, attempt + 1, MAX_RETRIES)} (Client Error {img_resp.status_code} - Not retrying)")
                  break
+            run_metrics.attempt_error("page_download", http_error_class(e, status_code),
+                                      retried=attempt + 1 < MAX_RETRIES)
             print(f"\n{selected_strings['download_failed'].format(img_filename, e, attempt + 1, MAX_RETRIES)}")
-            time.sleep(2 + attempt)
+            time.sleep(backoff_delay(attempt))
         except Exception as e:
+             run_metrics.attempt_error("page_download", type(e).__name__, retried=False)
              print(f"\n{selected_strings['unexpected_download_error'].format(img_filename, e)}")
              break
+        finally:
+            if img_resp is not None:
+                img_resp.close()
 
     print(f"\n{selected_strings['final_download_failed'].format(img_filename)}")
-    if os.path.exists(img_path):
-        try: os.remove(img_path)
-        except OSError: pass
+    return None if img_path is None else False
+
+# --- Image Download Scheduler ---
+class HostQueue:
+    """Priority queue of page downloads that takes a slot of the entry's image host on pop.
+
+    Each host has its own heap, and a heap of host heads orders the hosts
+    that are below per_host_limit, so pop() never walks past the queued
+    work of capped hosts. Stale heads are dropped lazily. Not thread-safe:
+    callers hold their own lock.
+    """
+
+    def __init__(self, per_host_limit):
+        self.per_host_limit = max(1, per_host_limit)
+        self._hosts = {}   # host -> heap of (priority, seq, item)
+        self._heads = []   # (priority, seq, host) of the first entry of hosts below their cap
+        self._active = {}
+        self._seq = 0
+        self._len = 0
+
+    def __len__(self):
+        return self._len
+
+    def _push_head(self, host):
+        heap = self._hosts.get(host)
+        if heap and self._active.get(host, 0) < self.per_host_limit:
+            heapq.heappush(self._heads, (heap[0][0], heap[0][1], host))
+
+    def push(self, priority, host, item):
+        entry = (priority, self._seq, item)
+        self._seq += 1
+        self._len += 1
+        heap = self._hosts.setdefault(host, [])
+        heapq.heappush(heap, entry)
+        if heap[0] is entry:
+            self._push_head(host)
+
+    def pop(self):
+        """Removes the most urgent entry whose host is below its cap and takes a slot of that host.
+
+        Returns (host, item), or None when every queued entry waits on a capped host.
+        """
+        while self._heads:
+            _, seq, host = heapq.heappop(self._heads)
+            heap = self._hosts.get(host)
+            if not heap or heap[0][1] != seq or self._active.get(host, 0) >= self.per_host_limit:
+                continue  # already taken, or the host reached its cap since
+            item = heapq.heappop(heap)[2]
+            if not heap:
+                del self._hosts[host]
+            self._len -= 1
+            self._active[host] = self._active.get(host, 0) + 1
+            self._push_head(host)
+            return host, item
+        return None
+
+    def release(self, host):
+        """Frees the slot taken by pop()."""
+        self._active[host] -= 1
+        if not self._active[host]:
+            del self._active[host]
+        if self._active.get(host, 0) == self.per_host_limit - 1:
+            self._push_head(host)  # was capped: its queued work is eligible again
+
+class ImageScheduler:
+    """Long-lived pool that owns every page download of the run.
+
+    Work is ordered by priority (chapter position, page index) so earlier
+    chapters finish first, capped globally at max_workers and per image
+    host (each at-home baseUrl) at per_host_limit.
+    """
+
+    def __init__(self, session, max_workers=MAX_THREADS, per_host_limit=MAX_THREADS_PER_HOST):
+        self.session = session
+        self.per_host_limit = max(1, per_host_limit)
+        self._queue = HostQueue(self.per_host_limit)
+        self._closed = False
+        self._cond = threading.Condition()
+        self._workers = [threading.Thread(target=self._worker, name=f"mdex-image-{n}", daemon=True)
+                         for n in range(max(1, max_workers))]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, img_url, img_path, priority):
+        """Queues a page download; the future resolves to download_image's result (bytes when img_path is None)."""
+        future = concurrent.futures.Future()
+        host = urlsplit(img_url).netloc
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("ImageScheduler is shut down")
+            self._queue.push(priority, host, (img_url, img_path, future))
+            self._cond.notify()
+        return future
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                task = self._queue.pop()
+                while task is None:
+                    if self._closed and not self._queue:
+                        return
+                    self._cond.wait()
+                    task = self._queue.pop()
+
+            host, (img_url, img_path, future) = task
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        future.set_result(download_image(img_url, img_path, self.session))
+                    except Exception as exc:
+                        future.set_exception(exc)
+            finally:
+                with self._cond:
+                    self._queue.release(host)
+                    self._cond.notify_all()
+
+    def shutdown(self, wait=True):
+        """Stops accepting work; workers exit once the queue drains."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if wait:
+            for worker in self._workers:
+                worker.join()
+
+# --- Async Engine (optional: aiohttp) ---
+def import_async_engine():
+    """Imports asyncio and aiohttp for the async engine; returns aiohttp, or None when it is not installed."""
+    global asyncio, aiohttp
+    if aiohttp is None:
+        try:
+            import aiohttp as aiohttp_module
+        except ImportError:
+            return None
+        import asyncio as asyncio_module
+        asyncio, aiohttp = asyncio_module, aiohttp_module
+    return aiohttp
+
+class _AsyncResponse:
+    """Minimal requests.Response look-alike for responses fetched on the event loop."""
+
+    def __init__(self, resp, content):
+        self.status_code = resp.status
+        self.headers = resp.headers
+        self.url = str(resp.url)
+        self.reason = resp.reason
+        self.content = content
+
+    def raise_for_status(self):
+        if 400 <= self.status_code < 600:
+            raise requests.HTTPError(f"{self.status_code} Error: {self.reason} for url: {self.url}", response=self)
+
+    def json(self):
+        return json.loads(self.content)
+
+def _flatten_params(params):
+    """Expands list values into repeated keys, as requests does, for aiohttp."""
+    flat = []
+    for key, value in (params or {}).items():
+        for item in (value if isinstance(value, (list, tuple)) else [value]):
+            flat.append((key, str(item)))
+    return flat
+
+class AsyncSession:
+    """Runs an aiohttp.ClientSession on a background event loop behind a blocking requests-like get().
+
+    The API helpers (search, chapter pagination, at-home lookup) call get()
+    from worker threads exactly as they would a requests.Session, while
+    page downloads are scheduled directly on the loop by AsyncImageScheduler.
+    """
+
+    def __init__(self, max_connections=100):
+        self.headers = {}
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="mdex-async-loop", daemon=True)
+        self._thread.start()
+        self.client = self.run(self._make_client(max_connections))
+
+    async def _make_client(self, max_connections):
+        return aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=max_connections))
+
+    def run(self, coro):
+        """Runs a coroutine on the engine loop and blocks for its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    async def _get(self, url, params=None, timeout=None, headers=None):
+        try:
+            async with self.client.get(url, params=_flatten_params(params), headers={**self.headers, **(headers or {})},
+                                       timeout=aiohttp.ClientTimeout(total=timeout)) as resp:
+                return _AsyncResponse(resp, await resp.read())
+        except asyncio.TimeoutError as e:
+            raise requests.exceptions.Timeout(str(e) or "Request timed out")
+        except aiohttp.ClientError as e:
+            raise requests.RequestException(str(e) or type(e).__name__)
+
+    def get(self, url, params=None, timeout=None, headers=None, **kwargs):
+        """Blocking GET with the requests exception types, for code shared with the threaded engine."""
+        return self.run(self._get(url, params=params, timeout=timeout, headers=headers))
+
+    def close(self):
+        self.run(self.client.close())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+
+@timed_stage("page_download", size=downloaded_size)
+async def download_image_async(img_url, img_path, session):
+    """Async counterpart of download_image with the same retry, resume and return semantics.
+
+    Partial data is kept in memory between attempts and saved to the .part
+    file only if the download finally fails.
+    """
+    img_filename = os.path.basename(img_path or urlsplit(img_url).path)
+    part_path = img_path + ".part" if img_path else None
+    buffer = bytearray()
+    if part_path and os.path.exists(part_path):
+        buffer += await asyncio.to_thread(_read_file, part_path)
+    for attempt in range(MAX_RETRIES):
+        status_code = None
+        wait = rate_limit_wait(img_url)
+        if wait > 0:
+            run_metrics.count("rate_limit_wait_seconds", wait)
+            await asyncio.sleep(wait)
+        offset = len(buffer)
+        headers = dict(session.headers, Range=f"bytes={offset}-") if offset else session.headers
+        try:
+            started = time.monotonic()
+            async with session.client.get(img_url, headers=headers,
+                                          timeout=aiohttp.ClientTimeout(total=25)) as img_resp:
+                status_code = img_resp.status
+                rate_limit_observe(img_url, img_resp.status, img_resp.headers)
+                if status_code == 416:
+                    if expected_image_size(206, img_resp.headers) != offset:
+                        buffer.clear()  # the partial data does not fit the file any more: start over
+                        run_metrics.attempt_error("page_download", "HTTP 416",
+                                                  retried=attempt + 1 < MAX_RETRIES)
+                        continue
+                    expected = offset  # already complete
+                else:
+                    img_resp.raise_for_status()
+                    if offset and (status_code != 206 or content_range_start(img_resp.headers) != offset):
+                        buffer.clear()  # Range ignored: the body is the whole file
+                    expected = expected_image_size(status_code, img_resp.headers)
+                    async for chunk in img_resp.content.iter_chunked(65536):
+                        buffer += chunk
+
+            received = len(buffer)
+            if received == 0 or (expected is not None and received > expected):
+                print(f"\nEmpty file downloaded: {img_filename}, attempt {attempt + 1}/{MAX_RETRIES}..."
+                      if received == 0 else
+                      f"\nOversized download discarded: {img_filename} ({received}/{expected} bytes)")
+                node_health.record(img_url, False, time.monotonic() - started)
+                run_metrics.attempt_error("page_download", "Empty" if received == 0 else "Oversized",
+                                          retried=attempt + 1 < MAX_RETRIES)
+                buffer.clear()
+                await asyncio.sleep(backoff_delay(attempt))
+                continue
+            if expected is not None and received < expected:
+                print(f"\nIncomplete download: {img_filename} ({received}/{expected} bytes), "
+                      f"attempt {attempt + 1}/{MAX_RETRIES}...")
+                node_health.record(img_url, False, time.monotonic() - started)
+                run_metrics.attempt_error("page_download", "Incomplete",
+                                          retried=attempt + 1 < MAX_RETRIES)
+                await asyncio.sleep(backoff_delay(attempt))
+                continue
+            elapsed = time.monotonic() - started
+            image_throughput.record(received - offset, elapsed)
+            node_health.record(img_url, True, elapsed, received - offset,
+                               img_resp.headers.get("X-Cache", "").startswith("HIT"))
+            if img_path is None:
+                return bytes(buffer)
+            await asyncio.to_thread(_write_file, part_path, buffer)
+            os.replace(part_path, img_path)
+            return True
+
+        except asyncio.TimeoutError:
+            print(f"\n{selected_strings['download_timeout'].format(img_filename, attempt + 1, MAX_RETRIES)}")
+            node_health.record(img_url, False, time.monotonic() - started)
+            run_metrics.attempt_error("page_download", "Timeout",
+                                      retried=attempt + 1 < MAX_RETRIES)
+            await asyncio.sleep(backoff_delay(attempt))
+        except aiohttp.ClientError as e:
+            if status_code != 429:
+                node_health.record(img_url, False, time.monotonic() - started)
+            if status_code is not None and 400 <= status_code < 500 and status_code != 429:
+                run_metrics.attempt_error("page_download", http_error_class(e, status_code), retried=False)
+                print(f"\n{selected_strings['download_failed'].format(img_filename, e, attempt + 1, MAX_RETRIES)} (Client Error {status_code} - Not retrying)")
+                break
+            run_metrics.attempt_error("page_download", http_error_class(e, status_code),
+                                      retried=attempt + 1 < MAX_RETRIES)
+            print(f"\n{selected_strings['download_failed'].format(img_filename, e, attempt + 1, MAX_RETRIES)}")
+            await asyncio.sleep(backoff_delay(attempt))
+        except Exception as e:
+            run_metrics.attempt_error("page_download", type(e).__name__, retried=False)
+            print(f"\n{selected_strings['unexpected_download_error'].format(img_filename, e)}")
+            break
+
+    print(f"\n{selected_strings['final_download_failed'].format(img_filename)}")
+    if img_path is None:
+        return None
+    if buffer:
+        try:
+            await asyncio.to_thread(_write_file, part_path, buffer)
+        except OSError:
+            pass
     return False
 
-def download_chapter_images(chapter_id, save_folder, chapter_display, session):
-    """Downloads all images for a given chapter."""
+def _read_file(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+def _write_file(path, data):
+    with open(path, 'wb') as f:
+        f.write(data)
+
+class AsyncImageScheduler:
+    """ImageScheduler counterpart that multiplexes page downloads as coroutines on one event loop.
+
+    max_workers bounds the requests in flight, so hundreds of pages can be
+    transferred concurrently without one OS thread each. Workers only take a
+    page whose host is below per_host_limit (the same HostQueue as the
+    threaded scheduler), so a capped host never holds a global slot.
+    """
+
+    def __init__(self, session, max_workers=ASYNC_MAX_REQUESTS, per_host_limit=ASYNC_MAX_REQUESTS_PER_HOST):
+        self.session = session
+        self.per_host_limit = max(1, per_host_limit)
+        self._queue = HostQueue(self.per_host_limit)
+        self._closed = False
+        self._lock = threading.Lock()
+        self.session.run(self._start(max(1, max_workers)))
+
+    async def _start(self, max_workers):
+        self._changed = asyncio.Event()
+        self._workers = [asyncio.ensure_future(self._worker()) for _ in range(max_workers)]
+
+    def submit(self, img_url, img_path, priority):
+        """Queues a page download; the future resolves to download_image_async's result."""
+        future = concurrent.futures.Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("AsyncImageScheduler is shut down")
+        self.session.loop.call_soon_threadsafe(self._push, priority, urlsplit(img_url).netloc,
+                                               (img_url, img_path, future))
+        return future
+
+    def _push(self, priority, host, item):
+        self._queue.push(priority, host, item)
+        self._changed.set()
+
+    async def _worker(self):
+        while True:
+            task = self._queue.pop()
+            if task is None:
+                if self._closed and not self._queue:
+                    return
+                self._changed.clear()
+                await self._changed.wait()
+                continue
+            host, (img_url, img_path, future) = task
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        future.set_result(await download_image_async(img_url, img_path, self.session))
+                    except Exception as exc:
+                        future.set_exception(exc)
+            finally:
+                self._queue.release(host)
+                self._changed.set()
+
+    async def _stop(self):
+        self._changed.set()
+        await asyncio.gather(*self._workers)
+
+    def shutdown(self, wait=True):
+        """Stops accepting work; workers exit once the queue drains."""
+        with self._lock:
+            self._closed = True
+        self.session.run(self._stop())
+
+@timed_stage("server_resolve")
+def get_chapter_server(chapter_id, session, refresh=False):
+    """Resolves the MangaDex@Home server and page list for a chapter (refresh skips the metadata cache)."""
     try:
-        server_resp = session.get(f"{API_BASE}/at-home/server/{chapter_id}?forcePort443=false", timeout=15)
+        server_resp = api_get(session, f"{API_BASE}/at-home/server/{chapter_id}", params={"forcePort443": "false"}, timeout=15,
+                              cache_ttl=CACHE_TTL_AT_HOME, refresh=refresh)
         server_resp.raise_for_status()
         server_data = server_resp.json()
         if server_data.get("result") != "ok":
              raise requests.RequestException(selected_strings["image_server_api_error"].format(server_data.get('result')))
     except requests.RequestException as e:
         print(f"\n{selected_strings['search_image_server_error'].format(e)}")
-        return [], None
+        return None
     except Exception as e:
          print(f"\n{selected_strings['unexpected_image_server_error'].format(e)}")
-         return [], None
+         return None
 
     base_url = server_data.get("baseUrl")
     chapter_meta = server_data.get("chapter")
     if not base_url or not chapter_meta:
          print(f"\n{selected_strings['image_server_incomplete_response']}")
-         return [], None
+         return None
 
     hash_val = chapter_meta.get("hash")
     data_files = chapter_meta.get("data")
     if not hash_val or not data_files:
          print(f"\n{selected_strings['image_hash_files_missing']}")
-         return [], None
+         return None
 
-    image_filenames = data_files
+    server_info = {"base_url": base_url, "hash": hash_val, "files": data_files,
+                   "saver_files": chapter_meta.get("dataSaver") or []}
+    if page_store is not None:
+        page_store.put_chapter(chapter_id, server_info)
+    return server_info
 
-    safe_chars = set('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_-.() ')
-    safe_chapter_display = "".join(c for c in chapter_display if c in safe_chars).strip().replace(' ', '_')
-    if not safe_chapter_display:
-         safe_chapter_display = f"id_{chapter_id}"
-    chapter_path = os.path.join(save_folder, f"Capitulo_{safe_chapter_display}")
-    os.makedirs(chapter_path, exist_ok=True)
+@timed_stage("chapter_download", failed=lambda result: result[0] is None)
+def download_chapter_images(chapter_id, save_folder, chapter_display, scheduler, server_info=None, priority=0,
+                            keep_images=False, on_page=None, data_saver=False):
+    """Downloads all images for a given chapter through the shared image scheduler.
 
-    img_paths_to_check = []
+    Returns (pages, chapter_path). Pages are {"name", "index", "data", "path"}
+    dicts in reading order. By default page bytes stay in memory and
+    chapter_path is None; with keep_images they are saved under Capitulo_X
+    (existing files are reused) and read back from there. pages is None if
+    the chapter's image server could not be resolved.
+    With data_saver the compressed dataSaver pages are fetched from
+    /data-saver/ instead (kept under Capitulo_X_saver) when the server lists them.
+    on_page(page) is called as each page becomes available (in completion
+    order); when it returns True the page has been consumed and its bytes
+    are dropped.
+    With a page_store, stored pages are used instead of downloading them and
+    downloaded ones are added to it. server_info may then come from the
+    store (base_url None); the image server is only looked up if a page is
+    missing (never when offline).
+    """
+    session = scheduler.session
+    if server_info is None:
+        server_info = get_chapter_server(chapter_id, session)
+    if not server_info:
+        return None, None
+
+    base_url = server_info["base_url"]
+    hash_val = server_info["hash"]
+    image_filenames = server_info["files"]
+    data_path, folder_suffix = "data", ""
+    if data_saver and server_info.get("saver_files"):
+        image_filenames = server_info["saver_files"]
+        data_path, folder_suffix = "data-saver", "_saver"
+
+    chapter_path = None
+    if keep_images:
+        safe_chars = set('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_-.() ')
+        safe_chapter_display = "".join(c for c in chapter_display if c in safe_chars).strip().replace(' ', '_')
+        if not safe_chapter_display:
+             safe_chapter_display = f"id_{chapter_id}"
+        chapter_path = os.path.join(save_folder, f"Capitulo_{safe_chapter_display}{folder_suffix}")
+        os.makedirs(chapter_path, exist_ok=True)
+
+    pages = []
     download_tasks = []
 
     for idx, img_file in enumerate(image_filenames):
@@ -465,36 +2049,116 @@ def download_chapter_images(chapter_id, save_folder, chapter_display, session):
              img_extension = os.path.splitext(img_file)[1] if '.' in os.path.basename(img_file) else '.jpg'
         except Exception: img_extension = '.jpg'
         img_filename = f"{idx + 1:03d}{img_extension}"
-        img_path = os.path.join(chapter_path, img_filename)
-        img_paths_to_check.append(img_path)
+        page = {"name": img_filename, "index": idx, "data": None, "path": None}
+        pages.append(page)
 
-        if not os.path.exists(img_path) or os.path.getsize(img_path) == 0:
+        img_path = None
+        if keep_images:
+            img_path = page["path"] = os.path.join(chapter_path, img_filename)
+            if os.path.exists(img_path) and os.path.getsize(img_path) > 0:
+                if on_page is not None:
+                    on_page(page)
+                continue
             if os.path.exists(img_path):
                  try: os.remove(img_path)
                  except OSError: pass
-            img_url = f"{base_url}/data/{hash_val}/{img_file}"
-            download_tasks.append((img_url, img_path))
+        stored = page_store.get(PageStore.page_key(hash_val, img_file)) if page_store is not None else None
+        if stored is not None:
+            if img_path:
+                _write_file(img_path, stored)
+            else:
+                page["data"] = stored
+                info = probe_image(stored)
+                if info is not None:
+                    page["info"] = info
+            if on_page is not None and on_page(page):
+                page["data"] = None
+                page["streamed"] = True
+            continue
+        download_tasks.append((idx, page, img_file, img_path))
+
+    missing = 0
+    if download_tasks and base_url is None:
+        # Built from the page store, but some pages are not (or no longer) stored.
+        server_info = None if offline else get_chapter_server(chapter_id, session)
+        if server_info and server_info["hash"] == hash_val:
+            base_url = server_info["base_url"]
+        else:
+            missing = len(download_tasks)
+            print(selected_strings["page_store_incomplete"].format(chapter_display, missing))
+            download_tasks = []
 
     if download_tasks:
-        with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_THREADS) as executor:
-            futures = {executor.submit(download_image, url, path, session): path for url, path in download_tasks}
-            with tqdm(total=len(futures), desc=selected_strings["downloading_images"].format(chapter_display), leave=False) as pbar:
-                 for future in concurrent.futures.as_completed(futures):
-                    img_path_completed = futures[future]
+        def submit(task):
+            page_idx, _, img_file, img_path = task
+            future = scheduler.submit(f"{base_url}/{data_path}/{hash_val}/{img_file}", img_path, (priority, page_idx))
+            pending[future] = (task, base_url, hash_val)
+
+        pending = {}
+        for task in download_tasks:
+            submit(task)
+        failovers = 0
+        with progress_bar(total=len(pending), desc=selected_strings["downloading_images"].format(chapter_display), leave=False) as pbar:
+            while pending:
+                done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                retry = []
+                for future in done:
+                    task, node, page_hash = pending.pop(future)
+                    page = task[1]
                     try:
-                         future.result()
+                        result = future.result()
+                        if result in (None, False) and (node != base_url or (
+                                failovers < NODE_FAILOVERS and node_health.degraded(node))):
+                            retry.append(task)  # try again on the next node
+                            continue
+                        if page_store is not None and result not in (None, False):
+                            page_store.put(PageStore.page_key(page_hash, task[2]),
+                                           result if isinstance(result, bytes) else _read_file(task[3]))
+                        if isinstance(result, bytes):
+                            page["data"] = result
+                            info = probe_image(result)
+                            if info is not None:
+                                page["info"] = info
+                        if on_page is not None and (page["data"] is not None or result is True):
+                            if on_page(page):
+                                page["data"] = None
+                                page["streamed"] = True
                     except Exception as exc:
-                         print(f"\nError in download future {os.path.basename(img_path_completed)}: {exc}")
-                    finally:
-                         pbar.update(1)
-    else:
-         existing_files = [p for p in img_paths_to_check if os.path.exists(p) and os.path.getsize(p) > 0]
-         if len(existing_files) == len(img_paths_to_check) and len(existing_files) > 0:
-              print(selected_strings["no_new_images"])
+                        print(f"\nError in download future {page['name']}: {exc}")
+                    pbar.update(1)
 
-    actual_downloaded_paths = [p for p in img_paths_to_check if os.path.exists(p) and os.path.getsize(p) > 0]
-    actual_downloaded_paths.sort(key=lambda p: int(os.path.splitext(os.path.basename(p))[0]))
-    return actual_downloaded_paths, chapter_path
+                if failovers < NODE_FAILOVERS and (retry or pending) and node_health.degraded(base_url):
+                    # Move everything not yet started (and the failed pages) to a freshly resolved node.
+                    failovers += 1
+                    new_server = get_chapter_server(chapter_id, session, refresh=True)
+                    if new_server and new_server["base_url"] != base_url:
+                        new_files = new_server["saver_files"] if data_path == "data-saver" else new_server["files"]
+                        if len(new_files) != len(image_filenames):
+                            # Re-uploaded meanwhile: its pages no longer line up with the ones already fetched.
+                            print(selected_strings["chapter_reuploaded"].format(chapter_display))
+                            for future in pending:
+                                future.cancel()
+                            concurrent.futures.wait(pending)
+                            for page in pages:
+                                if page["path"] and os.path.exists(page["path"]):
+                                    try: os.remove(page["path"])
+                                    except OSError: pass
+                            return None, chapter_path
+                        print(selected_strings["node_failover"].format(urlsplit(base_url).netloc,
+                                                                       urlsplit(new_server["base_url"]).netloc))
+                        base_url, hash_val, image_filenames = new_server["base_url"], new_server["hash"], new_files
+                        for future, (task, _, _) in list(pending.items()):
+                            if future.cancel():
+                                del pending[future]
+                                retry.append(task)
+                for page_idx, page, _, img_path in retry:
+                    submit((page_idx, page, image_filenames[page_idx], img_path))
+    elif pages and not missing:
+         print(selected_strings["no_new_images"])
+
+    ready_pages = [p for p in pages if p["data"] is not None or p.get("streamed") or
+                   (p["path"] and os.path.exists(p["path"]) and os.path.getsize(p["path"]) > 0)]
+    return ready_pages, chapter_path
 
 def is_valid_chapter_number_string(chapter_str):
     """Checks if a string represents a valid number >= 0."""
@@ -503,37 +2167,139 @@ def is_valid_chapter_number_string(chapter_str):
     except ValueError:
         return False
 
-def select_chapters_by_range(chapters, start_chapter, end_chapter):
-    """Selects chapters within a specified numerical range."""
-    selected_chapters = []
-    for chap in chapters:
-        chap_num_str = chap.get('number')
-        if chap_num_str is not None:
-            try:
-                num = float(chap_num_str)
-                if start_chapter <= num <= end_chapter:
-                    selected_chapters.append(chap)
-            except (ValueError, TypeError):
-                pass
-    return selected_chapters
+# --- Chapter Index ---
+class ChapterRecord:
+    """A chapter dict with its sort keys parsed once."""
+    __slots__ = ("chap", "pos", "number", "volume", "published")
+
+    def __init__(self, chap, pos):
+        self.chap = chap
+        self.pos = pos
+        self.number = numeric_key(chap.get("number"))
+        self.volume = numeric_key(chap.get("volume"))
+        self.published = parse_timestamp(chap.get("publishAt"))
+
+def numeric_key(value):
+    """float(value), or None when it is missing or not a number."""
+    try:
+        return float(value) if value is not None else None
+    except (ValueError, TypeError):
+        return None
+
+def parse_timestamp(value):
+    """Epoch seconds of an ISO date/time (UTC when no offset is given), or None."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+class ChapterIndex:
+    """Sorted views of a chapter list so selection queries cost O(log n) plus the size of the answer.
+
+    Chapters are sorted by number, volume and publish time (each key parsed
+    once) and searched with bisect; number and display strings are hashed.
+    """
+
+    def __init__(self, chapters):
+        records = [ChapterRecord(chap, pos) for pos, chap in enumerate(chapters)]
+        self.chapters = chapters
+        self.by_number = sorted((r for r in records if r.number is not None), key=lambda r: (r.number, r.pos))
+        self.number_keys = [r.number for r in self.by_number]
+        self.by_volume = sorted((r for r in records if r.volume is not None), key=lambda r: (r.volume, r.pos))
+        self.volume_keys = [r.volume for r in self.by_volume]
+        self.no_volume = [r for r in records if r.volume is None]
+        self.by_published = sorted((r for r in records if r.published is not None), key=lambda r: (r.published, r.pos))
+        self.published_keys = [r.published for r in self.by_published]
+        self.by_text = {}
+        for r in records:
+            for text in {r.chap.get("number"), r.chap.get("display")}:
+                if text is not None:
+                    self.by_text.setdefault(text, []).append(r)
+
+    def number_range(self, start, end):
+        return self.by_number[bisect.bisect_left(self.number_keys, start):bisect.bisect_right(self.number_keys, end)]
+
+    def latest(self, count):
+        """The count highest-numbered chapters."""
+        return self.by_number[max(0, len(self.by_number) - count):] if count > 0 else []
+
+    def since(self, timestamp):
+        """Chapters published at or after timestamp."""
+        return self.by_published[bisect.bisect_left(self.published_keys, timestamp):]
+
+    def volume_range(self, start, end):
+        return self.by_volume[bisect.bisect_left(self.volume_keys, start):bisect.bisect_right(self.volume_keys, end)]
+
+    def lookup(self, text):
+        """Chapters whose number or display string is exactly text."""
+        return self.by_text.get(text, [])
+
+class ChapterList(list):
+    """List of chapter dicts that builds (and keeps) its ChapterIndex on first use."""
+
+    _index = None
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = ChapterIndex(self)
+        return self._index
+
+def chapter_index(chapters):
+    return chapters.index if isinstance(chapters, ChapterList) else ChapterIndex(chapters)
+
+def select_chapters_by_range(chapters, start_chapter, end_chapter):
+    """Selects chapters within a specified numerical range."""
+    return [r.chap for r in chapter_index(chapters).number_range(start_chapter, end_chapter)]
+
+SELECTOR_ALIASES = {"latest": "latest", "ultimos": "latest", "últimos": "latest", "since": "since",
+                    "desde": "since", "vol": "volume", "volume": "volume"}
+
+def select_by_selector(index, name, value):
+    """Resolves latest:N, since:DATE and vol:N / vol:A-B / vol:none; returns records, or None if value is invalid."""
+    if name == "latest":
+        return index.latest(int(value)) if value.isdigit() else None
+    if name == "since":
+        timestamp = parse_timestamp(value)
+        return index.since(timestamp) if timestamp is not None else None
+    if value.lower() in ("none", "nenhum", "ninguno"):
+        return index.no_volume
+    start_str, _, end_str = value.partition("-")
+    start, end = numeric_key(start_str), numeric_key(end_str or start_str)
+    if start is None or end is None or start > end:
+        return None
+    return index.volume_range(start, end)
 
 def parse_chapter_selection(chapters, selection_string):
-    """Parses the user's chapter selection string ('all', 'todos', numbers, range)."""
+    """Parses the user's chapter selection string: 'all'/'todos', numbers, ranges (A-B) and
+    selectors (latest:N, since:YYYY-MM-DD, vol:N or vol:A-B)."""
     if selection_string.lower() in ('all', 'todos'):
         return chapters
 
-    selected_chapters_final = []
-    potential_inputs = set()
+    index = chapter_index(chapters)
+    selected = {}
     invalid_inputs = []
-    processed_ids = set()
-
-    parts = selection_string.split()
+    unmatched = set()
 
-    for part in parts:
-        part = part.strip()
-        if not part: continue
+    def add(records):
+        for r in records:
+            selected.setdefault(r.chap["id"], r)
 
-        if '-' in part and part.count('-') == 1:
+    for part in selection_string.split():
+        name, colon, value = part.partition(':')
+        if colon and name.lower() in SELECTOR_ALIASES:
+            records = select_by_selector(index, SELECTOR_ALIASES[name.lower()], value)
+            if records is None:
+                invalid_inputs.append(part)
+            elif not records:
+                print(selected_strings["no_chapters_for_selector"].format(part))
+            add(records or [])
+        elif '-' in part and part.count('-') == 1:
             try:
                 start_str, end_str = part.split('-', 1)
                 start_str, end_str = start_str.strip(), end_str.strip()
@@ -544,38 +2310,21 @@ def parse_chapter_selection(chapters, selection_string):
                          print(selected_strings["invalid_chapter_range_error"])
                          invalid_inputs.append(part)
                      else:
-                          chapters_in_range = select_chapters_by_range(chapters, start_chapter, end_chapter)
+                          chapters_in_range = index.number_range(start_chapter, end_chapter)
                           if not chapters_in_range:
                                print(selected_strings["no_chapters_in_range"].format(start_chapter, end_chapter))
-                          for chap in chapters_in_range:
-                               if chap['id'] not in processed_ids:
-                                    selected_chapters_final.append(chap)
-                                    processed_ids.add(chap['id'])
+                          add(chapters_in_range)
                 else: raise ValueError("Incomplete range")
             except (ValueError, TypeError):
                  print(selected_strings["invalid_range_format"].format(part))
                  invalid_inputs.append(part)
         else:
-             potential_inputs.add(part)
+            matches = index.lookup(part)
+            if matches:
+                add(matches)
+            else:
+                unmatched.add(part)
 
-    matched_inputs = set()
-    for chap in chapters:
-        num_str = chap.get('number')
-        display_str = chap.get('display')
-        matched = False
-        if num_str is not None and num_str in potential_inputs:
-             matched = True
-             matched_inputs.add(num_str)
-        elif display_str in potential_inputs:
-             if not (num_str is not None and num_str == display_str and matched):
-                  matched = True
-                  matched_inputs.add(display_str)
-
-        if matched and chap['id'] not in processed_ids:
-            selected_chapters_final.append(chap)
-            processed_ids.add(chap['id'])
-
-    unmatched = potential_inputs - matched_inputs
     unmatched_but_valid_format = {inp for inp in unmatched if is_valid_chapter_number_string(inp) or '-' not in inp}
     invalid_numerics = {inp for inp in unmatched if not is_valid_chapter_number_string(inp) and '-' not in inp}
 
@@ -586,10 +2335,1720 @@ def parse_chapter_selection(chapters, selection_string):
     if all_invalid:
         print(selected_strings["invalid_chapter_number_provided"].format(', '.join(all_invalid)))
 
-    selected_chapters_final.sort(key=sort_key)
-    return selected_chapters_final
+    ordered = sorted(selected.values(), key=lambda r: (r.number if r.number is not None else float('inf'), r.pos))
+    return [r.chap for r in ordered]
+
+# --- Scanlation Groups ---
+DEDUP_POLICIES = ("newest", "most-pages", "none")
+
+def chapter_in_groups(chap, names):
+    """True if any of the chapter's scanlation groups matches one of names (group name or id, any case)."""
+    groups = {g.lower() for g in chap.get("groups") or []} | {g.lower() for g in chap.get("group_ids") or []}
+    return any(name.lower() in groups for name in names)
+
+def group_allowed(chap, include=None, exclude=None):
+    """Applies --include-group (any of them) and --exclude-group (none of them)."""
+    return (not include or chapter_in_groups(chap, include)) and not (exclude and chapter_in_groups(chap, exclude))
+
+def normalize_chapter_number(number):
+    """'05', '5' and '5.0' are the same chapter."""
+    try:
+        return float(number)
+    except (TypeError, ValueError):
+        return str(number).strip().lower()
+
+def upload_rank(chap, policy, preferred=()):
+    """Sort key of an upload under a dedup policy; the highest one is kept."""
+    preference = next((-n for n, name in enumerate(preferred) if chapter_in_groups(chap, [name])), -len(preferred))
+    newest = chap.get("publishAt") or chap.get("updatedAt") or ""
+    pages = chap.get("pages") or 0
+    if policy == "most-pages":
+        return preference, pages, newest
+    return preference, newest, pages
+
+def dedup_chapters(chapters, policy="newest", preferred=()):
+    """Keeps one upload per chapter number: preferred groups first (in order), then the policy.
+
+    Chapters without a number (oneshots) are always kept. Order follows each
+    number's first upload.
+    """
+    if policy == "none":
+        return list(chapters)
+    best = {}
+    order = []
+    for chap in chapters:
+        if chap.get("number") is None:
+            order.append(chap)
+            continue
+        key = normalize_chapter_number(chap["number"])
+        if key not in best:
+            order.append(key)
+            best[key] = chap
+        elif upload_rank(chap, policy, preferred) > upload_rank(best[key], policy, preferred):
+            best[key] = chap
+    return [item if isinstance(item, dict) else best[item] for item in order]
+
+def dedup_chapter_stream(chapters, policy="newest", preferred=()):
+    """Streaming dedup_chapters for chapter lists in API (number) order.
+
+    Uploads of a number are held until a different number arrives; an upload
+    of a number already yielded (out of order) is dropped.
+    """
+    if policy == "none":
+        yield from chapters
+        return
+    held_key, held = None, []
+    done = set()
+    for chap in chapters:
+        if chap.get("number") is None:
+            yield chap
+            continue
+        key = normalize_chapter_number(chap["number"])
+        if key in done:
+            continue
+        if key != held_key and held:
+            yield max(held, key=lambda c: upload_rank(c, policy, preferred))
+            done.add(held_key)
+            held = []
+        held_key = key
+        held.append(chap)
+    if held:
+        yield max(held, key=lambda c: upload_rank(c, policy, preferred))
+
+def select_uploads(chapters, args):
+    """Applies the --include-group/--exclude-group filters and the --dedup policy to a chapter list."""
+    filtered = [chap for chap in chapters if group_allowed(chap, args.include_group, args.exclude_group)]
+    if len(filtered) < len(chapters):
+        print(selected_strings["group_filtered"].format(len(chapters) - len(filtered)))
+    kept = dedup_chapters(filtered, args.dedup, args.prefer_group or ())
+    if len(kept) < len(filtered):
+        print(selected_strings["duplicates_skipped"].format(len(filtered) - len(kept), args.dedup))
+    return ChapterList(kept)
+
+def select_upload_stream(chapters, args):
+    """select_uploads for a chapter stream that is consumed while downloading."""
+    filtered = (chap for chap in chapters if group_allowed(chap, args.include_group, args.exclude_group))
+    return dedup_chapter_stream(filtered, args.dedup, args.prefer_group or ())
+
+# --- Image Probing ---
+_JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+def _exif_dpi(tiff):
+    """XResolution of an EXIF block's first IFD in dots per inch, read as PIL does ((72, 72) when unusable)."""
+    order = {b"II": "little", b"MM": "big"}.get(tiff[:2])
+    if order is None or len(tiff) < 8:
+        return (72, 72)
+    def number(offset, size):
+        return int.from_bytes(tiff[offset:offset + size], order)
+    ifd = number(4, 4)
+    values = {}
+    for n in range(number(ifd, 2)):
+        entry = ifd + 2 + 12 * n
+        if entry + 12 > len(tiff):
+            break
+        tag, value_type = number(entry, 2), number(entry + 2, 2)
+        if tag not in (0x011A, 0x0128):
+            continue
+        if value_type == 3:  # SHORT
+            values[tag] = number(entry + 8, 2)
+        elif value_type == 4:  # LONG
+            values[tag] = number(entry + 8, 4)
+        elif value_type == 5:  # RATIONAL, stored at an offset
+            offset = number(entry + 8, 4)
+            if offset + 8 <= len(tiff) and number(offset + 4, 4):
+                values[tag] = number(offset, 4) / number(offset + 4, 4)
+    if 0x011A not in values or 0x0128 not in values:
+        return (72, 72)
+    dpi = values[0x011A] * 2.54 if values[0x0128] == 3 else values[0x011A]
+    return (dpi, dpi)
+
+def _probe_jpeg(data):
+    dpi = None
+    exif = None
+    adobe = False
+    i = 2
+    while i + 4 <= len(data):
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:  # fill byte
+            i += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:  # markers without a length
+            i += 2
+            continue
+        if marker == 0xDA:  # start of scan before any frame header
+            return None
+        length = int.from_bytes(data[i + 2:i + 4], "big")
+        if marker in _JPEG_SOF_MARKERS:
+            if i + 10 > len(data):
+                return None
+            height = int.from_bytes(data[i + 5:i + 7], "big")
+            width = int.from_bytes(data[i + 7:i + 9], "big")
+            if dpi is None and exif is not None:
+                dpi = _exif_dpi(exif)  # no JFIF density: fall back to EXIF like PIL
+            return {"format": "JPEG", "size": (width, height), "dpi": dpi, "sof": marker,
+                    "bits": data[i + 4], "components": data[i + 9], "adobe": adobe}
+        if marker == 0xE0 and data[i + 4:i + 9] == b"JFIF\x00" and i + 16 <= len(data):
+            units = data[i + 11]
+            x_density = int.from_bytes(data[i + 12:i + 14], "big")
+            y_density = int.from_bytes(data[i + 14:i + 16], "big")
+            if units == 1:
+                dpi = (x_density, y_density)
+            elif units == 2:
+                dpi = (x_density * 2.54, y_density * 2.54)
+        elif marker == 0xE1 and data[i + 4:i + 10] == b"Exif\x00\x00" and exif is None:
+            exif = data[i + 10:i + 2 + length]
+        elif marker == 0xEE and data[i + 4:i + 9] == b"Adobe":
+            adobe = True
+        i += 2 + length
+    return None
+
+def _probe_png(data):
+    if len(data) < 24 or data[12:16] != b"IHDR":
+        return None
+    info = {"format": "PNG", "size": (int.from_bytes(data[16:20], "big"), int.from_bytes(data[20:24], "big")),
+            "dpi": None}
+    i = 33  # first chunk after IHDR
+    while i + 8 <= len(data):
+        length = int.from_bytes(data[i:i + 4], "big")
+        chunk_type = data[i + 4:i + 8]
+        if chunk_type == b"pHYs" and i + 17 <= len(data):
+            if data[i + 16] == 1:  # pixels per metre
+                info["dpi"] = (int.from_bytes(data[i + 8:i + 12], "big") * 0.0254,
+                               int.from_bytes(data[i + 12:i + 16], "big") * 0.0254)
+            break
+        if chunk_type in (b"IDAT", b"IEND"):
+            break
+        i += 12 + length
+    return info
+
+def _probe_webp(data):
+    chunk = data[12:16]
+    if chunk == b"VP8 " and len(data) >= 30:
+        width = int.from_bytes(data[26:28], "little") & 0x3FFF
+        height = int.from_bytes(data[28:30], "little") & 0x3FFF
+    elif chunk == b"VP8L" and len(data) >= 25:
+        bits = int.from_bytes(data[21:25], "little")
+        width = (bits & 0x3FFF) + 1
+        height = ((bits >> 14) & 0x3FFF) + 1
+    elif chunk == b"VP8X" and len(data) >= 30:
+        width = int.from_bytes(data[24:27], "little") + 1
+        height = int.from_bytes(data[27:30], "little") + 1
+    else:
+        return None
+    return {"format": "WEBP", "size": (width, height), "dpi": None}
+
+def probe_image(data):
+    """Reads format, pixel size and DPI from JPEG/PNG/WebP/GIF headers without decoding; None if unknown."""
+    if data[:3] == b"\xff\xd8\xff":
+        return _probe_jpeg(data)
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        return _probe_png(data)
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return _probe_webp(data)
+    if data[:6] in (b"GIF87a", b"GIF89a") and len(data) >= 10:
+        return {"format": "GIF", "size": (int.from_bytes(data[6:8], "little"), int.from_bytes(data[8:10], "little")),
+                "dpi": None}
+    return None
+
+def probe_page(page):
+    """Returns the page's cached probe result, probing (and caching) it on first use.
+
+    File-backed pages are probed from their first PROBE_HEAD_BYTES, falling
+    back to the whole file for JPEGs with large metadata segments; formats
+    the probe does not know are measured with PIL.
+    """
+    if "info" in page:
+        return page["info"]
+    info = None
+    try:
+        if page["data"] is not None:
+            info = probe_image(page["data"])
+        else:
+            with open(page["path"], "rb") as f:
+                info = probe_image(f.read(PROBE_HEAD_BYTES))
+                if info is None:
+                    f.seek(0)
+                    info = probe_image(f.read())
+        if info is None:
+            from PIL import Image
+            with Image.open(page_source(page)) as img:
+                info = {"format": img.format, "size": img.size, "dpi": img.info.get('dpi')}
+    except Exception as probe_err:
+        print(f"⚠️ Could not read image header {page['name']}: {probe_err}")
+    page["info"] = info
+    return info
+
+def page_size_pt(info):
+    """Converts a probe result to the image's size in points using its DPI (or ASSUMED_DPI)."""
+    width_px, height_px = info["size"]
+    img_dpi = info.get("dpi") or (ASSUMED_DPI, ASSUMED_DPI)
+    if not isinstance(img_dpi, (tuple, list)) or len(img_dpi) < 2: img_dpi = (ASSUMED_DPI, ASSUMED_DPI)
+    dpi_x = img_dpi[0] if img_dpi[0] > 0 else ASSUMED_DPI
+    dpi_y = img_dpi[1] if img_dpi[1] > 0 else ASSUMED_DPI
+    return width_px * 72.0 / dpi_x, height_px * 72.0 / dpi_y
+
+def fit_on_page(width_pt, height_pt):
+    """Lays an image out on a page oriented like it: returns (page_w, page_h, x, y, w, h) in points."""
+    page_w_pt, page_h_pt = PDF_PAGE_SIZE_PT
+    if width_pt > height_pt:
+        page_w_pt, page_h_pt = page_h_pt, page_w_pt
+    scale = 1
+    if width_pt > 0 and height_pt > 0:
+        scale = min(page_w_pt / width_pt, page_h_pt / height_pt)
+    img_w_pt = width_pt * scale
+    img_h_pt = height_pt * scale
+    return page_w_pt, page_h_pt, (page_w_pt - img_w_pt) / 2, (page_h_pt - img_h_pt) / 2, img_w_pt, img_h_pt
+
+def page_source(page):
+    """Returns something PIL and FPDF can open for a page: an in-memory buffer or its file path."""
+    return io.BytesIO(page["data"]) if page["data"] is not None else page["path"]
+
+def create_chapter_pdf(pages, pdf_filename, chapter_display):
+    """Builds a PDF with one page per image, each page oriented to fit its image.
+
+    The PDF is written to a temporary name and renamed into place, so an
+    interrupted build never leaves a truncated Capitulo_X.pdf behind.
+    """
+    tmp_filename = pdf_filename + ".part"
+    try:
+        print(selected_strings["creating_pdf"].format(chapter_display))
+        from fpdf import FPDF
+        pdf = FPDF(unit="pt")
+
+        for page in pages:
+            try:
+                info = probe_page(page)
+                if info is None:
+                    continue
+                width_px, height_px = info["size"]
+                if width_px <= 0 or height_px <= 0:
+                    print(f"⚠️ Skipping invalid image (zero dimension): {page['name']}")
+                    continue
+                page_w_pt, page_h_pt, x_pos, y_pos, img_w_pt, img_h_pt = fit_on_page(*page_size_pt(info))
+                pdf.add_page(orientation='L' if page_w_pt > page_h_pt else 'P')
+                pdf.image(page_source(page), x=x_pos, y=y_pos, w=img_w_pt, h=img_h_pt)
+            except Exception as img_err:
+                print(f"⚠️ Error processing image {page['name']} for PDF: {img_err}")
+
+        pdf.output(tmp_filename)
+        os.replace(tmp_filename, pdf_filename)
+        print(selected_strings["pdf_creation_success"].format(os.path.basename(pdf_filename)))
+        return True
+
+    except Exception as pdf_err:
+        print(selected_strings["pdf_creation_error"].format(chapter_display, pdf_err))
+        if os.path.exists(tmp_filename):
+            try: os.remove(tmp_filename)
+            except OSError: pass
+        return False
+
+# --- Process Pools ---
+def _init_pool_worker(strings):
+    """Process pool initializer: use the parent's UI language in worker messages.
+
+    Workers ignore Ctrl+C and SIGTERM; the parent handles them and shuts the pools down.
+    """
+    global selected_strings
+    selected_strings = strings
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+
+def shared_process_pool(name, workers):
+    """Returns the run's process pool for a kind of CPU work ("pdf", "transform"), starting it on first use.
+
+    Returns None when workers is 0. Started lazily so the workers pick up
+    the UI language chosen at the prompt. Workers are spawned as fresh
+    interpreters rather than forked, since a fork taken while download
+    threads hold locks (logging, connection pools, progress bars) can
+    deadlock in the child.
+    """
+    if workers <= 0:
+        return None
+    with _process_pool_lock:
+        if name not in process_pools:
+            process_pools[name] = concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_pool_worker, initargs=(selected_strings,))
+        return process_pools[name]
+
+@timed_stage("pdf_render", failed=lambda created: not created)
+def render_chapter_pdf(pdf_pool, pages, pdf_filename, chapter_display):
+    """Builds a chapter PDF in the pool (in this process if there is no usable pool)."""
+    if pdf_pool is not None:
+        try:
+            return pdf_pool.submit(create_chapter_pdf, pages, pdf_filename, chapter_display).result()
+        except concurrent.futures.process.BrokenProcessPool as pool_err:
+            print(f"⚠️ PDF worker pool failed ({pool_err}); building Chapter {chapter_display} in-process.")
+    return create_chapter_pdf(pages, pdf_filename, chapter_display)
+
+# --- Page Transforms ---
+_TRANSFORM_EXTENSIONS = {"JPEG": ".jpg", "PNG": ".png", "WEBP": ".webp"}
+
+def page_transform_options(args):
+    """Builds the transform settings from the CLI options, or None when no transform was requested."""
+    if not (args.downscale or args.convert or args.grayscale):
+        return None
+    return {"max_dimension": args.downscale, "convert": args.convert, "quality": args.convert_quality,
+            "grayscale": args.grayscale}
+
+def looks_grayscale(img):
+    """Samples a small copy of the page: True when no sampled pixel has visible colour."""
+    sample = img.copy()
+    sample.thumbnail((GRAYSCALE_SAMPLE_SIZE, GRAYSCALE_SAMPLE_SIZE))
+    return all(max(pixel) - min(pixel) <= GRAYSCALE_TOLERANCE for pixel in sample.convert("RGB").getdata())
+
+def transform_image(data, options):
+    """Downscales/converts/greyscales one page; returns (bytes, format), or None to keep the original.
+
+    Runs in the transform process pool. A page that only had to be
+    re-encoded in its own format is kept when the result is not smaller.
+    """
+    from PIL import Image
+    with Image.open(io.BytesIO(data)) as img:
+        img.load()
+        source_format = target_format = img.format
+        changed = False
+        if options["grayscale"] and img.mode not in ("1", "L") and looks_grayscale(img):
+            img = img.convert("L")
+            changed = True
+        max_dimension = options["max_dimension"]
+        if max_dimension and max(img.size) > max_dimension:
+            img = img.copy()
+            img.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+            changed = True
+        if options["convert"] and source_format == "PNG":
+            target_format = options["convert"].upper()
+            changed = True
+        if not changed:
+            return None
+        if target_format not in _TRANSFORM_EXTENSIONS:
+            target_format = "PNG"
+
+        if target_format == "JPEG" and img.mode not in ("L", "RGB"):
+            if img.mode in ("RGBA", "LA", "PA") or (img.mode == "P" and "transparency" in img.info):
+                rgba = img.convert("RGBA")
+                img = Image.new("RGB", rgba.size, "white")
+                img.paste(rgba, mask=rgba.getchannel("A"))
+            else:
+                img = img.convert("RGB")
+        output = io.BytesIO()
+        if target_format == "JPEG":
+            img.save(output, "JPEG", quality=options["quality"], optimize=True)
+        elif target_format == "WEBP":
+            img.save(output, "WEBP", quality=options["quality"], method=4)
+        else:
+            img.save(output, "PNG", optimize=True)
+    result = output.getvalue()
+    if target_format == source_format and len(result) >= len(data):
+        return None
+    return result, target_format
+
+def apply_page_transform(page, result):
+    """Replaces a page's bytes with a transform_image() result (page files saved with --keep-images stay as-is)."""
+    data, image_format = result
+    page["data"] = data
+    page["name"] = os.path.splitext(page["name"])[0] + _TRANSFORM_EXTENSIONS[image_format]
+    page.pop("info", None)
+    info = probe_image(data)
+    if info is not None:
+        page["info"] = info
+
+# --- Output Writers ---
+# Every chapter output format implements the same small interface: the
+# pipeline opens one writer per chapter, feeds it pages through add_page()
+# as they arrive (a True return means the page's bytes may be dropped), then
+# calls close() to finish the file atomically, or abort() to discard it.
+def safe_file_part(text):
+    return "".join(c for c in str(text) if c.isalnum() or c in (' ', '_', '.', '-')).rstrip().replace(' ', '_')
+
+def page_bytes(page):
+    """Returns a page's image bytes, from memory or from its saved file."""
+    if page["data"] is not None:
+        return page["data"]
+    with open(page["path"], "rb") as f:
+        return f.read()
+
+def chapter_output_path(manga_download_dir, chap, extension=".pdf"):
+    """Returns the output file path for a chapter."""
+    safe_chapter_display = safe_file_part(chap['display'])
+    if not safe_chapter_display: safe_chapter_display = f"id_{chap['id']}"
+    return os.path.join(manga_download_dir, f"Capitulo_{safe_chapter_display}{extension}")
+
+class PdfChapterWriter:
+    """Collects a chapter's pages and builds its PDF with FPDF on close (in the PDF process pool if given)."""
+    extension = ".pdf"
+
+    def __init__(self, path, chap, series_title, pdf_pool=None):
+        self.path = path
+        self.display = chap["display"]
+        self.pdf_pool = pdf_pool
+        self.pages = []
+
+    def add_page(self, page):
+        self.pages.append(page)
+        return False
+
+    def close(self):
+        self.pages.sort(key=lambda page: page["index"])
+        return render_chapter_pdf(self.pdf_pool, self.pages, self.path, self.display)
+
+    def abort(self):
+        self.pages = []
+
+class CbzWriter:
+    """Writes a chapter as a CBZ: the original page files in a zip, stored without recompression."""
+    extension = ".cbz"
+
+    def __init__(self, path, chap, series_title):
+        self.path = path
+        self.tmp_path = path + ".part"
+        self.chap = chap
+        self.series_title = series_title
+        self.page_count = 0
+        self.archive = zipfile.ZipFile(self.tmp_path, "w", zipfile.ZIP_STORED)
+
+    def add_page(self, page):
+        self.archive.writestr(page["name"], page_bytes(page))
+        self.page_count += 1
+        return True
+
+    def close(self):
+        display = self.chap["display"]
+        try:
+            if not self.page_count:
+                raise ValueError("no pages")
+            self.archive.writestr("ComicInfo.xml", (
+                '<?xml version="1.0" encoding="utf-8"?>\n<ComicInfo>'
+                f'<Series>{html.escape(self.series_title)}</Series><Number>{html.escape(display)}</Number>'
+                f'<PageCount>{self.page_count}</PageCount></ComicInfo>\n'))
+            self.archive.close()
+            os.replace(self.tmp_path, self.path)
+        except Exception as write_err:
+            print(selected_strings["archive_error"].format("CBZ", display, write_err))
+            self.abort()
+            return False
+        print(selected_strings["archive_created"].format(os.path.basename(self.path)))
+        return True
+
+    def abort(self):
+        self.archive.close()
+        try: os.remove(self.tmp_path)
+        except OSError: pass
+
+_EPUB_MEDIA_TYPES = {"JPEG": "image/jpeg", "PNG": "image/png", "GIF": "image/gif", "WEBP": "image/webp"}
+
+class EpubWriter:
+    """Writes a chapter as a fixed-layout EPUB 3: one XHTML page per original image, images stored as-is."""
+    extension = ".epub"
+
+    def __init__(self, path, chap, series_title):
+        self.path = path
+        self.tmp_path = path + ".part"
+        self.chap = chap
+        self.title = f"{series_title} - {selected_strings['bundle_bookmark'].format(chap['display'])}"
+        self.items = []  # (index, image name, media type)
+        self.archive = zipfile.ZipFile(self.tmp_path, "w", zipfile.ZIP_STORED)
+        self.archive.writestr("mimetype", "application/epub+zip")  # must be the first entry, uncompressed
+        self.archive.writestr("META-INF/container.xml", (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<container version="1.0" xmlns="urn:oasis:names:tc:opendocument:xmlns:container"><rootfiles>'
+            '<rootfile full-path="OEBPS/content.opf" media-type="application/oebps-package+xml"/>'
+            '</rootfiles></container>\n'), zipfile.ZIP_DEFLATED)
+
+    def add_page(self, page):
+        info = probe_page(page)
+        if info is None or info["format"] not in _EPUB_MEDIA_TYPES:
+            print(f"⚠️ Skipping image in unsupported format for EPUB: {page['name']}")
+            return True
+        width, height = info["size"]
+        self.archive.writestr(f"OEBPS/images/{page['name']}", page_bytes(page))
+        self.archive.writestr(f"OEBPS/pages/p{page['index'] + 1:04d}.xhtml", (
+            '<?xml version="1.0" encoding="UTF-8"?>\n<!DOCTYPE html>\n'
+            '<html xmlns="http://www.w3.org/1999/xhtml"><head>'
+            f'<title>{page["index"] + 1}</title><meta name="viewport" content="width={width}, height={height}"/>'
+            '</head><body style="margin:0">'
+            f'<img src="../images/{page["name"]}" alt="" style="width:{width}px;height:{height}px"/>'
+            '</body></html>\n'), zipfile.ZIP_DEFLATED)
+        self.items.append((page["index"], page["name"], _EPUB_MEDIA_TYPES[info["format"]]))
+        return True
+
+    def close(self):
+        display = self.chap["display"]
+        try:
+            if not self.items:
+                raise ValueError("no pages")
+            self.items.sort()
+            manifest = ['<item id="nav" href="nav.xhtml" media-type="application/xhtml+xml" properties="nav"/>']
+            spine = []
+            for n, (index, name, media_type) in enumerate(self.items):
+                cover = ' properties="cover-image"' if n == 0 else ''
+                manifest.append(f'<item id="i{index + 1:04d}" href="images/{name}" media-type="{media_type}"{cover}/>')
+                manifest.append(f'<item id="p{index + 1:04d}" href="pages/p{index + 1:04d}.xhtml" '
+                                'media-type="application/xhtml+xml"/>')
+                spine.append(f'<itemref idref="p{index + 1:04d}"/>')
+            title = html.escape(self.title)
+            self.archive.writestr("OEBPS/content.opf", (
+                '<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<package xmlns="http://www.idpf.org/2007/opf" version="3.0" unique-identifier="uid" '
+                'prefix="rendition: http://www.idpf.org/vocab/rendition/#">'
+                '<metadata xmlns:dc="http://purl.org/dc/elements/1.1/">'
+                f'<dc:identifier id="uid">urn:mangadex:chapter:{html.escape(self.chap["id"])}</dc:identifier>'
+                f'<dc:title>{title}</dc:title><dc:language>und</dc:language>'
+                f'<meta property="dcterms:modified">{utc_timestamp()}Z</meta>'
+                '<meta property="rendition:layout">pre-paginated</meta>'
+                f'</metadata><manifest>{"".join(manifest)}</manifest><spine>{"".join(spine)}</spine></package>\n'),
+                zipfile.ZIP_DEFLATED)
+            self.archive.writestr("OEBPS/nav.xhtml", (
+                '<?xml version="1.0" encoding="UTF-8"?>\n<!DOCTYPE html>\n'
+                '<html xmlns="http://www.w3.org/1999/xhtml" xmlns:epub="http://www.idpf.org/2007/ops">'
+                f'<head><title>{title}</title></head><body><nav epub:type="toc"><ol>'
+                f'<li><a href="pages/p{self.items[0][0] + 1:04d}.xhtml">{title}</a></li>'
+                '</ol></nav></body></html>\n'), zipfile.ZIP_DEFLATED)
+            self.archive.close()
+            os.replace(self.tmp_path, self.path)
+        except Exception as write_err:
+            print(selected_strings["archive_error"].format("EPUB", display, write_err))
+            self.abort()
+            return False
+        print(selected_strings["archive_created"].format(os.path.basename(self.path)))
+        return True
+
+    def abort(self):
+        self.archive.close()
+        try: os.remove(self.tmp_path)
+        except OSError: pass
+
+OUTPUT_WRITERS = {"pdf": PdfChapterWriter, "cbz": CbzWriter, "epub": EpubWriter}
+
+# --- PDF Bundles ---
+def pdf_text(text):
+    """Encodes text as a PDF UTF-16 hex string (outline titles, document info)."""
+    return b"<FEFF" + str(text).encode("utf-16-be").hex().upper().encode() + b">"
+
+def _png_chunks(data):
+    i = 8
+    while i + 8 <= len(data):
+        length = int.from_bytes(data[i:i + 4], "big")
+        chunk_type = data[i + 4:i + 8]
+        yield chunk_type, data[i + 8:i + 8 + length]
+        if chunk_type == b"IEND":
+            return
+        i += 12 + length
+
+def _png_xobject(data):
+    """Reuses a PNG's compressed IDAT stream when PDF can decode it as-is (no alpha, not interlaced)."""
+    header, palette, idat = None, None, []
+    for chunk_type, chunk in _png_chunks(data):
+        if chunk_type == b"IHDR":
+            header = chunk
+        elif chunk_type == b"PLTE":
+            palette = chunk
+        elif chunk_type == b"IDAT":
+            idat.append(chunk)
+        elif chunk_type == b"tRNS":
+            return None
+    if header is None or len(header) < 13 or not idat:
+        return None
+    width, height = int.from_bytes(header[0:4], "big"), int.from_bytes(header[4:8], "big")
+    bits, color_type, interlace = header[8], header[9], header[12]
+    if interlace or bits > 8:
+        return None
+    if color_type == 0:
+        colors, color_space = 1, b"/DeviceGray"
+    elif color_type == 2:
+        colors, color_space = 3, b"/DeviceRGB"
+    elif color_type == 3 and palette:
+        colors = 1
+        palette = palette.ljust(3 * (1 << bits), b"\x00")  # some readers expect a full-size lookup table
+        color_space = b"[/Indexed /DeviceRGB %d <%s>]" % (len(palette) // 3 - 1, palette.hex().encode())
+    else:
+        return None
+    entries = b"/ColorSpace %s /BitsPerComponent %d /Filter /FlateDecode " \
+              b"/DecodeParms << /Predictor 15 /Colors %d /BitsPerComponent %d /Columns %d >>" % (
+                  color_space, bits, colors, bits, width)
+    return width, height, entries, b"".join(idat)
+
+def pdf_image_xobject(data):
+    """Returns (width, height, dictionary entries, stream) for an image XObject.
+
+    Baseline/progressive JPEGs are embedded byte for byte (DCTDecode) and
+    PNGs without alpha keep their compressed IDAT data; anything else is
+    decoded once with PIL, flattened onto white and Flate-compressed.
+    """
+    info = probe_image(data)
+    if info is not None and info["format"] == "JPEG" and info["sof"] in (0xC0, 0xC1, 0xC2) \
+            and info["bits"] == 8 and info["components"] in (1, 3, 4):
+        width, height = info["size"]
+        if info["components"] == 4:
+            # Only CMYK JPEGs with an Adobe APP14 marker store inverted samples
+            entries = b"/ColorSpace /DeviceCMYK"
+            if info["adobe"]:
+                entries += b" /Decode [1 0 1 0 1 0 1 0]"
+        else:
+            entries = b"/ColorSpace /DeviceGray" if info["components"] == 1 else b"/ColorSpace /DeviceRGB"
+        return width, height, entries + b" /BitsPerComponent 8 /Filter /DCTDecode", data
+    if info is not None and info["format"] == "PNG":
+        xobject = _png_xobject(data)
+        if xobject is not None:
+            return xobject
+
+    from PIL import Image
+    with Image.open(io.BytesIO(data)) as img:
+        img.load()
+        if img.mode in ("RGBA", "LA", "PA") or (img.mode == "P" and "transparency" in img.info):
+            rgba = img.convert("RGBA")
+            img = Image.new("RGB", rgba.size, "white")
+            img.paste(rgba, mask=rgba.getchannel("A"))
+        elif img.mode not in ("L", "RGB"):
+            img = img.convert("RGB")
+        color_space = b"/DeviceGray" if img.mode == "L" else b"/DeviceRGB"
+        return img.width, img.height, b"/ColorSpace %s /BitsPerComponent 8 /Filter /FlateDecode" % color_space, \
+            zlib.compress(img.tobytes(), 6)
+
+class PdfBundleWriter:
+    """Streams the pages of many chapters into one PDF without re-encoding them.
+
+    Objects are appended to a temporary file as each chapter arrives (in any
+    order) and only their offsets are kept, so memory does not grow with the
+    bundle. Page order and the per-chapter bookmarks follow the chapter order
+    and are written, with the page tree and xref, by close().
+    """
+
+    def __init__(self, tmp_path, title):
+        self.tmp_path = tmp_path
+        self.title = title
+        self.offsets = [None, None]  # 1: catalog, 2: page tree (written by close)
+        self.chapters = {}  # order -> (display, [page object numbers])
+        self.failed = False
+        self.lock = threading.Lock()
+        with open(tmp_path, "wb") as f:
+            self.size = f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def _write_objects(self, objects):
+        """Appends (number, body, stream) objects, numbering None ones consecutively; call with the lock held."""
+        try:
+            with open(self.tmp_path, "ab") as f:
+                for number, body, stream in objects:
+                    if number is None:
+                        self.offsets.append(self.size)
+                        number = len(self.offsets)
+                    else:
+                        self.offsets[number - 1] = self.size
+                    if stream is None:
+                        chunks = [b"%d 0 obj\n%s\nendobj\n" % (number, body)]
+                    else:
+                        chunks = [b"%d 0 obj\n<< %s /Length %d >>\nstream\n" % (number, body, len(stream)), stream,
+                                  b"\nendstream\nendobj\n"]
+                    for chunk in chunks:
+                        self.size += f.write(chunk)
+        except OSError:
+            self.failed = True
+            raise
+
+    def add_page(self, page):
+        """Writes one page (image, content stream and page object); returns its object number or None."""
+        info = probe_page(page)
+        if info is None:
+            return None
+        width_px, height_px, entries, stream = pdf_image_xobject(page_bytes(page))
+        if width_px <= 0 or height_px <= 0:
+            print(f"⚠️ Skipping invalid image (zero dimension): {page['name']}")
+            return None
+        page_w, page_h, x, y, w, h = fit_on_page(*page_size_pt(info))
+        with self.lock:
+            image_number = len(self.offsets) + 1
+            self._write_objects([
+                (None, b"/Type /XObject /Subtype /Image /Width %d /Height %d %s" % (width_px, height_px, entries),
+                 stream),
+                (None, b"", b"q %.2f 0 0 %.2f %.2f %.2f cm /I0 Do Q" % (w, h, x, y)),
+                (None, b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.2f %.2f] /Resources << /XObject "
+                       b"<< /I0 %d 0 R >> >> /Contents %d 0 R >>" % (page_w, page_h, image_number, image_number + 1),
+                 None),
+            ])
+        return image_number + 2
+
+    def add_chapter(self, order, display, pages):
+        """Appends a chapter's pages; returns how many were written."""
+        print(selected_strings["bundle_adding_chapter"].format(display))
+        page_numbers = []
+        for page in pages:
+            if self.failed:
+                break
+            try:
+                page_number = self.add_page(page)
+                if page_number is not None:
+                    page_numbers.append(page_number)
+            except Exception as img_err:
+                print(f"⚠️ Error processing image {page['name']} for PDF: {img_err}")
+        if self.failed:
+            return 0
+        if page_numbers:
+            with self.lock:
+                self.chapters[order] = (display, page_numbers)
+        return len(page_numbers)
+
+    def close(self, pdf_filename):
+        """Writes bookmarks, page tree and xref and renames the bundle into place; returns its chapter count."""
+        with self.lock:
+            chapters = [self.chapters[order] for order in sorted(self.chapters)]
+            if self.failed or not chapters:
+                self.abort()
+                return 0
+            kids = [number for _, page_numbers in chapters for number in page_numbers]
+            outline_number = len(self.offsets) + 1
+            first_item, last_item = outline_number + 1, outline_number + len(chapters)
+            info_number = last_item + 1
+            objects = [(None, b"<< /Type /Outlines /First %d 0 R /Last %d 0 R /Count %d >>" % (
+                first_item, last_item, len(chapters)), None)]
+            for item, (display, page_numbers) in enumerate(chapters, first_item):
+                links = b"".join([b" /Prev %d 0 R" % (item - 1) if item > first_item else b"",
+                                  b" /Next %d 0 R" % (item + 1) if item < last_item else b""])
+                objects.append((None, b"<< /Title %s /Parent %d 0 R%s /Dest [%d 0 R /Fit] >>" % (
+                    pdf_text(selected_strings["bundle_bookmark"].format(display)), outline_number, links,
+                    page_numbers[0]), None))
+            objects.append((None, b"<< /Title %s /Producer (MDex) >>" % pdf_text(self.title), None))
+            objects.append((2, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+                b" ".join(b"%d 0 R" % number for number in kids), len(kids)), None))
+            objects.append((1, b"<< /Type /Catalog /Pages 2 0 R /Outlines %d 0 R /PageMode /UseOutlines >>" %
+                            outline_number, None))
+            try:
+                self._write_objects(objects)
+                xref_offset = self.size
+                with open(self.tmp_path, "ab") as f:
+                    f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(self.offsets) + 1))
+                    f.write(b"".join(b"%010d 00000 n \n" % offset for offset in self.offsets))
+                    f.write(b"trailer\n<< /Size %d /Root 1 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+                        len(self.offsets) + 1, info_number, xref_offset))
+                os.replace(self.tmp_path, pdf_filename)
+            except OSError:
+                self.abort()
+                raise
+            return len(chapters)
+
+    def abort(self):
+        try: os.remove(self.tmp_path)
+        except OSError: pass
+
+def parse_bundle_mode(value):
+    """argparse type for --bundle: 'volume', 'all', or N (or 'N-chapters') chapters per PDF."""
+    mode = value.strip().lower()
+    if mode in ("volume", "all"):
+        return mode
+    count = mode[:-len("-chapters")] if mode.endswith("-chapters") else mode
+    if count.isdigit() and int(count) > 0:
+        return int(count)
+    raise argparse.ArgumentTypeError(f"expected 'volume', 'all' or a number of chapters, got {value!r}")
+
+class ChapterBundler:
+    """Routes pipeline chapters into bundle PDFs: one per volume, per N chapters, or one for everything."""
+
+    def __init__(self, manga_download_dir, mode):
+        self.manga_download_dir = manga_download_dir
+        self.mode = mode
+        self.title = os.path.basename(manga_download_dir)
+        self.writers = {}
+        self.lock = threading.Lock()
+
+    def bundle_key(self, job):
+        if self.mode == "volume":
+            return job["chap"].get("volume")  # None collects chapters without a volume
+        if self.mode == "all":
+            return "all"
+        return job["order"] // self.mode
+
+    def bundle_path(self, key, writer):
+        if self.mode == "volume":
+            name = f"Volume_{safe_file_part(key) or 'none'}" if key is not None else "Volume_none"
+        elif self.mode == "all":
+            name = safe_file_part(self.title) or "bundle"
+        else:
+            displays = [writer.chapters[order][0] for order in sorted(writer.chapters)]
+            name = f"Capitulos_{safe_file_part(displays[0])}-{safe_file_part(displays[-1])}" if displays else "bundle"
+        return os.path.join(self.manga_download_dir, f"{name}.pdf")
+
+    def add(self, job):
+        """Appends a fetched chapter to its bundle; True if any of its pages were written."""
+        key = self.bundle_key(job)
+        with self.lock:
+            writer = self.writers.get(key)
+            if writer is None:
+                title = f"{self.title} - Volume {key}" if self.mode == "volume" and key is not None else self.title
+                tmp_path = os.path.join(self.manga_download_dir, f".bundle_{len(self.writers)}.pdf.part")
+                writer = self.writers[key] = PdfBundleWriter(tmp_path, title)
+        return writer.add_chapter(job["order"], job["chap"]["display"], job["pages"]) > 0
+
+    def close(self):
+        """Finalizes every bundle; returns how many already-added chapters were lost to bundles that failed."""
+        lost = 0
+        for key, writer in self.writers.items():
+            pdf_filename = self.bundle_path(key, writer)
+            added = len(writer.chapters)
+            try:
+                written = writer.close(pdf_filename)
+            except Exception as bundle_err:
+                print(selected_strings["bundle_error"].format(os.path.basename(pdf_filename), bundle_err))
+                written = 0
+            if written:
+                print(selected_strings["bundle_created"].format(os.path.basename(pdf_filename), written))
+            else:
+                if writer.failed:
+                    print(selected_strings["bundle_error"].format(os.path.basename(pdf_filename), "write failed"))
+                lost += added
+        return lost
+
+# --- Sync State ---
+def sync_state_path(manga_download_dir):
+    return os.path.join(manga_download_dir, SYNC_STATE_FILENAME)
+
+def load_sync_state(manga_download_dir, manga_id, lang):
+    """Loads the per-manga sync manifest, or returns an empty one."""
+    state = {"manga_id": manga_id, "lang": lang, "last_sync": None, "selection": None, "chapters": {}}
+    try:
+        with open(sync_state_path(manga_download_dir), encoding="utf-8") as f:
+            saved = json.load(f)
+        if saved.get("manga_id") == manga_id and saved.get("lang") == lang:
+            state.update(saved)
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Ignoring unreadable sync state in {manga_download_dir}: {e}")
+    return state
+
+def save_sync_state(manga_download_dir, state):
+    """Writes the sync manifest atomically."""
+    path = sync_state_path(manga_download_dir)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def synced_output_ok(entry, manga_download_dir):
+    """True when a manifest entry's PDF still exists with the recorded size."""
+    if not entry.get("pdf"):
+        return False
+    try:
+        return os.path.getsize(os.path.join(manga_download_dir, entry["pdf"])) == entry.get("size")
+    except OSError:
+        return False
+
+def sync_delta(chapters, state, manga_download_dir):
+    """Returns the chapters that are new, updated, or whose recorded PDF is gone."""
+    known = state["chapters"]
+    delta = []
+    seen = set()
+    for chap in chapters:
+        seen.add(chap["id"])
+        entry = known.get(chap["id"])
+        if entry is None or entry.get("updatedAt") != chap.get("updatedAt") \
+                or not synced_output_ok(entry, manga_download_dir):
+            delta.append(chap)
+    # Chapters not in the updatedAtSince window but never (successfully) written.
+    for chap_id, entry in known.items():
+        if chap_id not in seen and not synced_output_ok(entry, manga_download_dir):
+            delta.append({"id": chap_id, "number": entry.get("number"), "display": entry.get("display", "N/A"),
+                          "updatedAt": entry.get("updatedAt")})
+    delta.sort(key=sort_key)
+    return delta
+
+def sync_selection(chapters, state, manga_download_dir, args):
+    """Returns the chapters of an updatedAtSince window (plus unfinished ones) that a sync has to download.
+
+    Uploads already synced compete with the updated ones, so a new upload of
+    a synced chapter number is only downloaded if the dedup policy prefers it.
+    """
+    window_ids = {chap["id"] for chap in chapters}
+    synced = [dict(entry, id=chap_id) for chap_id, entry in state["chapters"].items() if chap_id not in window_ids]
+    kept_ids = {chap["id"] for chap in select_uploads(chapters + synced, args)}
+    return [chap for chap in sync_delta([chap for chap in chapters if chap["id"] in kept_ids], state, manga_download_dir)
+            if chap["id"] in kept_ids]
+
+_sync_state_lock = threading.Lock()
+
+def record_synced_chapter(state, job, manga_download_dir):
+    """Stores a processed chapter in the manifest; failed ones are kept without a PDF so the next sync retries them."""
+    chap = job["chap"]
+    entry = {"number": chap.get("number"), "display": chap.get("display"), "updatedAt": chap.get("updatedAt"),
+             "publishAt": chap.get("publishAt"), "pages": chap.get("pages"), "groups": chap.get("groups"),
+             "group_ids": chap.get("group_ids"), "pdf": None, "size": None, "sha256": None}
+    pdf_path = job.get("pdf_path")
+    with _sync_state_lock:
+        if job["status"] == "pdf_created" and pdf_path and os.path.exists(pdf_path):
+            entry.update(pdf=os.path.basename(pdf_path), size=os.path.getsize(pdf_path), sha256=file_sha256(pdf_path))
+        elif job["status"] != "pdf_created" and state["chapters"].get(chap["id"], {}).get("pdf"):
+            return  # a failed background upgrade leaves the recorded preview in place
+        state["chapters"][chap["id"]] = entry
+        try:
+            save_sync_state(manga_download_dir, state)
+        except OSError as e:
+            print(f"⚠️ Could not save sync state: {e}")
+
+def utc_timestamp(seconds_ago=0):
+    """UTC time in the format MangaDex expects for *Since filters."""
+    return (datetime.now(timezone.utc) - timedelta(seconds=seconds_ago)).strftime("%Y-%m-%dT%H:%M:%S")
+
+# --- Chapter Pipeline ---
+_STAGE_DONE = object()
+
+class PageWindow:
+    """Caps the pages held in memory by the chapters in flight; shared by pipelines writing the same series."""
+
+    def __init__(self, limit=PAGE_MEMORY_WINDOW):
+        self.limit = max(1, limit)
+        self.pages = 0
+        self.cond = threading.Condition()
+
+    def reserve(self, count):
+        """Blocks until count more pages fit (a chapter larger than the window runs alone)."""
+        with self.cond:
+            while self.pages and self.pages + count > self.limit:
+                self.cond.wait()
+            self.pages += count
+
+    def release(self, count):
+        with self.cond:
+            self.pages -= count
+            self.cond.notify_all()
+
+class DisplayClaims:
+    """Chapter displays being written, so two chapters never write the same Capitulo_X folder/output at once."""
+
+    def __init__(self):
+        self.busy = set()
+        self.cond = threading.Condition()
+
+    def claim(self, display):
+        with self.cond:
+            while display in self.busy:
+                self.cond.wait()
+            self.busy.add(display)
+
+    def release(self, display):
+        with self.cond:
+            self.busy.discard(display)
+            self.cond.notify_all()
+
+class ChapterPipeline:
+    """Runs chapters through resolve -> fetch -> [transform] -> PDF -> cleanup stages joined by bounded queues.
+
+    Each stage has its own worker threads, so the at-home lookup and page
+    downloads of later chapters overlap with the PDF build of earlier ones.
+    Every chapter reaches the cleanup stage exactly once, which is the only
+    place the summary and the overall progress bar are updated.
+    Pages held in memory between fetch and cleanup are capped at page_window;
+    pipelines writing the same series at once (--quality preview) pass one
+    shared PageWindow and DisplayClaims instead.
+    """
+
+    def __init__(self, session, scheduler, manga_download_dir, resolve_workers=1, fetch_workers=2,
+                 pdf_workers=1, queue_size=2, on_chapter_done=None, keep_images=False,
+                 page_window=PAGE_MEMORY_WINDOW, pdf_pool=None, bundler=None, output_format="pdf", quality="original",
+                 transform=None, transform_pool=None, priority_base=0, progress_desc=None, window=None, claims=None):
+        self.session = session
+        self.quality = quality
+        self.priority_base = priority_base
+        self.progress_desc = progress_desc
+        self.transform = transform
+        self.transform_pool = transform_pool
+        self.output_format = output_format
+        self.series_title = os.path.basename(manga_download_dir)
+        self.pdf_pool = pdf_pool
+        self.bundler = bundler
+        self.keep_images = keep_images
+        self.window = window if window is not None else PageWindow(page_window)
+        self.on_chapter_done = on_chapter_done
+        self.scheduler = scheduler
+        self.manga_download_dir = manga_download_dir
+        self.stage_workers = {
+            "resolve": max(1, resolve_workers),
+            "fetch": max(1, fetch_workers),
+            "transform": max(1, fetch_workers),
+            "pdf": max(1, pdf_workers),
+            "cleanup": 1,
+        }
+        self.queue_size = max(1, queue_size)
+        self.claims = claims if claims is not None else DisplayClaims()
+
+    def _claim_display(self, job):
+        """Waits until no other in-flight chapter writes to the same Capitulo_X folder/PDF."""
+        self.claims.claim(job["chap"]["display"])
+        job["claimed"] = True
+
+    def _release_display(self, job):
+        if job.pop("claimed", False):
+            self.claims.release(job["chap"]["display"])
+
+    def _reserve_pages(self, job):
+        """Blocks until the chapter's pages fit in the memory window (a chapter larger than the window runs alone)."""
+        count = 0 if self.keep_images else len(job["server"]["files"])
+        self.window.reserve(count)
+        job["reserved_pages"] = count
+
+    def _release_pages(self, job):
+        job["pages"] = None
+        count = job.pop("reserved_pages", 0)
+        if count:
+            self.window.release(count)
+
+    def _resolve(self, job):
+        chap = job["chap"]
+        print(selected_strings["downloading_images_chapter"].format(chap['display']))
+        stored = page_store.chapter(chap["id"]) if page_store is not None else None
+        if stored is not None:
+            files = stored["saver_files"] if self._use_data_saver() and stored["saver_files"] else stored["files"]
+            if offline or page_store.has(PageStore.page_key(stored["hash"], f) for f in files):
+                job["server"] = stored  # every page is stored: no at-home lookup needed
+                return job
+        job["server"] = get_chapter_server(chap["id"], self.session)
+        if not job["server"]:
+            job["status"] = "failed"
+        return job
+
+    def _open_writer(self, job):
+        """Starts the chapter's output file so pages can be written into it as they download."""
+        chap = job["chap"]
+        writer_class = OUTPUT_WRITERS[self.output_format]
+        path = job["pdf_path"] = chapter_output_path(self.manga_download_dir, chap, writer_class.extension)
+        if writer_class is PdfChapterWriter:
+            return PdfChapterWriter(path, chap, self.series_title, self.pdf_pool)
+        return writer_class(path, chap, self.series_title)
+
+    def _use_data_saver(self):
+        """Picks the page set for the next chapter; 'auto' switches to data-saver pages on slow links."""
+        if self.quality == "auto":
+            rate = image_throughput.rate
+            return rate is not None and rate < AUTO_SAVER_BELOW_BPS
+        return self.quality == "saver"
+
+    def _fetch(self, job):
+        chap = job["chap"]
+        self._claim_display(job)
+        self._reserve_pages(job)
+        writer = None
+        if self.bundler is None:
+            writer = job["writer"] = self._open_writer(job)
+        stream_to = writer.add_page if writer is not None and self.transform is None else None
+        job["pages"], job["chapter_path"] = download_chapter_images(
+            chap["id"], self.manga_download_dir, chap["display"], self.scheduler, job["server"],
+            self.priority_base + job["order"], keep_images=self.keep_images, on_page=stream_to,
+            data_saver=self._use_data_saver())
+        if job["pages"] is None:
+            job["status"] = "failed"
+        elif not job["pages"]:
+            job["status"] = "empty"
+        return job
+
+    def _transform(self, job):
+        """Transforms the chapter's pages in the process pool, handing each to the writer as it is done."""
+        writer = job.get("writer")
+        if self.transform_pool is not None:
+            futures = {self.transform_pool.submit(transform_image, page_bytes(page), self.transform): page
+                       for page in job["pages"]}
+            completed = ((futures[future], future.result) for future in concurrent.futures.as_completed(futures))
+        else:
+            completed = ((page, lambda page=page: transform_image(page_bytes(page), self.transform))
+                         for page in job["pages"])
+        for page, get_result in completed:
+            try:
+                result = get_result()
+                if result is not None:
+                    apply_page_transform(page, result)
+            except Exception as transform_err:
+                print(f"⚠️ Could not transform image {page['name']}, keeping the original: {transform_err}")
+            if writer is not None and writer.add_page(page):
+                page["data"] = None
+                page["streamed"] = True
+        return job
+
+    def _pdf(self, job):
+        if self.bundler is not None:
+            job["status"] = "pdf_created" if self.bundler.add(job) else "pdf_failed"
+            return job
+        job["status"] = "pdf_created" if job.pop("writer").close() else "pdf_failed"
+        return job
+
+    def _cleanup(self, job):
+        """Finishes a chapter; its pages, folder claim and progress tick are released even if a step raises."""
+        chap = job["chap"]
+        status = job["status"]
+        try:
+            writer = job.pop("writer", None)
+            if writer is not None:  # the chapter failed before its output was finished
+                writer.abort()
+            self._release_pages(job)
+            run_metrics.count(f"chapters_{status}")
+            if status == "pdf_created":
+                self.summary["pdf_created"] += 1
+            elif status == "pdf_failed":
+                self.summary["pdf_failed"] += 1
+            elif status == "empty":
+                print(selected_strings["no_images_downloaded"].format(chap['display']))
+                self.summary["skipped"] += 1
+                try:
+                    chapter_dir_path = job["chapter_path"]
+                    if chapter_dir_path and os.path.exists(chapter_dir_path) and not os.listdir(chapter_dir_path):
+                        os.rmdir(chapter_dir_path)
+                        print(selected_strings["empty_dir_removed"].format(os.path.basename(chapter_dir_path)))
+                except OSError: pass
+            else:
+                if status == "failed":
+                    print(selected_strings["process_chapter_failed"].format(chap['display']))
+                self.summary["skipped"] += 1
+            if self.on_chapter_done is not None:
+                self.on_chapter_done(job)
+        finally:
+            self._release_pages(job)  # no-op unless aborting the writer raised
+            self._release_display(job)
+            self.overall_pbar.update(1)
+        return job
+
+    def _worker(self, stage, handler, in_queue, out_queue):
+        """Pulls jobs from in_queue; jobs already failed skip straight to the next stage."""
+        while True:
+            job = in_queue.get()
+            if job is _STAGE_DONE:
+                break
+            started = time.perf_counter()
+            try:
+                if job["status"] == "pending" or stage == "cleanup":
+                    job = handler(job)
+                    run_metrics.record(f"pipeline_{stage}", time.perf_counter() - started,
+                                       failed=job["status"] in ("failed", "pdf_failed"))
+            except Exception as chap_err:
+                run_metrics.record(f"pipeline_{stage}", time.perf_counter() - started, error=type(chap_err).__name__)
+                print(f"Unexpected error processing chapter {job['chap'].get('display', 'N/A')}: {chap_err}")
+                traceback.print_exc()
+                job["status"] = "error"
+            if out_queue is not None:
+                out_queue.put(job)
+
+    def _run_stage(self, stage, handler, in_queue, out_queue, next_stage=None):
+        """Starts a stage's workers and a closer that forwards end-of-stream once all of them exit."""
+        workers = [threading.Thread(target=self._worker, args=(stage, handler, in_queue, out_queue),
+                                    name=f"mdex-{stage}-{n}", daemon=True)
+                   for n in range(self.stage_workers[stage])]
+        for worker in workers:
+            worker.start()
+
+        def close_stage():
+            for worker in workers:
+                worker.join()
+            if out_queue is not None:
+                for _ in range(self.stage_workers[next_stage]):
+                    out_queue.put(_STAGE_DONE)
+
+        closer = threading.Thread(target=close_stage, name=f"mdex-{stage}-closer", daemon=True)
+        closer.start()
+        return closer
+
+    def run(self, chapters_to_download, total=None):
+        """Processes the chapters (any iterable; total sizes the progress bar) and returns the download summary."""
+        self.summary = {"pdf_created": 0, "pdf_failed": 0, "skipped": 0}
+        stages = [("resolve", self._resolve), ("fetch", self._fetch), ("pdf", self._pdf), ("cleanup", self._cleanup)]
+        if self.transform is not None:
+            stages.insert(2, ("transform", self._transform))
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in stages]
+
+        if total is None:
+            total = len(chapters_to_download)
+        with progress_bar(total=total, desc=self.progress_desc or selected_strings["overall_download_progress"],
+                  unit=selected_strings["overall_download_unit"], leave=True) as overall_pbar:
+            self.overall_pbar = overall_pbar
+            closers = []
+            for n, (stage, handler) in enumerate(stages):
+                out_queue, next_stage = (queues[n + 1], stages[n + 1][0]) if n + 1 < len(stages) else (None, None)
+                closers.append(self._run_stage(stage, handler, queues[n], out_queue, next_stage))
+
+            fed = 0
+            try:
+                for order, chap in enumerate(chapters_to_download):
+                    queues[0].put({"chap": chap, "order": order, "status": "pending", "server": None,
+                                   "pages": [], "chapter_path": None})
+                    fed = order + 1
+                if fed != total:  # a filtered stream can end short of the announced total
+                    overall_pbar.total = fed
+                    overall_pbar.refresh()
+            finally:
+                for _ in range(self.stage_workers["resolve"]):
+                    queues[0].put(_STAGE_DONE)
+
+            for closer in closers:
+                closer.join()
+
+        if self.bundler is not None:
+            lost = self.bundler.close()
+            self.summary["pdf_created"] -= lost
+            self.summary["pdf_failed"] += lost
+        return self.summary
+
+# --- Series Processing ---
+def print_chapter_list(chapters):
+    """Prints the available chapters, eliding the middle of long lists."""
+    print(selected_strings["available_chapters"])
+    limit_display = 20
+    if len(chapters) > limit_display:
+         for i in range(limit_display // 2): print(selected_strings["chapter_prefix"].format(chapters[i]['display']))
+         print(f"    ... ({len(chapters) - limit_display} more chapters) ...")
+         for i in range(len(chapters) - (limit_display // 2), len(chapters)): print(selected_strings["chapter_prefix"].format(chapters[i]['display']))
+    else:
+         for chap in chapters: print(selected_strings["chapter_prefix"].format(chap['display']))
+
+def print_download_summary(download_summary, file_format):
+    format_name = file_format.upper()
+    print(selected_strings["download_summary_title"].format(format_name))
+    print(selected_strings["summary_created"].format(format_name, download_summary['pdf_created']))
+    print(selected_strings["summary_failed"].format(format_name, download_summary['pdf_failed']))
+    print(selected_strings["summary_skipped"].format(download_summary['skipped'])) # Use new key
+    print(selected_strings["summary_footer"])
+
+def run_series_pipeline(session, scheduler, args, manga_download_dir, chapters_to_download, total=None,
+                        sync_state=None, sync_started=None, sync_selection_string=None):
+    """Runs the selected chapters of one manga through the pipeline; returns the summary, or None.
+
+    With sync_state, its cursor advances to sync_started once the run is
+    over, recorded as covering sync_selection_string (None: every chapter).
+    """
+    try:
+        os.makedirs(manga_download_dir, exist_ok=True)
+    except OSError as e:
+         print(f"Error creating manga directory '{manga_download_dir}': {e}")
+         return None
+
+    print(f"\n⚠️ Notice: MAX_THREADS={args.max_threads}, API limit={API_RATE_LIMIT:g} req/s.")
+
+    transform = page_transform_options(args)
+    # The preview and upgrade pipelines write the same files and share one memory budget.
+    window = PageWindow(args.page_window)
+    claims = DisplayClaims()
+
+    def make_pipeline(quality, on_chapter_done, priority_base=0, progress_desc=None):
+        return ChapterPipeline(session, scheduler, manga_download_dir,
+                               resolve_workers=args.resolve_workers, fetch_workers=args.fetch_workers,
+                               pdf_workers=args.pdf_workers, queue_size=args.queue_size,
+                               on_chapter_done=on_chapter_done,
+                               keep_images=args.keep_images, window=window, claims=claims, quality=quality,
+                               pdf_pool=shared_process_pool("pdf", args.pdf_workers)
+                               if args.format == "pdf" and not args.bundle else None,
+                               transform=transform, transform_pool=shared_process_pool("transform", args.transform_workers)
+                               if transform else None,
+                               bundler=ChapterBundler(manga_download_dir, args.bundle) if args.bundle else None,
+                               output_format=args.format, priority_base=priority_base, progress_desc=progress_desc)
+
+    record_sync = (lambda job: record_synced_chapter(sync_state, job, manga_download_dir)) \
+        if sync_state is not None else None
+    if args.quality != "preview":
+        download_summary = make_pipeline(args.quality, record_sync).run(chapters_to_download, total=total)
+    else:
+        # Data-saver pass first; each finished chapter is queued for a background pass that
+        # fetches the originals (behind every foreground download) and replaces the output.
+        upgrades = queue.Queue()
+        upgrade_summary = {}
+
+        def preview_done(job):
+            if record_sync is not None:
+                record_sync(job)
+            if job["status"] == "pdf_created":
+                upgrades.put(job["chap"])
+
+        def upgrade():
+            upgrade_summary.update(make_pipeline("original", record_sync, BACKGROUND_PRIORITY,
+                                                 selected_strings["quality_upgrade_progress"]).run(
+                iter(upgrades.get, None), total=total if total is not None else len(chapters_to_download)))
+
+        upgrader = threading.Thread(target=upgrade, name="mdex-upgrade", daemon=True)
+        upgrader.start()
+        try:
+            download_summary = make_pipeline("saver", preview_done).run(chapters_to_download, total=total)
+        finally:
+            upgrades.put(None)
+        upgrader.join()
+        print(selected_strings["quality_upgraded"].format(upgrade_summary.get("pdf_created", 0)))
+    if sync_state is not None:
+        sync_state["last_sync"] = sync_started
+        sync_state["selection"] = sync_selection_string
+        try:
+            save_sync_state(manga_download_dir, sync_state)
+        except OSError as e:
+            print(f"⚠️ Could not save sync state: {e}")
+    return download_summary
+
+def download_series_unattended(session, scheduler, args, manga_id, manga_title_sanitized, language_code,
+                               choice, sync=False, show_list=False):
+    """Selects chapters without prompting (--sync, streamed 'all', or a selection string) and downloads them.
+
+    Returns the series' download summary, or None when nothing could be processed.
+    """
+    manga_download_dir = os.path.join(args.dir, manga_title_sanitized)
+    choice = choice.strip() if choice else None
+    stream_all = bool(choice) and choice.lower() in ('all', 'todos')
+    lang_name = dict(LANGUAGE_CHOICES).get(language_code, language_code)
+
+    if sync and args.bundle:
+        print("⚠️ --sync is not available with --bundle; downloading the selected chapters instead.")
+        sync = False
+    if sync:
+        # Only ask for chapters updated since the last sync, then diff against the manifest.
+        # The cursor only covers the chapters its run selected: list the whole feed again
+        # when that run was narrowed by another --chapters selection.
+        sync_state = load_sync_state(manga_download_dir, manga_id, language_code)
+        sync_started = utc_timestamp(SYNC_OVERLAP)
+        selection = choice if choice and not stream_all else None
+        previous_selection = sync_state.get("selection")
+        since = sync_state["last_sync"] if previous_selection in (None, selection) else None
+        print(f"{selected_strings['fetching_chapters']} ({language_code})...")
+        try:
+            chapters = [chap for _, batch in iter_chapter_pages(manga_id, language_code, session, since)
+                        for chap in batch]
+        except requests.RequestException as e:
+            print(f"\n{selected_strings['search_chapters_error'].format(e)}")
+            return None
+        chapters_to_download = sync_selection(chapters, sync_state, manga_download_dir, args)
+        if choice and not stream_all:
+            chapters_to_download = parse_chapter_selection(chapters_to_download, choice)
+        print(selected_strings["sync_delta"].format(len(chapters_to_download), since or "-"))
+        if not chapters_to_download:
+            print(selected_strings["sync_up_to_date"])
+            try:
+                os.makedirs(manga_download_dir, exist_ok=True)
+                sync_state["last_sync"] = sync_started
+                sync_state["selection"] = selection
+                save_sync_state(manga_download_dir, sync_state)
+            except OSError as e:
+                print(f"⚠️ Could not save sync state: {e}")
+            return {"pdf_created": 0, "pdf_failed": 0, "skipped": 0}
+        return run_series_pipeline(session, scheduler, args, manga_download_dir, chapters_to_download,
+                                   sync_state=sync_state, sync_started=sync_started, sync_selection_string=selection)
+
+    if stream_all:
+        # Every chapter is wanted: skip listing/selection and start downloading as pages arrive.
+        print(f"{selected_strings['fetching_chapters']} ({language_code})...")
+        try:
+            total_to_download, chapters_to_download = stream_chapters(manga_id, language_code, session)
+        except requests.RequestException as e:
+            print(f"\n{selected_strings['search_chapters_error'].format(e)}")
+            return None
+        except Exception as e:
+            print(f"\n{selected_strings['unexpected_chapter_error'].format(e)}")
+            return None
+        if not total_to_download:
+            print(selected_strings["no_chapters_available"].format(lang_name))
+            return None
+        print(selected_strings["streaming_chapters"].format(total_to_download))
+        return run_series_pipeline(session, scheduler, args, manga_download_dir,
+                                   select_upload_stream(chapters_to_download, args), total=total_to_download)
+
+    chapters = get_chapters(manga_id, language_code, session)
+    if not chapters:
+        print(selected_strings["no_chapters_available"].format(lang_name))
+        return None
+    chapters = select_uploads(chapters, args)
+    if show_list:
+        print_chapter_list(chapters)
+    if not choice:
+        print(selected_strings["chapter_selection_empty_error"])
+        return None
+    chapters_to_download = parse_chapter_selection(chapters, choice)
+    if not chapters_to_download:
+        print(selected_strings["no_chapters_selected"])
+        return None
+    return run_series_pipeline(session, scheduler, args, manga_download_dir, chapters_to_download)
+
+# --- Batch Mode ---
+def load_batch_manifest(path):
+    """Reads a YAML or JSON library file into a list of series entries with defaults applied.
+
+    Accepted layouts: a plain list of entries, or a mapping with optional
+    "defaults" and a "series" list. An entry is a title string or a mapping
+    with "title" or "id", plus optional "lang", "chapters" and "sync".
+    """
+    with open(path, encoding="utf-8") as f:
+        if path.lower().endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError("YAML manifests require PyYAML: pip install pyyaml")
+            data = yaml.safe_load(f)
+        else:
+            data = json.load(f)
+
+    defaults = {}
+    if isinstance(data, dict):
+        defaults = data.get("defaults") or {}
+        data = data.get("series") or []
+    if not isinstance(data, list):
+        raise ValueError("expected a list of series")
+
+    entries = []
+    for item in data:
+        entry = dict(defaults)
+        entry.update({"title": item} if isinstance(item, str) else item)
+        if not entry.get("title") and not entry.get("id"):
+            raise ValueError(f"series entry without 'title' or 'id': {item!r}")
+        entries.append(entry)
+    return entries
+
+def resolve_batch_entry(session, entry):
+    """Returns (manga id, sanitized title) of a manifest entry, or (None, None)."""
+    if entry.get("indexed"):
+        return entry["indexed"]
+    if entry.get("id"):
+        return get_manga_by_id(entry["id"], session)
+    return search_manga(entry["title"], session)
+
+def process_batch_entry(session, scheduler, args, entry, manga_id, manga_title_sanitized):
+    """Downloads one resolved manifest entry; returns its summary, or None."""
+    language_code = entry.get("lang") or args.lang or "en"
+    choice = str(entry.get("chapters") or args.chapters or "all")
+    sync = bool(entry.get("sync", args.sync))
+    return download_series_unattended(session, scheduler, args, manga_id, manga_title_sanitized,
+                                      language_code, choice, sync)
+
+def resolve_batch_titles(entries):
+    """Resolves the title entries found in the title index in one batch, so only misses are searched via the API."""
+    titled = [entry for entry in entries if entry.get("title") and not entry.get("id")]
+    if title_index is None or not titled:
+        return
+    resolved = 0
+    for entry, found in zip(titled, title_index.match([entry["title"] for entry in titled])):
+        if found:
+            entry["indexed"] = (found[0], sanitize_title(found[1]))
+            resolved += 1
+    run_metrics.count("title_index_hits", resolved)
+    print(selected_strings["title_index_batch"].format(resolved, len(titled)))
+
+def run_batch(session, scheduler, args, entries):
+    """Processes every manifest entry in this process (at most --series-workers at a time) and prints one summary.
+
+    All entries are resolved first; entries naming the same manga (e.g. its
+    title and its ID) are downloaded once, since they share a folder, output
+    files and sync manifest.
+    """
+    resolve_batch_titles(entries)
+    results = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, args.series_workers)) as executor:
+        resolutions = [executor.submit(resolve_batch_entry, session, entry) for entry in entries]
+        downloads = []
+        first_names = {}
+        for entry, resolution in zip(entries, resolutions):
+            name = entry.get("title") or entry.get("id")
+            try:
+                manga_id, manga_title_sanitized = resolution.result()
+            except Exception as e:
+                print(f"Unexpected error processing {name}: {e}")
+                traceback.print_exc()
+                manga_id = None
+            if manga_id in first_names:
+                print(selected_strings["batch_duplicate_series"].format(name, first_names[manga_id]))
+                continue
+            if manga_id:
+                first_names[manga_id] = name
+                downloads.append((name, executor.submit(process_batch_entry, session, scheduler, args, entry,
+                                                        manga_id, manga_title_sanitized)))
+            else:
+                downloads.append((name, None))
+        for name, future in downloads:
+            try:
+                results.append((name, future.result() if future is not None else None))
+            except Exception as e:
+                print(f"Unexpected error processing {name}: {e}")
+                traceback.print_exc()
+                results.append((name, None))
+
+    totals = {"pdf_created": 0, "pdf_failed": 0, "skipped": 0}
+    print(selected_strings["batch_summary_title"])
+    for name, summary in results:
+        if summary is None:
+            print(selected_strings["batch_series_failed"].format(name))
+            continue
+        print(selected_strings["batch_series_line"].format(name, summary["pdf_created"], summary["pdf_failed"],
+                                                           summary["skipped"]))
+        for key in totals:
+            totals[key] += summary[key]
+    print(selected_strings["summary_created"].format(args.format.upper(), totals['pdf_created']))
+    print(selected_strings["summary_failed"].format(args.format.upper(), totals['pdf_failed']))
+    print(selected_strings["summary_skipped"].format(totals['skipped']))
+    print(selected_strings["batch_series_failed_count"].format(sum(1 for _, summary in results if summary is None)))
+    print(selected_strings["summary_footer"])
+    return totals
+
+# --- Watch Mode ---
+def feed_cursor(chapters, fallback):
+    """updatedAtSince for the next feed poll: the newest updatedAt seen minus SYNC_OVERLAP (server time)."""
+    stamps = [stamp for stamp in (parse_timestamp(chap.get("updatedAt")) for chap in chapters) if stamp is not None]
+    if not stamps:
+        return fallback
+    return datetime.fromtimestamp(max(stamps) - SYNC_OVERLAP, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+
+@timed_stage("watch_feed")
+def fetch_feed_page(manga_id, lang, session, offset, updated_since=None, published_since=None):
+    """Fetches one /manga/{id}/feed page of chapters updated (or published) since a time, oldest update first."""
+    params = {
+        "translatedLanguage[]": lang,
+        "includes[]": "scanlation_group",
+        "order[updatedAt]": "asc",
+        "limit": CHAPTERS_PER_BATCH,
+        "offset": offset,
+        "contentRating[]": ["safe", "suggestive", "erotica", "pornographic"]
+    }
+    if updated_since:
+        params["updatedAtSince"] = updated_since
+    if published_since:
+        params["publishAtSince"] = published_since
+    resp = api_get(session, f"{API_BASE}/manga/{manga_id}/feed", params=params, timeout=20)
+    resp.raise_for_status()
+    return resp.json()
+
+def poll_feed(manga_id, lang, session, updated_since=None, published_since=None):
+    """Returns every chapter of a feed poll (one request unless more than a page changed)."""
+    chapters = []
+    while True:
+        page = fetch_feed_page(manga_id, lang, session, len(chapters), updated_since, published_since)
+        batch = page.get("data", [])
+        chapters.extend(chapter_from_item(item) for item in batch)
+        if not batch or len(chapters) >= page.get("total", 0):
+            return chapters
+
+def watch_series(session, scheduler, args, target, started):
+    """Polls one watched series' feed and downloads its new or updated chapters; returns the summary or None.
+
+    A series without a sync history only picks up chapters published since
+    the watch started; afterwards the feed is asked for chapters updated
+    since the cursor kept as the sync state's last_sync.
+    """
+    state = target["state"]
+    since = state["last_sync"]
+    chapters = poll_feed(target["manga_id"], target["lang"], session, since, None if since else started)
+    cursor = feed_cursor(chapters, since or started)
+    chapters_to_download = sync_selection(chapters, state, target["dir"], args)
+    if not chapters_to_download:
+        if cursor != since:
+            state["last_sync"] = cursor
+            try:
+                os.makedirs(target["dir"], exist_ok=True)
+                save_sync_state(target["dir"], state)
+            except OSError as e:
+                print(f"⚠️ Could not save sync state: {e}")
+        return None
+    run_metrics.count("watch_new_chapters", len(chapters_to_download))
+    print(selected_strings["watch_new_chapters"].format(target["name"], len(chapters_to_download)))
+    return run_series_pipeline(session, scheduler, args, target["dir"], chapters_to_download,
+                               sync_state=state, sync_started=cursor, sync_selection_string=state.get("selection"))
+
+def watch_targets(session, scheduler, args, entries):
+    """Resolves the watched series once (catching up on their chapter selection, if any); returns them by manga ID."""
+    resolve_batch_titles(entries)
+    targets = {}
+    for entry in entries:
+        manga_id, manga_title_sanitized = resolve_batch_entry(session, entry)
+        if not manga_id or manga_id in targets:
+            continue
+        lang = entry.get("lang") or args.lang or "en"
+        choice = entry.get("chapters") or args.chapters
+        if choice:
+            summary = download_series_unattended(session, scheduler, args, manga_id, manga_title_sanitized, lang,
+                                                 str(choice), sync=True)
+            if summary is not None:
+                print_download_summary(summary, args.format)
+        manga_download_dir = os.path.join(args.dir, manga_title_sanitized)
+        targets[manga_id] = {"manga_id": manga_id, "name": manga_title_sanitized, "lang": lang,
+                             "dir": manga_download_dir, "state": load_sync_state(manga_download_dir, manga_id, lang),
+                             "latest": None, "polled_at": None}
+    return targets
+
+def _stop_watch(signum, frame):
+    raise KeyboardInterrupt
+
+def run_watch(session, scheduler, args, entries):
+    """Watches the series until interrupted, downloading new chapters as they appear.
+
+    Each check asks /manga for the latestUploadedChapter of 100 series per
+    request; only series whose latest upload changed (or whose feed was not
+    polled for WATCH_FEED_INTERVAL) get a feed poll. The session, caches,
+    scheduler and process pools stay open between checks. SIGTERM stops it
+    like Ctrl+C.
+    """
+    signal.signal(signal.SIGTERM, _stop_watch)
+    started = utc_timestamp(SYNC_OVERLAP)
+    targets = watch_targets(session, scheduler, args, entries)
+    if not targets:
+        return
+    interval = max(1, args.watch_interval)
+    print(selected_strings["watch_started"].format(len(targets), interval))
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=max(1, args.series_workers))
+    try:
+        while True:
+            check_started = time.monotonic()
+            run_metrics.count("watch_checks")
+            try:
+                latest = {manga["id"]: (manga.get("attributes") or {}).get("latestUploadedChapter")
+                          for manga in fetch_mangas(list(targets), session)}
+            except (requests.RequestException, ValueError) as e:
+                print(selected_strings["search_manga_error"].format(e))
+                latest = {}
+            due = [target for target in targets.values()
+                   if target["polled_at"] is None or check_started - target["polled_at"] >= WATCH_FEED_INTERVAL
+                   or latest.get(target["manga_id"], target["latest"]) != target["latest"]]
+            futures = [(executor.submit(watch_series, session, scheduler, args, target, started), target)
+                       for target in due]
+            for future, target in futures:
+                try:
+                    summary = future.result()
+                except requests.RequestException as e:
+                    print(f"{target['name']}: {selected_strings['search_chapters_error'].format(e)}")
+                    continue
+                except Exception as e:
+                    print(f"Unexpected error watching {target['name']}: {e}")
+                    traceback.print_exc()
+                    continue
+                target["polled_at"] = check_started
+                target["latest"] = latest.get(target["manga_id"], target["latest"])
+                if summary is not None:
+                    print_download_summary(summary, args.format)
+            run_metrics.count("watch_feed_polls", len(due))
+            if metadata_cache is not None:
+                metadata_cache.evict()
+            write_run_reports(args)
+            time.sleep(max(0.0, interval - (time.monotonic() - check_started)))
+    except KeyboardInterrupt:
+        print(f"\n{selected_strings['watch_stopped']}")
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
 
 # --- Main Execution ---
+def shutdown_run(session, scheduler):
+    """Stops the download and process pool workers and closes the session, caches, page store and title index."""
+    scheduler.shutdown()
+    for pool in process_pools.values():
+        pool.shutdown()
+    if at_home_reporter is not None:
+        at_home_reporter.close()
+    session.close()
+    if metadata_cache is not None:
+        metadata_cache.evict()
+        metadata_cache.close()
+    if page_store is not None:
+        page_store.close()
+    if title_index is not None:
+        title_index.close()
+
+def write_run_reports(args):
+    """Writes the --report and --prometheus files, if requested."""
+    for path, writer in ((args.report, write_run_report), (args.prometheus, write_prometheus_textfile)):
+        if not path:
+            continue
+        try:
+            writer(path)
+        except OSError as e:
+            print(f"Could not write run report '{path}': {e}")
+
 def main():
     """Executes the main workflow: setup, search, select, download, and PDF creation."""
     parser = argparse.ArgumentParser(description="Downloads manga chapters from MangaDex and creates PDFs.")
@@ -599,8 +4058,112 @@ def main():
                         help="Chapters to download (e.g., '1 5 10', 'all'/'todos', '20-25').")
     parser.add_argument("--dir", "-d", type=str, default=DOWNLOAD_BASE_DIR,
                          help=f"Base download directory (default: {DOWNLOAD_BASE_DIR})")
+    parser.add_argument("--keep-images", action="store_true",
+                        help="Also save page images under Capitulo_X folders and keep them after the PDF is built.")
+    parser.add_argument("--dedup", choices=DEDUP_POLICIES, default="newest",
+                        help="Keep one upload per chapter number: the 'newest', the one with the 'most-pages', "
+                             "or 'none' to download every upload (default: newest)")
+    parser.add_argument("--prefer-group", action="append", metavar="GROUP",
+                        help="Scanlation group (name or id) whose uploads win over others; repeat in order of preference.")
+    parser.add_argument("--include-group", action="append", metavar="GROUP",
+                        help="Only download uploads by this scanlation group (repeatable).")
+    parser.add_argument("--exclude-group", action="append", metavar="GROUP",
+                        help="Never download uploads by this scanlation group (repeatable).")
+    parser.add_argument("--format", choices=sorted(OUTPUT_WRITERS), default="pdf",
+                        help="Chapter output format: 'pdf', 'cbz' (zip of the original pages) or 'epub' (default: pdf)")
+    parser.add_argument("--quality", choices=["original", "saver", "auto", "preview"], default="original",
+                        help="Page set to download: 'original', 'saver' (compressed data-saver pages), 'auto' "
+                             "(data-saver when downloads are slow) or 'preview' (data-saver first, originals "
+                             "fetched in the background and swapped in) (default: original)")
+    parser.add_argument("--downscale", type=int, metavar="PX",
+                        help="Shrink pages so their longest side is at most PX pixels.")
+    parser.add_argument("--convert", choices=["jpeg", "webp"],
+                        help="Re-encode PNG pages as JPEG or WebP.")
+    parser.add_argument("--convert-quality", type=int, default=TRANSFORM_QUALITY,
+                        help=f"JPEG/WebP quality for converted or downscaled pages (default: {TRANSFORM_QUALITY})")
+    parser.add_argument("--grayscale", action="store_true",
+                        help="Store pages that have no colour as grayscale.")
+    parser.add_argument("--transform-workers", type=int, default=TRANSFORM_WORKERS,
+                        help=f"Processes transforming pages; 0 transforms them in the main process (default: {TRANSFORM_WORKERS})")
+    parser.add_argument("--at-home-report", action="store_true",
+                        help="Report page download results (success, size, time) to the MangaDex@Home network.")
+    parser.add_argument("--bundle", type=parse_bundle_mode, metavar="volume|N|all",
+                        help="Merge chapters into one PDF per volume, per N chapters, or one for all, "
+                             "with a bookmark per chapter.")
+    parser.add_argument("--page-window", type=int, default=PAGE_MEMORY_WINDOW,
+                        help=f"Maximum pages held in memory across chapters in flight (default: {PAGE_MEMORY_WINDOW})")
+    parser.add_argument("--batch", type=str, metavar="FILE",
+                        help="Process every series listed in a YAML/JSON library file in one run.")
+    parser.add_argument("--series-workers", type=int, default=SERIES_WORKERS,
+                        help=f"Series processed at the same time in --batch mode (default: {SERIES_WORKERS})")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running and download new chapters of --manga or the --batch series as they appear "
+                             "(--chapters first catches up on that selection).")
+    parser.add_argument("--watch-interval", type=int, default=WATCH_INTERVAL, metavar="SECONDS",
+                        help=f"Seconds between checks for new chapters in --watch mode (default: {WATCH_INTERVAL})")
+    parser.add_argument("--sync", action="store_true",
+                        help="Only download chapters that are new or updated since the last --sync run of this manga.")
+    parser.add_argument("--cache-dir", type=str, default=CACHE_DIR,
+                        help=f"Directory for the API metadata cache (default: {CACHE_DIR})")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the API metadata cache.")
+    parser.add_argument("--page-store", nargs="?", const="", metavar="DIR",
+                        help="Keep downloaded pages in a deduplicated store and reuse them "
+                             "(default DIR: 'pages' under --cache-dir)")
+    parser.add_argument("--no-title-index", action="store_true",
+                        help="Always search titles via the API instead of the local title index.")
+    parser.add_argument("--fuzzy-title-index", action="store_true",
+                        help=f"Also resolve titles from the title index by fuzzy match (score {TITLE_INDEX_MIN_SCORE}+) "
+                             "instead of only exact ones; close titles such as sequels can resolve to the wrong series")
+    parser.add_argument("--index-list", action="append", metavar="LIST_ID",
+                        help="Add every manga of a public MangaDex list to the title index (repeatable).")
+    parser.add_argument("--offline", action="store_true",
+                        help="Use only the metadata cache and page store, without network access.")
+    parser.add_argument("--report", metavar="FILE",
+                        help="Write a JSON report of per-stage timings, bytes, retries and errors when the run ends.")
+    parser.add_argument("--prometheus", metavar="FILE",
+                        help="Write the same metrics as a Prometheus text file (node_exporter textfile collector).")
+    parser.add_argument("--quiet", action="store_true", help="Do not show progress bars (for cron and logs).")
+    parser.add_argument("--engine", choices=["threads", "async"], default="threads",
+                        help="Download engine: 'threads' (requests) or 'async' (aiohttp event loop)")
+    parser.add_argument("--max-threads", type=int,
+                        help=f"Concurrent page downloads across all chapters (default: {MAX_THREADS}; "
+                             f"{ASYNC_MAX_REQUESTS} with --engine async)")
+    parser.add_argument("--per-host-threads", type=int,
+                        help=f"Concurrent page downloads per image server (default: {MAX_THREADS_PER_HOST}; "
+                             f"{ASYNC_MAX_REQUESTS_PER_HOST} with --engine async)")
+    parser.add_argument("--image-rate-limit", type=float, metavar="N",
+                        help="Requests/second per image server (default: unlimited; "
+                             "servers are only waited on when they answer 429 or Retry-After)")
+    parser.add_argument("--resolve-workers", type=int, default=RESOLVE_WORKERS,
+                        help=f"Threads resolving image servers (default: {RESOLVE_WORKERS})")
+    parser.add_argument("--fetch-workers", type=int, default=FETCH_WORKERS,
+                        help=f"Chapters downloading pages at the same time (default: {FETCH_WORKERS})")
+    parser.add_argument("--pdf-workers", type=int, default=PDF_WORKERS,
+                        help=f"Processes building PDFs; 0 builds them in the main process (default: {PDF_WORKERS})")
+    parser.add_argument("--queue-size", type=int, default=PIPELINE_QUEUE_SIZE,
+                        help=f"Chapters buffered between pipeline stages (default: {PIPELINE_QUEUE_SIZE})")
 
     args = parser.parse_args()
+    if args.bundle and args.sync:
+        parser.error("--bundle cannot be combined with --sync")
+    if args.bundle and args.format != "pdf":
+        parser.error("--bundle only writes PDF files")
+    if args.bundle and args.quality == "preview":
+        parser.error("--bundle cannot be combined with --quality preview")
+    if args.offline and args.no_cache:
+        parser.error("--offline needs the metadata cache")
+    if args.watch and not (args.manga or args.batch):
+        parser.error("--watch needs --manga or --batch")
+    if args.watch and (args.bundle or args.offline):
+        parser.error("--watch cannot be combined with --bundle or --offline")
+    if args.index_list and (args.no_cache or args.no_title_index):
+        parser.error("--index-list needs the title index (no --no-cache or --no-title-index)")
+    if args.fuzzy_title_index and (args.no_cache or args.no_title_index):
+        parser.error("--fuzzy-title-index needs the title index (no --no-cache or --no-title-index)")
+    if args.max_threads is None:
+        args.max_threads = ASYNC_MAX_REQUESTS if args.engine == "async" else MAX_THREADS
+    if args.per_host_threads is None:
+        args.per_host_threads = ASYNC_MAX_REQUESTS_PER_HOST if args.engine == "async" else MAX_THREADS_PER_HOST
 
     try:
         os.makedirs(args.dir, exist_ok=True)
@@ -609,15 +4172,94 @@ def main():
          sys.exit(1)
     base_download_dir = args.dir
 
-    session = requests.Session()
+    global metadata_cache, page_store, title_index, offline, quiet, selected_strings, at_home_reporter, IMAGE_RATE_LIMIT
+    quiet = args.quiet
+    if args.image_rate_limit:
+        IMAGE_RATE_LIMIT = args.image_rate_limit
+    if args.at_home_report:
+        at_home_reporter = AtHomeReporter(AT_HOME_REPORT_URL)
+    if not args.no_cache:
+        try:
+            metadata_cache = MetadataCache(os.path.join(args.cache_dir, "metadata.sqlite3"))
+        except (OSError, sqlite3.Error) as e:
+            print(f"Metadata cache disabled ({args.cache_dir}): {e}")
+        if not args.no_title_index:
+            try:
+                title_index = TitleIndex(os.path.join(args.cache_dir, "titles.sqlite3"),
+                                         min_score=TITLE_INDEX_MIN_SCORE if args.fuzzy_title_index else None)
+            except (OSError, sqlite3.Error) as e:
+                print(f"Title index disabled ({args.cache_dir}): {e}")
+    offline = args.offline
+    if args.page_store is not None or offline:
+        page_store_dir = args.page_store or os.path.join(args.cache_dir, "pages")
+        try:
+            page_store = PageStore(page_store_dir)
+        except (OSError, sqlite3.Error) as e:
+            print(f"Page store disabled ({page_store_dir}): {e}")
+
+    if args.engine == "async":
+        if import_async_engine() is None:
+            print("The async engine requires aiohttp: pip install aiohttp")
+            sys.exit(1)
+        session = AsyncSession(max_connections=max(args.max_threads, 10))
+        scheduler_class = AsyncImageScheduler
+    else:
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=max(args.max_threads, 10))
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        scheduler_class = ImageScheduler
     session.headers.update({'User-Agent': 'Python-MangaDex-Downloader/1.3-pdf-auto'})
+    scheduler = scheduler_class(session, max_workers=args.max_threads, per_host_limit=args.per_host_threads)
+
+    if args.index_list and title_index is not None:
+        selected_strings = STRINGS.get(args.lang, selected_strings)
+        for list_id in args.index_list:
+            try:
+                print(selected_strings["title_index_list"].format(list_id, index_manga_list(list_id, session)))
+            except (requests.RequestException, ValueError) as e:
+                print(f"Error indexing list '{list_id}': {e}")
+        if not args.manga and not args.batch:
+            shutdown_run(session, scheduler)
+            write_run_reports(args)
+            return
+
+    if args.watch:
+        entries = [{"title": args.manga}]
+        if args.batch:
+            try:
+                entries = load_batch_manifest(args.batch)
+            except (OSError, ValueError) as e:
+                print(f"Error reading batch file '{args.batch}': {e}")
+                sys.exit(1)
+        selected_strings = STRINGS.get(args.lang, STRINGS["en"])
+        run_watch(session, scheduler, args, entries)
+        shutdown_run(session, scheduler)
+        write_run_reports(args)
+        print(selected_strings["program_finished_message"])
+        return
+
+    if args.batch:
+        try:
+            entries = load_batch_manifest(args.batch)
+        except (OSError, ValueError) as e:
+            print(f"Error reading batch file '{args.batch}': {e}")
+            sys.exit(1)
+        if args.lang in STRINGS:
+            selected_strings = STRINGS[args.lang]
+        else:
+            selected_strings = STRINGS["en"]
+        run_batch(session, scheduler, args, entries)
+        shutdown_run(session, scheduler)
+        write_run_reports(args)
+        print(selected_strings["program_finished_message"])
+        return
 
     language_code = None
     if args.lang:
         valid_codes = [code for _, code in LANGUAGE_CHOICES]
         if args.lang in valid_codes:
             language_code = args.lang
-            global selected_strings
             selected_strings = STRINGS.get(language_code, STRINGS["en"])
             language_name = next((item[0] for item in LANGUAGE_CHOICES if item[1] == language_code), language_code)
             print(selected_strings["selected_language"].format(language_name))
@@ -629,6 +4271,8 @@ def main():
 
     cli_mode = bool(args.manga)
     run_once_cli = False
+    if not cli_mode:
+        import inquirer
 
     while True: # Outer loop allows searching again
         title = None
@@ -655,201 +4299,67 @@ def main():
             if cli_mode: break
             else: continue
 
+        if cli_mode:
+            download_summary = download_series_unattended(session, scheduler, args, manga_id, manga_title_sanitized,
+                                                          language_code, args.chapters, args.sync, show_list=True)
+            if download_summary is not None:
+                print_download_summary(download_summary, args.format)
+            break
+
         chapters = get_chapters(manga_id, language_code, session)
         if not chapters:
             lang_name = dict(LANGUAGE_CHOICES).get(language_code, language_code)
             print(selected_strings["no_chapters_available"].format(lang_name))
-            if cli_mode: break
-            else: continue
+            continue
 
-        print(selected_strings["available_chapters"])
-        limit_display = 20
-        if len(chapters) > limit_display:
-             for i in range(limit_display // 2): print(selected_strings["chapter_prefix"].format(chapters[i]['display']))
-             print(f"    ... ({len(chapters) - limit_display} more chapters) ...")
-             for i in range(len(chapters) - (limit_display // 2), len(chapters)): print(selected_strings["chapter_prefix"].format(chapters[i]['display']))
-        else:
-             for chap in chapters: print(selected_strings["chapter_prefix"].format(chap['display']))
-
-        choice = None
-        if cli_mode and args.chapters:
-             choice = args.chapters.strip()
-             args.chapters = None
-        elif not cli_mode:
-            questions_range = [inquirer.Text('chapters_range', message=selected_strings["chapters_range_prompt"])]
-            try:
-                 range_answer = inquirer.prompt(questions_range)
-                 if not range_answer: raise KeyboardInterrupt
-                 choice = range_answer.get('chapters_range', '').strip()
-            except KeyboardInterrupt:
-                  print(f"\n{selected_strings['exiting_message']}")
-                  break
+        chapters = select_uploads(chapters, args)
+        print_chapter_list(chapters)
+
+        questions_range = [inquirer.Text('chapters_range', message=selected_strings["chapters_range_prompt"])]
+        try:
+             range_answer = inquirer.prompt(questions_range)
+             if not range_answer: raise KeyboardInterrupt
+             choice = range_answer.get('chapters_range', '').strip()
+        except KeyboardInterrupt:
+              print(f"\n{selected_strings['exiting_message']}")
+              break
 
         if not choice:
             print(selected_strings["chapter_selection_empty_error"])
-            if cli_mode: break
-            else: continue
+            continue
 
         chapters_to_download = parse_chapter_selection(chapters, choice)
         if not chapters_to_download:
             print(selected_strings["no_chapters_selected"])
-            if cli_mode: break
-            else: continue
+            continue
 
         manga_download_dir = os.path.join(base_download_dir, manga_title_sanitized)
-        try:
-            os.makedirs(manga_download_dir, exist_ok=True)
-        except OSError as e:
-             print(f"Error creating manga directory '{manga_download_dir}': {e}")
-             if cli_mode: break
-             else: continue
-
-        print(f"\n⚠️ Notice: MAX_THREADS={MAX_THREADS}, Delay={CHAPTER_DOWNLOAD_DELAY}s.")
-
-        total_chapters_to_download = len(chapters_to_download)
-        # --- Updated Summary Dictionary ---
-        download_summary = {"pdf_created": 0, "pdf_failed": 0, "skipped": 0}
-
-        with tqdm(total=total_chapters_to_download, desc=selected_strings["overall_download_progress"],
-                  unit=selected_strings["overall_download_unit"], leave=True) as overall_pbar:
-            for i, chap in enumerate(chapters_to_download):
-                pdf_created_successfully = False
-                image_paths = []
-                chapter_dir_path = None
-                try:
-                     print(selected_strings["downloading_images_chapter"].format(chap['display']))
-                     image_paths, chapter_dir_path = download_chapter_images(chap["id"], manga_download_dir, chap["display"], session)
-
-                     if chapter_dir_path:
-                         if image_paths: # Images were downloaded/found successfully
-                              # Don't print image success, only PDF status if applicable
-                              # print(selected_strings["download_successful"].format(chap['display'], chapter_dir_path))
-
-                              # --- START Automatic PDF Creation Logic ---
-                              safe_chapter_display_pdf = "".join(c for c in chap['display'] if c.isalnum() or c in (' ', '_', '.', '-')).rstrip().replace(' ', '_')
-                              if not safe_chapter_display_pdf: safe_chapter_display_pdf = f"id_{chap['id']}"
-                              pdf_filename = os.path.join(manga_download_dir, f"Capitulo_{safe_chapter_display_pdf}.pdf")
-
-                              try:
-                                  print(selected_strings["creating_pdf"].format(chap['display']))
-                                  pdf = FPDF(unit="pt")
-
-                                  for image_path in image_paths:
-                                      try:
-                                          with Image.open(image_path) as img:
-                                              width_px, height_px = img.size
-                                              if width_px <= 0 or height_px <= 0:
-                                                  print(f"⚠️ Skipping invalid image (zero dimension): {os.path.basename(image_path)}")
-                                                  continue
-                                              img_dpi = img.info.get('dpi', (ASSUMED_DPI, ASSUMED_DPI))
-                                              if not isinstance(img_dpi, (tuple, list)) or len(img_dpi) < 2: img_dpi = (ASSUMED_DPI, ASSUMED_DPI)
-                                              dpi_x = img_dpi[0] if img_dpi[0] > 0 else ASSUMED_DPI
-                                              dpi_y = img_dpi[1] if img_dpi[1] > 0 else ASSUMED_DPI
-                                              width_pt = width_px * 72.0 / dpi_x
-                                              height_pt = height_px * 72.0 / dpi_y
-
-                                              orientation = 'L' if width_pt > height_pt else 'P'
-                                              pdf.add_page(orientation=orientation)
-                                              page_w_pt = pdf.w
-                                              page_h_pt = pdf.h
-
-                                              scale = 1
-                                              if width_pt > 0 and height_pt > 0:
-                                                  scale = min(page_w_pt / width_pt, page_h_pt / height_pt)
-                                              img_w_pt = width_pt * scale
-                                              img_h_pt = height_pt * scale
-
-                                              x_pos = (page_w_pt - img_w_pt) / 2
-                                              y_pos = (page_h_pt - img_h_pt) / 2
-
-                                              pdf.image(image_path, x=x_pos, y=y_pos, w=img_w_pt, h=img_h_pt)
-                                      except Exception as img_err:
-                                          print(f"⚠️ Error processing image {os.path.basename(image_path)} for PDF: {img_err}")
-
-                                  pdf.output(pdf_filename)
-                                  print(selected_strings["pdf_creation_success"].format(os.path.basename(pdf_filename)))
-                                  download_summary["pdf_created"] += 1 # Increment PDF created count
-                                  pdf_created_successfully = True
-
-                              except Exception as pdf_err:
-                                  print(selected_strings["pdf_creation_error"].format(chap['display'], pdf_err))
-                                  download_summary["pdf_failed"] += 1 # Increment PDF failed count
-                                  if os.path.exists(pdf_filename):
-                                      try: os.remove(pdf_filename)
-                                      except OSError: pass
-                              # --- END Automatic PDF Creation Logic ---
-
-                         else: # No images downloaded/found for this chapter
-                              print(selected_strings["no_images_downloaded"].format(chap['display']))
-                              download_summary["skipped"] += 1 # Increment skipped count
-                              # Attempt to remove empty dir if created
-                              try:
-                                   if chapter_dir_path and os.path.exists(chapter_dir_path) and not os.listdir(chapter_dir_path):
-                                        os.rmdir(chapter_dir_path)
-                                        print(selected_strings["empty_dir_removed"].format(os.path.basename(chapter_dir_path)))
-                              except OSError: pass
-                     else: # Failed before creating directory (e.g., server API error)
-                          print(selected_strings["process_chapter_failed"].format(chap['display']))
-                          download_summary["skipped"] += 1 # Increment skipped count
-
-                     # --- START Automatic Image Deletion Logic ---
-                     if pdf_created_successfully:
-                         print(selected_strings["deleting_images"].format(chap['display']))
-                         try:
-                             for img_path in image_paths:
-                                 try:
-                                     if os.path.exists(img_path):
-                                         os.remove(img_path)
-                                 except OSError as e:
-                                     print(selected_strings["delete_img_error"].format(os.path.basename(img_path), e))
-                             try:
-                                 if chapter_dir_path and os.path.exists(chapter_dir_path):
-                                     os.rmdir(chapter_dir_path)
-                             except OSError as e:
-                                 print(selected_strings["delete_dir_error"].format(os.path.basename(chapter_dir_path), e))
-                         except Exception as del_err:
-                             print(f"⚠️ Unexpected error during image/folder deletion for chapter {chap['display']}: {del_err}")
-                     # --- END Automatic Image Deletion Logic ---
-
-                except Exception as chap_err:
-                     print(f"Unexpected error processing chapter {chap.get('display', 'N/A')}: {chap_err}")
-                     download_summary["skipped"] += 1 # Increment skipped count for unexpected errors too
-                     traceback.print_exc()
-
-                finally:
-                     overall_pbar.update(1)
-                     if i < len(chapters_to_download) - 1:
-                         time.sleep(CHAPTER_DOWNLOAD_DELAY)
-
-        # --- Print Updated Summary ---
-        print(selected_strings["download_summary_title"])
-        print(selected_strings["summary_pdf_created"].format(download_summary['pdf_created']))
-        print(selected_strings["summary_pdf_failed"].format(download_summary['pdf_failed']))
-        print(selected_strings["summary_skipped"].format(download_summary['skipped'])) # Use new key
-        print(selected_strings["summary_footer"])
+        download_summary = run_series_pipeline(session, scheduler, args, manga_download_dir, chapters_to_download)
+        if download_summary is None:
+            continue
+        print_download_summary(download_summary, args.format)
 
         # --- Ask to Continue ---
-        if not cli_mode:
-            questions_again = [
-                inquirer.List('continue_option',
-                              message=selected_strings["continue_prompt"],
-                              choices=[
-                                  (selected_strings["search_again_option"], 'search_again'),
-                                  (selected_strings["exit_option"], 'exit')
-                              ],
-                              carousel=True),
-            ]
-            try:
-                continue_answer = inquirer.prompt(questions_again)
-                if not continue_answer or continue_answer['continue_option'] == 'exit':
-                    print(selected_strings["exiting_message"])
-                    break
-            except KeyboardInterrupt:
-                 print(f"\n{selected_strings['exiting_message']}")
-                 break
-        else:
-            break
+        questions_again = [
+            inquirer.List('continue_option',
+                          message=selected_strings["continue_prompt"],
+                          choices=[
+                              (selected_strings["search_again_option"], 'search_again'),
+                              (selected_strings["exit_option"], 'exit')
+                          ],
+                          carousel=True),
+        ]
+        try:
+            continue_answer = inquirer.prompt(questions_again)
+            if not continue_answer or continue_answer['continue_option'] == 'exit':
+                print(selected_strings["exiting_message"])
+                break
+        except KeyboardInterrupt:
+             print(f"\n{selected_strings['exiting_message']}")
+             break
 
+    shutdown_run(session, scheduler)
+    write_run_reports(args)
     print(selected_strings["program_finished_message"])
 
 # --- Script Entry Point ---
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""End-to-end MDex benchmarks against a local fake MangaDex (no network access needed).
+
+Each scenario starts a FakeMangaDex, then runs MDex (search -> chapter list
+-> page downloads -> output files) in a child process so its CPU time and
+peak memory are measured on their own. Reports pages/s, MB/s, p50/p99
+per-page download latency, peak RSS and CPU time.
+
+    python benchmarks/bench.py                      # every scenario
+    python benchmarks/bench.py baseline slow-link   # selected scenarios
+    python benchmarks/bench.py baseline -- --engine async --max-threads 32
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+
+SCENARIOS = {
+    "baseline": {"chapters": 20, "pages": 20, "page_kb": 300, "latency": 0.05, "bandwidth_kb": 0, "error_rate": 0.0},
+    "slow-link": {"chapters": 6, "pages": 20, "page_kb": 300, "latency": 0.15, "bandwidth_kb": 512, "error_rate": 0.0},
+    "flaky": {"chapters": 10, "pages": 20, "page_kb": 300, "latency": 0.05, "bandwidth_kb": 0, "error_rate": 0.1},
+    "small-pages": {"chapters": 40, "pages": 30, "page_kb": 60, "latency": 0.02, "bandwidth_kb": 0, "error_rate": 0.0},
+}
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an unsorted list (None when empty)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))]
+
+def peak_rss_mb(who):
+    """Peak resident set size of this process or of its largest waited-for child, in MB."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(who).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KB elsewhere
+
+# --- Child: one measured MDex run ---
+def run_child(spec_path, result_path):
+    with open(spec_path, encoding="utf-8") as f:
+        spec = json.load(f)
+    sys.path.insert(0, REPO_DIR)
+    import MDex
+
+    MDex.API_BASE = spec["api"]
+    if spec["no_rate_limit"]:
+        MDex.API_RATE_LIMIT = MDex.AT_HOME_RATE_LIMIT = MDex.IMAGE_RATE_LIMIT = 1e6
+        MDex.API_BURST = MDex.AT_HOME_BURST = MDex.IMAGE_BURST = 10 ** 6
+
+    latencies = []
+    received = [0]
+
+    def record(started, result, img_path):
+        if result in (None, False):
+            return
+        latencies.append(time.perf_counter() - started)
+        received[0] += len(result) if isinstance(result, bytes) else os.path.getsize(img_path)
+
+    download_image = MDex.download_image
+    download_image_async = MDex.download_image_async
+
+    def timed_download_image(img_url, img_path, session):
+        started = time.perf_counter()
+        result = download_image(img_url, img_path, session)
+        record(started, result, img_path)
+        return result
+
+    async def timed_download_image_async(img_url, img_path, session):
+        started = time.perf_counter()
+        result = await download_image_async(img_url, img_path, session)
+        record(started, result, img_path)
+        return result
+
+    MDex.download_image = timed_download_image
+    MDex.download_image_async = timed_download_image_async
+
+    sys.argv = ["MDex.py", "-m", spec["title"], "-l", "en", "-c", "all", "-d", spec["output_dir"],
+                "--no-cache"] + spec["mdex_args"]
+    cpu_before = os.times()
+    started = time.perf_counter()
+    MDex.main()
+    wall = time.perf_counter() - started
+    cpu_after = os.times()
+
+    rss = [peak_rss_mb(resource.RUSAGE_SELF), peak_rss_mb(resource.RUSAGE_CHILDREN)] if resource else [None]
+    result = {
+        "wall_seconds": wall,
+        "cpu_seconds": sum(cpu_after[:4]) - sum(cpu_before[:4]),  # user + system, including worker processes
+        "pages": len(latencies),
+        "bytes": received[0],
+        "latency_p50": percentile(latencies, 50),
+        "latency_p99": percentile(latencies, 99),
+        "peak_rss_mb": max((r for r in rss if r is not None), default=None),
+    }
+    with open(result_path, "w", encoding="utf-8") as f:
+        json.dump(result, f)
+
+# --- Parent: scenarios and report ---
+def run_scenario(name, params, args, mdex_args):
+    from fake_mangadex import FakeMangaDex, MANGA_TITLE
+
+    fake = FakeMangaDex(chapters=params["chapters"], pages=params["pages"], page_bytes=params["page_kb"] * 1024,
+                        latency=params["latency"], bandwidth=params["bandwidth_kb"] * 1024,
+                        error_rate=params["error_rate"])
+    api = fake.start()
+    try:
+        with tempfile.TemporaryDirectory(prefix="mdex-bench-") as tmp_dir:
+            spec_path = os.path.join(tmp_dir, "spec.json")
+            result_path = os.path.join(tmp_dir, "result.json")
+            with open(spec_path, "w", encoding="utf-8") as f:
+                json.dump({"api": api, "title": MANGA_TITLE, "output_dir": os.path.join(tmp_dir, "out"),
+                           "no_rate_limit": args.no_rate_limit, "mdex_args": mdex_args}, f)
+            log = None if args.verbose else subprocess.DEVNULL
+            proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", spec_path, result_path],
+                                  stdout=log, stderr=log, cwd=tmp_dir)
+            if proc.returncode != 0 or not os.path.exists(result_path):
+                print(f"{name}: MDex run failed (exit code {proc.returncode}); rerun with --verbose for its output")
+                return None
+            with open(result_path, encoding="utf-8") as f:
+                result = json.load(f)
+    finally:
+        fake.stop()
+
+    wall = result["wall_seconds"]
+    result.update({
+        "scenario": name,
+        "params": params,
+        "mdex_args": mdex_args,
+        "pages_per_second": result["pages"] / wall if wall else None,
+        "mb_per_second": result["bytes"] / (1024 * 1024) / wall if wall else None,
+        "expected_pages": params["chapters"] * params["pages"],
+        "server": dict(fake.stats),
+    })
+    return result
+
+def format_value(value, digits=2, scale=1):
+    return "-" if value is None else f"{value * scale:.{digits}f}"
+
+def print_report(results):
+    header = ("scenario", "pages", "pages/s", "MB/s", "p50 ms", "p99 ms", "peak RSS MB", "CPU s", "wall s")
+    rows = [(r["scenario"], f"{r['pages']}/{r['expected_pages']}", format_value(r["pages_per_second"], 1),
+             format_value(r["mb_per_second"]), format_value(r["latency_p50"], 0, 1000),
+             format_value(r["latency_p99"], 0, 1000), format_value(r["peak_rss_mb"], 0),
+             format_value(r["cpu_seconds"]), format_value(r["wall_seconds"]))
+            for r in results]
+    widths = [max(len(str(row[i])) for row in [header] + rows) for i in range(len(header))]
+    for row in [header] + rows:
+        print("  ".join(str(cell).rjust(width) if i else str(cell).ljust(width)
+                        for i, (cell, width) in enumerate(zip(row, widths))))
+
+def main():
+    argv = sys.argv[1:]
+    if argv[:1] == ["--child"]:
+        run_child(argv[1], argv[2])
+        return
+    mdex_args = []
+    if "--" in argv:
+        split = argv.index("--")
+        argv, mdex_args = argv[:split], argv[split + 1:]
+
+    parser = argparse.ArgumentParser(description="Benchmark MDex end to end against a local fake MangaDex.",
+                                     epilog="Arguments after -- are passed to MDex (e.g. -- --engine async).")
+    parser.add_argument("scenarios", nargs="*", metavar="SCENARIO",
+                        help=f"Scenarios to run: {', '.join(SCENARIOS)} (default: all)")
+    parser.add_argument("--chapters", type=int, help="Override the number of chapters.")
+    parser.add_argument("--pages", type=int, help="Override the pages per chapter.")
+    parser.add_argument("--page-kb", type=int, help="Override the average page size in KB.")
+    parser.add_argument("--latency", type=float, help="Override the per-request latency in seconds.")
+    parser.add_argument("--bandwidth-kb", type=int, help="Override the per-connection bandwidth in KB/s (0: unlimited).")
+    parser.add_argument("--error-rate", type=float, help="Override the share of image requests failing with 503.")
+    parser.add_argument("--no-rate-limit", action="store_true",
+                        help="Lift MDex's client-side rate limits, to measure the download and PDF paths alone.")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per scenario (default: 1)")
+    parser.add_argument("--json", metavar="FILE", help="Also write the results to FILE, for comparing runs.")
+    parser.add_argument("--verbose", action="store_true", help="Show MDex's own output.")
+    args = parser.parse_args(argv)
+
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+    sys.path.insert(0, BENCH_DIR)
+
+    results = []
+    for name in args.scenarios or list(SCENARIOS):
+        params = dict(SCENARIOS[name])
+        for key in params:
+            if getattr(args, key) is not None:
+                params[key] = getattr(args, key)
+        for _ in range(max(1, args.repeat)):
+            result = run_scenario(name, params, args, mdex_args)
+            if result is not None:
+                results.append(result)
+                print_report([result])
+    if len(results) > 1:
+        print()
+        print_report(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""Local stand-in for the MangaDex API and a MangaDex@Home image server, for benchmarks.
+
+Serves /manga (search), /manga/{id}, /manga/{id}/feed, /chapter and
+/at-home/server/{id} for a single generated manga, and the pages under
+/data/ and /data-saver/ with configurable latency, per-connection
+bandwidth, error rate and page sizes. Range requests are supported.
+"""
+import io
+import json
+import random
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+from PIL import Image
+
+MANGA_ID = "00000000-0000-4000-8000-000000000000"
+MANGA_TITLE = "Benchmark Manga"
+WRITE_CHUNK = 16 * 1024
+
+def base_jpeg(width=1000, height=1500):
+    """A small real JPEG that pages are padded out from."""
+    img = Image.new("RGB", (width, height), (235, 235, 235))
+    buffer = io.BytesIO()
+    img.save(buffer, "JPEG", quality=80)
+    return buffer.getvalue()
+
+def padded_jpeg(base, size, tag):
+    """Pads a JPEG to size bytes with COM segments, keeping it a valid image; tag makes the bytes unique."""
+    pad = size - len(base)
+    if pad <= 4:
+        return base
+    segments = []
+    filler = (tag.encode() + b"|") * (65533 // (len(tag) + 1) + 1)
+    while pad > 4:
+        length = min(pad - 2, 65535)  # segment length counts its own two bytes, not the marker
+        segments.append(b"\xff\xfe" + length.to_bytes(2, "big") + filler[:length - 2])
+        pad -= length + 2
+    return base[:2] + b"".join(segments) + base[2:]
+
+class FakeMangaDex:
+    """Threaded HTTP server serving one manga with chapters x pages generated pages.
+
+    latency is added before every response, bandwidth (bytes/second, 0 for
+    unlimited) caps each image transfer, error_rate is the share of image
+    requests answered with a 503, and pages are page_bytes long, varied by
+    up to +/- size_spread of that.
+    """
+
+    def __init__(self, chapters=20, pages=20, page_bytes=300 * 1024, size_spread=0.5, latency=0.05,
+                 bandwidth=0, error_rate=0.0, seed=1, port=0):
+        self.chapters = chapters
+        self.pages = pages
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+        self.base_image = base_jpeg()
+        sizes = random.Random(seed)
+        self.page_sizes = [max(len(self.base_image), int(page_bytes * (1 + sizes.uniform(-size_spread, size_spread))))
+                           for _ in range(pages)]
+        self.stats = {"api_requests": 0, "image_requests": 0, "image_errors": 0, "image_bytes": 0}
+        self.stats_lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, name="fake-mangadex", daemon=True)
+        self.thread.start()
+        return self.url
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def count(self, key, amount=1):
+        with self.stats_lock:
+            self.stats[key] += amount
+
+    def fail(self):
+        if not self.error_rate:
+            return False
+        with self.random_lock:
+            return self.random.random() < self.error_rate
+
+    def chapter_items(self):
+        return [{"id": f"chapter-{n}", "type": "chapter",
+                 "attributes": {"chapter": str(n + 1), "volume": str(n // 10 + 1), "title": None,
+                                "pages": self.pages, "translatedLanguage": "en",
+                                "updatedAt": "2024-01-01T00:00:00+00:00", "publishAt": "2024-01-01T00:00:00+00:00"},
+                 "relationships": [{"id": "group-1", "type": "scanlation_group",
+                                    "attributes": {"name": "Benchmark Scans"}},
+                                   {"id": MANGA_ID, "type": "manga"}]}
+                for n in range(self.chapters)]
+
+    def page_files(self):
+        return [f"{n + 1}-page.jpg" for n in range(self.pages)]
+
+    def page_body(self, chapter_hash, filename):
+        index = int(filename.split("-", 1)[0]) - 1
+        if not 0 <= index < self.pages:
+            return None
+        return padded_jpeg(self.base_image, self.page_sizes[index], f"{chapter_hash}/{filename}")
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def send(self, status, body, content_type="application/json", headers=None, throttle=False):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                if not throttle or not fake.bandwidth:
+                    self.wfile.write(body)
+                    return
+                started = time.monotonic()
+                for offset in range(0, len(body), WRITE_CHUNK):
+                    self.wfile.write(body[offset:offset + WRITE_CHUNK])
+                    ahead = (offset + WRITE_CHUNK) / fake.bandwidth - (time.monotonic() - started)
+                    if ahead > 0:
+                        time.sleep(ahead)
+
+            def send_json(self, data):
+                fake.count("api_requests")
+                self.send(200, json.dumps(data).encode())
+
+            def do_GET(self):
+                if fake.latency:
+                    time.sleep(fake.latency)
+                url = urlsplit(self.path)
+                query = parse_qs(url.query)
+                parts = url.path.strip("/").split("/")
+                try:
+                    if parts == ["manga"]:
+                        return self.send_json({"result": "ok", "total": 1, "data": [
+                            {"id": MANGA_ID, "type": "manga",
+                             "attributes": {"title": {"en": MANGA_TITLE}, "altTitles": []}}]})
+                    if parts[0] == "manga" and len(parts) == 2:
+                        return self.send_json({"result": "ok", "data": {
+                            "id": parts[1], "type": "manga", "attributes": {"title": {"en": MANGA_TITLE}}}})
+                    if parts == ["chapter"] or (parts[0] == "manga" and parts[2:] == ["feed"]):
+                        items = fake.chapter_items()
+                        offset = int(query.get("offset", ["0"])[0])
+                        limit = int(query.get("limit", ["100"])[0])
+                        return self.send_json({"result": "ok", "data": items[offset:offset + limit],
+                                               "limit": limit, "offset": offset, "total": len(items)})
+                    if parts[:2] == ["at-home", "server"] and len(parts) == 3:
+                        files = fake.page_files()
+                        return self.send_json({"result": "ok", "baseUrl": fake.url, "chapter": {
+                            "hash": parts[2], "data": files, "dataSaver": files}})
+                    if parts[0] in ("data", "data-saver") and len(parts) == 3:
+                        return self.send_page(parts[1], parts[2])
+                except (ValueError, IndexError):
+                    pass
+                self.send(404, b'{"result": "error"}')
+
+            def send_page(self, chapter_hash, filename):
+                fake.count("image_requests")
+                if fake.fail():
+                    fake.count("image_errors")
+                    return self.send(503, b"")
+                body = fake.page_body(chapter_hash, filename)
+                if body is None:
+                    return self.send(404, b"")
+                status, headers = 200, {"Accept-Ranges": "bytes"}
+                range_header = self.headers.get("Range", "")
+                if range_header.startswith("bytes="):
+                    start = int(range_header[6:].split("-", 1)[0] or 0)
+                    if start >= len(body):
+                        return self.send(416, b"", headers={"Content-Range": f"bytes */{len(body)}"})
+                    status = 206
+                    headers["Content-Range"] = f"bytes {start}-{len(body) - 1}/{len(body)}"
+                    body = body[start:]
+                fake.count("image_bytes", len(body))
+                self.send(status, body, "image/jpeg", headers, throttle=True)
+
+        return Handler
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Serve a fake MangaDex API and image host for benchmarks.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--chapters", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--page-kb", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--bandwidth-kb", type=int, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    fake = FakeMangaDex(chapters=args.chapters, pages=args.pages, page_bytes=args.page_kb * 1024,
+                        latency=args.latency, bandwidth=args.bandwidth_kb * 1024, error_rate=args.error_rate,
+                        port=args.port)
+    print(f"Serving '{MANGA_TITLE}' on {fake.url} (Ctrl+C to stop)")
+    fake.start()
+    try:
+        fake.thread.join()
+    except KeyboardInterrupt:
+        fake.stop()
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""Startup-time benchmark for MDex: how long a scripted run takes before it does any work.
+
+Measures, in fresh interpreters, the time to import MDex (python -X
+importtime), `python MDex.py --help` and `python -m MDex --help` (which
+reuses the compiled bytecode), and checks that the modules MDex loads only
+when their stage runs (tqdm, PIL, fpdf, inquirer, ...) are not imported at
+startup. Exits with status 1 when the median import time is over --budget-ms
+or a lazy module is imported eagerly, so it can guard against regressions.
+
+    python benchmarks/startup.py
+    python benchmarks/startup.py --runs 20 --budget-ms 300 --json startup.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+
+LAZY_MODULES = ("tqdm", "PIL", "fpdf", "inquirer", "fuzzywuzzy", "rapidfuzz", "numpy", "yaml", "asyncio", "aiohttp")
+
+def run(args, env=None):
+    """Runs python with args in the repo directory; returns (seconds, completed process)."""
+    started = time.perf_counter()
+    proc = subprocess.run([sys.executable] + args, cwd=REPO_DIR, env=env, capture_output=True, text=True)
+    return time.perf_counter() - started, proc
+
+def import_time_ms():
+    """Cumulative import time of MDex in microseconds from -X importtime, converted to ms."""
+    _, proc = run(["-X", "importtime", "-c", "import MDex"])
+    for line in proc.stderr.splitlines():
+        fields = [field.strip() for field in line.split("|")]
+        if len(fields) == 3 and fields[2] == "MDex":
+            return int(fields[1]) / 1000
+    raise RuntimeError(f"could not import MDex:\n{proc.stderr}")
+
+def eager_modules():
+    """The LAZY_MODULES that importing MDex loads."""
+    code = f"import sys, MDex; print(' '.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    _, proc = run(["-c", code])
+    if proc.returncode != 0:
+        raise RuntimeError(f"could not import MDex:\n{proc.stderr}")
+    return proc.stdout.split()
+
+def median(values):
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    return ordered[middle] if len(ordered) % 2 else (ordered[middle - 1] + ordered[middle]) / 2
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure MDex's startup time.")
+    parser.add_argument("--runs", type=int, default=10, help="Fresh interpreters per measurement (default: 10)")
+    parser.add_argument("--budget-ms", type=float, default=400,
+                        help="Fail when the median MDex import time is over this (default: 400)")
+    parser.add_argument("--json", metavar="FILE", help="Also write the results to FILE, for comparing runs.")
+    args = parser.parse_args()
+    runs = max(1, args.runs)
+
+    bytecode_env = dict(os.environ)
+    bytecode_env.pop("PYTHONDONTWRITEBYTECODE", None)
+    run(["-m", "MDex", "--help"], env=bytecode_env)  # writes __pycache__ for the -m measurement
+
+    results = {
+        "import_ms": median([import_time_ms() for _ in range(runs)]),
+        "script_help_ms": median([run(["MDex.py", "--help"])[0] * 1000 for _ in range(runs)]),
+        "module_help_ms": median([run(["-m", "MDex", "--help"], env=bytecode_env)[0] * 1000 for _ in range(runs)]),
+        "eager_modules": eager_modules(),
+        "budget_ms": args.budget_ms,
+    }
+    print(f"import MDex:              {results['import_ms']:.0f} ms (median of {runs})")
+    print(f"python MDex.py --help:    {results['script_help_ms']:.0f} ms")
+    print(f"python -m MDex --help:    {results['module_help_ms']:.0f} ms")
+    print(f"lazy modules at startup:  {', '.join(results['eager_modules']) or 'none'}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=1)
+
+    failures = []
+    if results["import_ms"] > args.budget_ms:
+        failures.append(f"import time {results['import_ms']:.0f} ms is over the {args.budget_ms:.0f} ms budget")
+    if results["eager_modules"]:
+        failures.append(f"imported at startup: {', '.join(results['eager_modules'])}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+class FakeClock:
+    """Stands in for time.monotonic/time.time so tests control the passing of time."""
+
+    def __init__(self, start=1000.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+@pytest.fixture
+def clock(monkeypatch):
+    import MDex
+    fake = FakeClock()
+    monkeypatch.setattr(MDex.time, "monotonic", fake)
+    monkeypatch.setattr(MDex.time, "time", fake)
+    return fake
@@ -0,0 +1,123 @@
+import random
+
+import pytest
+
+import MDex
+
+def legacy_parse_chapter_selection(chapters, selection_string):
+    """The linear parse_chapter_selection the index replaced (without its messages), as the reference."""
+    if selection_string.lower() in ('all', 'todos'):
+        return chapters
+    selected, potential_inputs, processed_ids = [], set(), set()
+    for part in selection_string.split():
+        if '-' in part and part.count('-') == 1:
+            try:
+                start_str, end_str = part.split('-', 1)
+                if not (start_str.strip() and end_str.strip()):
+                    continue
+                start, end = float(start_str), float(end_str)
+            except ValueError:
+                continue
+            if start < 0 or end < 0 or start > end:
+                continue
+            for chap in chapters:
+                try:
+                    in_range = chap.get('number') is not None and start <= float(chap['number']) <= end
+                except (ValueError, TypeError):
+                    in_range = False
+                if in_range and chap['id'] not in processed_ids:
+                    selected.append(chap)
+                    processed_ids.add(chap['id'])
+        else:
+            potential_inputs.add(part)
+    for chap in chapters:
+        if (chap.get('number') in potential_inputs or chap.get('display') in potential_inputs) \
+                and chap['id'] not in processed_ids:
+            selected.append(chap)
+            processed_ids.add(chap['id'])
+    selected.sort(key=MDex.sort_key)
+    return selected
+
+def chapter(chap_id, number, volume=None, publish="2024-01-01T00:00:00+00:00", display=None):
+    return {"id": chap_id, "number": number, "volume": volume, "publishAt": publish,
+            "display": display or (number if number is not None else "Oneshot")}
+
+def ids(chapters):
+    return [chap["id"] for chap in chapters]
+
+def random_chapters(rng, count):
+    numbers = [str(n) for n in range(1, 40)] + ["2.5", "10.5", "007", "3.0", "Extra"]
+    chapters = []
+    for pos in range(count):
+        number = rng.choice(numbers + [None])
+        chapters.append(chapter(f"c{pos}", number, volume=str(rng.randint(1, 5)),
+                                display=rng.choice([None, f"Chapter {number}"])))
+    return chapters
+
+def random_selection(rng):
+    tokens = [str(rng.randint(0, 45)), f"{rng.randint(0, 20)}-{rng.randint(0, 45)}", f"{rng.uniform(0, 20):.1f}-{rng.uniform(0, 45):.1f}",
+              "2.5", "007", "7", "3.0", "Extra", "Oneshot", f"Chapter {rng.randint(1, 40)}", "5-2", "a-b", "-3", "3-",
+              "1-2-3", "abc", "-1-5"]
+    return " ".join(rng.choice(tokens) for _ in range(rng.randint(1, 5)))
+
+def test_selection_matches_the_linear_implementation(capsys):
+    rng = random.Random(22)
+    for _ in range(300):
+        chapters = random_chapters(rng, rng.randint(0, 60))
+        for _ in range(5):
+            selection = random_selection(rng)
+            expected = ids(legacy_parse_chapter_selection(chapters, selection))
+            assert ids(MDex.parse_chapter_selection(chapters, selection)) == expected, selection
+            assert ids(MDex.parse_chapter_selection(MDex.ChapterList(chapters), selection)) == expected, selection
+
+def test_range_selection_matches_the_linear_scan():
+    rng = random.Random(7)
+    chapters = random_chapters(rng, 500)
+    index = MDex.ChapterIndex(chapters)
+    for _ in range(200):
+        start = rng.uniform(0, 40)
+        end = start + rng.uniform(0, 20)
+        linear = [chap["id"] for chap in chapters if MDex.numeric_key(chap["number"]) is not None
+                  and start <= float(chap["number"]) <= end]
+        assert sorted(r.chap["id"] for r in index.number_range(start, end)) == sorted(linear)
+
+def test_all_returns_every_chapter():
+    chapters = [chapter("a", "1"), chapter("b", None)]
+    assert MDex.parse_chapter_selection(chapters, "TODOS") is chapters
+
+def test_chapter_list_keeps_its_index():
+    chapters = MDex.ChapterList([chapter("a", "1"), chapter("b", "2")])
+    assert chapters.index is chapters.index
+    assert ids(MDex.parse_chapter_selection(chapters, "2")) == ["b"]
+
+CHAPTERS = [
+    chapter("c1", "1", "1", "2024-01-01T00:00:00+00:00"),
+    chapter("c2", "2", "1", "2024-02-01T00:00:00+00:00"),
+    chapter("c3", "3", "2", "2024-03-01T00:00:00+00:00"),
+    chapter("c4", "4", None, "2024-04-01T12:00:00+00:00"),
+    chapter("c5", "5", "10", "2024-05-01T00:00:00+00:00"),
+    chapter("os", None, None, "2024-06-01T00:00:00+00:00"),
+]
+
+@pytest.mark.parametrize("selection, expected", [
+    ("latest:2", ["c4", "c5"]),
+    ("ultimos:1", ["c5"]),
+    ("latest:0", []),
+    ("latest:99", ["c1", "c2", "c3", "c4", "c5"]),
+    ("since:2024-04-01", ["c4", "c5", "os"]),
+    ("desde:2024-04-01T13:00:00", ["c5", "os"]),
+    ("since:2024-04-01T12:00:00+00:00", ["c4", "c5", "os"]),
+    ("vol:1", ["c1", "c2"]),
+    ("vol:2-10", ["c3", "c5"]),
+    ("volume:none", ["c4", "os"]),
+    ("VOL:nenhum", ["c4", "os"]),
+    ("vol:1 latest:1 1", ["c1", "c2", "c5"]),
+    ("vol:3", []),
+])
+def test_selectors(selection, expected):
+    assert ids(MDex.parse_chapter_selection(CHAPTERS, selection)) == expected
+
+@pytest.mark.parametrize("selection", ["latest:x", "latest:-1", "since:yesterday", "vol:2-1", "vol:x"])
+def test_invalid_selectors_select_nothing(selection, capsys):
+    assert MDex.parse_chapter_selection(CHAPTERS, selection) == []
+    assert selection in capsys.readouterr().out
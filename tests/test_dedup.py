@@ -0,0 +1,109 @@
+import itertools
+import random
+
+import pytest
+
+import MDex
+
+def upload(chap_id, number, group, publish="2024-01-01", pages=10):
+    return {"id": chap_id, "number": number, "groups": [group], "group_ids": [f"id-{group.lower()}"],
+            "publishAt": publish, "pages": pages}
+
+def ids(chapters):
+    return [chap["id"] for chap in chapters]
+
+UPLOADS = [
+    upload("1a", "1", "GroupA", "2024-01-01", 20),
+    upload("1b", "1", "GroupB", "2024-02-01", 18),
+    upload("2a", "2", "GroupA", "2024-01-05", 22),
+    upload("2.5c", "2.5", "GroupC", "2024-01-06", 5),
+    upload("3b", "3", "GroupB", "2024-01-07", 19),
+    upload("3a", "3", "GroupA", "2024-01-08", 25),
+    upload("3c", "3.0", "GroupC", "2024-01-09", 12),
+]
+
+@pytest.mark.parametrize("policy, preferred, expected", [
+    ("newest", (), ["1b", "2a", "2.5c", "3c"]),
+    ("most-pages", (), ["1a", "2a", "2.5c", "3a"]),
+    ("newest", ("GroupB",), ["1b", "2a", "2.5c", "3b"]),
+    ("most-pages", ("groupb",), ["1b", "2a", "2.5c", "3b"]),
+    ("newest", ("GroupC", "GroupA"), ["1a", "2a", "2.5c", "3c"]),
+    ("newest", ("GroupA", "GroupC"), ["1a", "2a", "2.5c", "3a"]),
+    ("newest", ("id-groupb",), ["1b", "2a", "2.5c", "3b"]),
+    ("newest", ("Nobody",), ["1b", "2a", "2.5c", "3c"]),
+    ("none", ("GroupA",), ["1a", "1b", "2a", "2.5c", "3b", "3a", "3c"]),
+])
+def test_group_policy(policy, preferred, expected):
+    assert ids(MDex.dedup_chapter_stream(UPLOADS, policy, preferred)) == expected
+    assert ids(MDex.dedup_chapters(UPLOADS, policy, preferred)) == expected
+
+def test_stream_matches_the_list_dedup_for_number_ordered_input():
+    rng = random.Random(21)
+    groups = ["GroupA", "GroupB", "GroupC"]
+    for _ in range(200):
+        chapters = []
+        for number in range(1, rng.randint(1, 12)):
+            for n in range(rng.randint(1, 3)):
+                chapters.append(upload(f"{number}-{n}", str(number), rng.choice(groups),
+                                       f"2024-01-{rng.randint(1, 28):02d}", rng.randint(1, 30)))
+        preferred = tuple(rng.sample(groups, rng.randint(0, 2)))
+        for policy in ("newest", "most-pages", "none"):
+            assert ids(MDex.dedup_chapter_stream(chapters, policy, preferred)) == \
+                   ids(MDex.dedup_chapters(chapters, policy, preferred))
+
+def test_chapters_without_a_number_are_always_kept():
+    chapters = [upload("os1", None, "GroupA"), upload("1a", "1", "GroupA"), upload("os2", None, "GroupB"),
+                upload("1b", "1", "GroupB", "2024-03-01")]
+    assert ids(MDex.dedup_chapter_stream(chapters)) == ["os1", "os2", "1b"]
+
+def test_out_of_order_upload_of_a_yielded_number_is_dropped():
+    chapters = [upload("1a", "1", "GroupA"), upload("2a", "2", "GroupA"),
+                upload("1b", "1", "GroupB", "2024-03-01")]
+    assert ids(MDex.dedup_chapter_stream(chapters)) == ["1a", "2a"]
+
+def test_stream_is_lazy():
+    def feed():
+        yield upload("1a", "1", "GroupA")
+        yield upload("1b", "1", "GroupB", "2024-03-01")
+        yield upload("2a", "2", "GroupA")
+        raise AssertionError("read past the second chapter number")
+    assert ids(itertools.islice(MDex.dedup_chapter_stream(feed()), 1)) == ["1b"]
+
+@pytest.mark.parametrize("a, b", [("5", "05"), ("5", "5.0"), ("5.5", "5.50")])
+def test_equivalent_numbers_are_the_same_chapter(a, b):
+    chapters = [upload("x", a, "GroupA"), upload("y", b, "GroupB", "2024-03-01")]
+    assert ids(MDex.dedup_chapter_stream(chapters)) == ["y"]
+
+class FeedResponse:
+    status_code = 200
+    headers = {}
+
+    def __init__(self, items):
+        self.items = items
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"result": "ok", "data": self.items, "total": len(self.items)}
+
+def feed_item(chap_id, number, volume, group, publish):
+    return {"id": chap_id, "attributes": {"chapter": number, "volume": volume, "publishAt": publish, "pages": 10},
+            "relationships": [{"id": f"id-{group.lower()}", "type": "scanlation_group", "attributes": {"name": group}}]}
+
+def test_streamed_feed_is_ordered_by_chapter_only(monkeypatch):
+    monkeypatch.setattr(MDex, "metadata_cache", None)
+    monkeypatch.setattr(MDex, "rate_limit_wait", lambda url: 0)
+    monkeypatch.setattr(MDex, "rate_limit_observe", lambda url, status_code, headers: None)
+    requested = []
+    items = [feed_item("1a", "1", "1", "GroupA", "2024-01-01"), feed_item("1b", "1", None, "GroupB", "2024-02-01"),
+             feed_item("2a", "2", "1", "GroupA", "2024-01-02")]
+
+    class Session:
+        def get(self, url, params=None, timeout=None, headers=None):
+            requested.append(params)
+            return FeedResponse(items)
+
+    total, chapters = MDex.stream_chapters("m-1", "en", Session())
+    assert ids(MDex.dedup_chapter_stream(chapters, "newest", ("GroupB",))) == ["1b", "2a"]
+    assert [key for key in requested[0] if key.startswith("order")] == ["order[chapter]"]
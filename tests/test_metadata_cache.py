@@ -0,0 +1,123 @@
+import json
+import sqlite3
+
+import pytest
+
+import MDex
+
+class FakeResponse:
+    def __init__(self, status_code, content=b"", headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    def json(self):
+        return json.loads(self.content)
+
+class FakeSession:
+    """Replays canned responses and records the conditional headers of each request."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, params=None, timeout=None, headers=None):
+        self.requests.append(dict(headers or {}))
+        return self.responses.pop(0)
+
+@pytest.fixture
+def cache(tmp_path, clock, monkeypatch):
+    metadata_cache = MDex.MetadataCache(str(tmp_path / "metadata.sqlite3"))
+    monkeypatch.setattr(MDex, "metadata_cache", metadata_cache)
+    monkeypatch.setattr(MDex, "offline", False)
+    monkeypatch.setattr(MDex, "rate_limit_wait", lambda url: 0)
+    monkeypatch.setattr(MDex, "rate_limit_observe", lambda url, status_code, headers: None)
+    yield metadata_cache
+    metadata_cache.close()
+
+URL = "https://api.mangadex.org/manga"
+
+def test_entry_is_fresh_until_its_ttl(cache, clock):
+    cache.put("k", b"body", {}, ttl=60)
+    cached, fresh, validators = cache.get("k")
+    assert cached.content == b"body" and fresh and validators == {}
+    clock.advance(61)
+    assert cache.get("k")[1] is False
+
+def test_server_max_age_shortens_the_ttl(cache, clock):
+    cache.put("k", b"body", {"Cache-Control": "public, max-age=10"}, ttl=60)
+    clock.advance(11)
+    assert cache.get("k")[1] is False
+
+def test_no_store_is_never_fresh(cache):
+    cache.put("k", b"body", {"Cache-Control": "no-store"}, ttl=60)
+    assert cache.get("k")[1] is False
+
+def test_stale_entry_keeps_its_validators(cache, clock):
+    cache.put("k", b"body", {"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}, ttl=1)
+    clock.advance(2)
+    _, fresh, validators = cache.get("k")
+    assert not fresh
+    assert validators == {"If-None-Match": '"v1"', "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"}
+
+def test_api_get_serves_fresh_entries_without_a_request(cache):
+    session = FakeSession(FakeResponse(200, b'{"n": 1}', {"ETag": '"v1"'}))
+    assert MDex.api_get(session, URL, params={"title": "x"}, cache_ttl=60).json() == {"n": 1}
+    assert MDex.api_get(session, URL, params={"title": "x"}, cache_ttl=60).json() == {"n": 1}
+    assert len(session.requests) == 1
+
+def test_api_get_revalidates_stale_entries_with_a_conditional_get(cache, clock):
+    session = FakeSession(FakeResponse(200, b'{"n": 1}', {"ETag": '"v1"'}), FakeResponse(304))
+    MDex.api_get(session, URL, cache_ttl=60)
+    clock.advance(61)
+    resp = MDex.api_get(session, URL, cache_ttl=60)
+    assert session.requests[1] == {"If-None-Match": '"v1"'}
+    assert resp.from_cache and resp.json() == {"n": 1}
+    assert cache.get(MDex.cache_key(URL))[1], "a 304 extends the entry's TTL"
+    MDex.api_get(session, URL, cache_ttl=60)
+    assert len(session.requests) == 2
+
+def test_api_get_replaces_entries_that_changed(cache, clock):
+    session = FakeSession(FakeResponse(200, b'{"n": 1}', {"ETag": '"v1"'}),
+                          FakeResponse(200, b'{"n": 2}', {"ETag": '"v2"'}))
+    MDex.api_get(session, URL, cache_ttl=60)
+    clock.advance(61)
+    assert MDex.api_get(session, URL, cache_ttl=60).json() == {"n": 2}
+    cached, fresh, validators = cache.get(MDex.cache_key(URL))
+    assert cached.json() == {"n": 2} and fresh and validators == {"If-None-Match": '"v2"'}
+
+def test_refresh_skips_the_cache(cache):
+    session = FakeSession(FakeResponse(200, b'{"n": 1}'), FakeResponse(200, b'{"n": 2}'))
+    MDex.api_get(session, URL, cache_ttl=60)
+    assert MDex.api_get(session, URL, cache_ttl=60, refresh=True).json() == {"n": 2}
+    assert session.requests[1] == {}
+
+def test_put_keeps_the_cache_under_max_bytes(tmp_path, clock):
+    cache = MDex.MetadataCache(str(tmp_path / "metadata.sqlite3"), max_bytes=1000)
+    for n in range(20):
+        clock.advance(1)
+        cache.put(f"k{n}", b"x" * 100, {}, ttl=60)
+    assert cache.total <= 1000
+    assert cache.get("k0") is None and cache.get("k19") is not None
+    cache.close()
+
+def test_entries_unused_for_max_age_are_dropped(tmp_path, clock):
+    path = str(tmp_path / "metadata.sqlite3")
+    cache = MDex.MetadataCache(path, max_age=100)
+    cache.put("k", b"body", {}, ttl=1000)
+    cache.close()
+    clock.advance(101)
+    cache = MDex.MetadataCache(path, max_age=100)
+    assert cache.get("k") is None
+    cache.close()
+
+def test_get_records_the_access_for_other_connections(tmp_path, clock):
+    path = str(tmp_path / "metadata.sqlite3")
+    cache = MDex.MetadataCache(path)
+    cache.put("k", b"body", {}, ttl=1000)
+    clock.advance(50)
+    cache.get("k")
+    reader = sqlite3.connect(path)
+    assert reader.execute("SELECT last_access FROM responses WHERE key = 'k'").fetchone()[0] == MDex.time.time()
+    reader.close()
+    cache.close()
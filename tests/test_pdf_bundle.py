@@ -0,0 +1,99 @@
+import io
+
+import pytest
+from PIL import Image, ImageChops
+
+import MDex
+
+pypdf = pytest.importorskip("pypdf")
+
+def image_bytes(fmt, width, mode="RGB", **save_args):
+    img = Image.new(mode, (width, 90))
+    img.putdata([((x * 7 + y) % 256, (x * 3) % 256, (y * 5) % 256, 255 if x % 2 else 0)[:len(mode)]
+                 if mode not in ("L", "P") else (x + y) % 256 for y in range(90) for x in range(width)])
+    buffer = io.BytesIO()
+    img.save(buffer, fmt, **save_args)
+    return buffer.getvalue()
+
+def memory_page(name, data):
+    return {"name": name, "index": 0, "data": data, "path": None}
+
+def image_widths(reader):
+    return [next(iter(page.images)).image.width for page in reader.pages]
+
+@pytest.fixture
+def english(monkeypatch):
+    monkeypatch.setattr(MDex, "selected_strings", MDex.STRINGS["en"])
+
+def write_bundle(tmp_path, chapters, title="Test Manga"):
+    """chapters: (order, display, pages) added in the given order; returns the PdfReader of the result."""
+    writer = MDex.PdfBundleWriter(str(tmp_path / "bundle.pdf.part"), title)
+    for order, display, pages in chapters:
+        writer.add_chapter(order, display, pages)
+    assert writer.close(str(tmp_path / "bundle.pdf")) == len([c for c in chapters if c[2]])
+    assert not (tmp_path / "bundle.pdf.part").exists()
+    return pypdf.PdfReader(str(tmp_path / "bundle.pdf"), strict=True)
+
+def test_pages_and_bookmarks_follow_chapter_order(tmp_path, english):
+    reader = write_bundle(tmp_path, [
+        (2, "3", [memory_page("001.jpg", image_bytes("JPEG", 31))]),
+        (0, "1", [memory_page("001.jpg", image_bytes("JPEG", 11)), memory_page("002.jpg", image_bytes("JPEG", 12))]),
+        (1, "2", [memory_page("001.png", image_bytes("PNG", 21))]),
+    ])
+    assert image_widths(reader) == [11, 12, 21, 31]
+    assert [item.title for item in reader.outline] == ["Chapter 1", "Chapter 2", "Chapter 3"]
+    assert [reader.get_destination_page_number(item) for item in reader.outline] == [0, 2, 3]
+    assert reader.metadata.title == "Test Manga"
+    assert reader.metadata.producer == "MDex"
+
+def test_jpeg_pages_are_embedded_byte_for_byte(tmp_path, english):
+    baseline = image_bytes("JPEG", 40)
+    progressive = image_bytes("JPEG", 41, progressive=True)
+    gray = image_bytes("JPEG", 42, mode="L")
+    reader = write_bundle(tmp_path, [(0, "1", [memory_page("001.jpg", baseline), memory_page("002.jpg", progressive),
+                                               memory_page("003.jpg", gray)])])
+    for page, original in zip(reader.pages, (baseline, progressive, gray)):
+        xobject = page["/Resources"]["/XObject"]["/I0"].get_object()
+        assert xobject["/Filter"] == "/DCTDecode"
+        assert xobject.get_data() == original
+
+@pytest.mark.parametrize("mode", ["RGB", "L", "P"])
+def test_png_pages_keep_their_pixels(tmp_path, english, mode):
+    data = image_bytes("PNG", 50, mode=mode)
+    reader = write_bundle(tmp_path, [(0, "1", [memory_page("001.png", data)])])
+    xobject = reader.pages[0]["/Resources"]["/XObject"]["/I0"].get_object()
+    assert xobject["/Filter"] == "/FlateDecode"
+    embedded = next(iter(reader.pages[0].images)).image.convert("RGB")
+    assert ImageChops.difference(embedded, Image.open(io.BytesIO(data)).convert("RGB")).getbbox() is None
+
+def test_transparent_pages_are_flattened_onto_white(tmp_path, english):
+    data = image_bytes("PNG", 60, mode="RGBA")
+    reader = write_bundle(tmp_path, [(0, "1", [memory_page("001.png", data)])])
+    embedded = next(iter(reader.pages[0].images)).image.convert("RGB")
+    assert embedded.getpixel((0, 0)) == (255, 255, 255)  # x = 0 is fully transparent
+    assert embedded.getpixel((1, 0)) == Image.open(io.BytesIO(data)).convert("RGB").getpixel((1, 0))
+
+def test_page_sizes_match_the_orientation_of_the_image(tmp_path, english):
+    wide = image_bytes("JPEG", 300)
+    tall = io.BytesIO()
+    Image.new("RGB", (60, 300)).save(tall, "JPEG")
+    reader = write_bundle(tmp_path, [(0, "1", [memory_page("001.jpg", wide), memory_page("002.jpg", tall.getvalue())])])
+    landscape, portrait = (page.mediabox for page in reader.pages)
+    assert landscape.width > landscape.height and portrait.width < portrait.height
+
+def test_file_backed_pages(tmp_path, english):
+    path = tmp_path / "001.jpg"
+    path.write_bytes(image_bytes("JPEG", 70))
+    reader = write_bundle(tmp_path, [(0, "1", [{"name": "001.jpg", "index": 0, "data": None, "path": str(path)}])])
+    assert image_widths(reader) == [70]
+
+def test_unreadable_pages_are_skipped(tmp_path, english):
+    reader = write_bundle(tmp_path, [(0, "1", [memory_page("001.jpg", b"not an image"),
+                                               memory_page("002.jpg", image_bytes("JPEG", 80))])])
+    assert image_widths(reader) == [80]
+
+def test_bundle_without_pages_is_not_written(tmp_path, english):
+    writer = MDex.PdfBundleWriter(str(tmp_path / "bundle.pdf.part"), "Test Manga")
+    assert writer.add_chapter(0, "1", [memory_page("001.jpg", b"not an image")]) == 0
+    assert writer.close(str(tmp_path / "bundle.pdf")) == 0
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,28 @@
+import pytest
+
+import MDex
+
+class FakeBar:
+    def __init__(self):
+        self.n = 0
+
+    def update(self, n):
+        self.n += n
+
+def test_cleanup_releases_the_chapter_even_if_its_callback_raises(tmp_path, monkeypatch):
+    monkeypatch.setattr(MDex, "selected_strings", MDex.STRINGS["en"])
+    def on_chapter_done(job):
+        raise OSError("disk full")
+    pipeline = MDex.ChapterPipeline(None, None, str(tmp_path), on_chapter_done=on_chapter_done, page_window=4)
+    pipeline.summary = {"pdf_created": 0, "pdf_failed": 0, "skipped": 0}
+    pipeline.overall_pbar = FakeBar()
+    job = {"chap": {"display": "Chapter 1"}, "status": "pdf_created", "pages": [b"page"]}
+    pipeline._claim_display(job)
+    pipeline.window.reserve(4)
+    job["reserved_pages"] = 4
+    with pytest.raises(OSError):
+        pipeline._cleanup(job)
+    assert pipeline.claims.busy == set()
+    assert pipeline.overall_pbar.n == 1
+    assert job["pages"] is None and "reserved_pages" not in job
+    assert pipeline.summary["pdf_created"] == 1
@@ -0,0 +1,105 @@
+import io
+
+import pytest
+from PIL import Image
+
+import MDex
+
+def encode(fmt, size=(321, 123), mode="RGB", **save_args):
+    buffer = io.BytesIO()
+    Image.new(mode, size, 128 if mode in ("L", "P") else (200, 100, 50, 255)[:len(mode)]).save(buffer, fmt, **save_args)
+    return buffer.getvalue()
+
+def exif(**tags):
+    block = Image.Exif()
+    for name, value in tags.items():
+        block[{"x": 0x011A, "y": 0x011B, "unit": 0x0128}[name]] = value
+    return block.tobytes()
+
+def pil_info(data):
+    with Image.open(io.BytesIO(data)) as img:
+        return img.format, img.size, img.info.get("dpi")
+
+CASES = {
+    "jpeg": ("JPEG", {}),
+    "jpeg-progressive": ("JPEG", {"progressive": True}),
+    "jpeg-gray": ("JPEG", {"mode": "L"}),
+    "jpeg-dpi": ("JPEG", {"dpi": (300, 300)}),
+    "jpeg-exif": ("JPEG", {"exif": b"Exif\x00\x00" + bytes(2000)}),
+    "jpeg-exif-dpi": ("JPEG", {"exif": exif(x=300.0, y=300.0, unit=2)}),
+    "jpeg-exif-dpcm": ("JPEG", {"exif": exif(x=118.0, y=118.0, unit=3)}),
+    "jpeg-exif-short": ("JPEG", {"exif": exif(x=200, unit=2)}),
+    "jpeg-exif-no-unit": ("JPEG", {"exif": exif(x=300.0, y=300.0)}),
+    "jpeg-exif-no-resolution": ("JPEG", {"exif": exif(unit=2)}),
+    "jpeg-exif-and-jfif": ("JPEG", {"exif": exif(x=300.0, y=300.0, unit=2), "dpi": (96, 96)}),
+    "png": ("PNG", {}),
+    "png-rgba": ("PNG", {"mode": "RGBA"}),
+    "png-palette": ("PNG", {"mode": "P"}),
+    "png-dpi": ("PNG", {"dpi": (150, 150)}),
+    "webp-lossy": ("WEBP", {}),
+    "webp-lossless": ("WEBP", {"lossless": True}),
+    "webp-alpha": ("WEBP", {"mode": "RGBA"}),
+    "gif": ("GIF", {"mode": "P"}),
+}
+
+@pytest.mark.parametrize("case", CASES)
+@pytest.mark.parametrize("size", [(1, 1), (321, 123), (1200, 1800)])
+def test_probe_matches_pil(case, size):
+    fmt, save_args = CASES[case]
+    data = encode(fmt, size, **save_args)
+    info = MDex.probe_image(data)
+    pil_format, pil_size, pil_dpi = pil_info(data)
+    assert info["format"] == pil_format
+    assert info["size"] == pil_size
+    if pil_dpi is None:
+        assert info["dpi"] is None
+    else:
+        assert info["dpi"] == pytest.approx(pil_dpi, abs=0.01)
+
+def test_probe_reads_the_jpeg_frame_type():
+    assert MDex.probe_image(encode("JPEG"))["sof"] == 0xC0
+    assert MDex.probe_image(encode("JPEG", progressive=True))["sof"] == 0xC2
+    assert MDex.probe_image(encode("JPEG", mode="L"))["components"] == 1
+
+def strip_app14(data):
+    """data without its Adobe APP14 segment."""
+    i = data.index(b"\xff\xee")
+    return data[:i] + data[i + 2 + int.from_bytes(data[i + 2:i + 4], "big"):]
+
+def test_only_adobe_cmyk_jpegs_are_decoded_inverted():
+    adobe = encode("JPEG", mode="CMYK")
+    assert MDex.probe_image(adobe)["adobe"] is True
+    assert b"/Decode [1 0 1 0 1 0 1 0]" in MDex.pdf_image_xobject(adobe)[2]
+    plain = strip_app14(adobe)
+    assert MDex.probe_image(plain)["adobe"] is False
+    entries = MDex.pdf_image_xobject(plain)[2]
+    assert b"/DeviceCMYK" in entries and b"/Decode" not in entries
+
+@pytest.mark.parametrize("data", [b"", b"not an image", b"\xff\xd8\xff", b"\x89PNG\r\n\x1a\n", b"RIFF\x00\x00\x00\x00WEBP"])
+def test_probe_returns_none_for_unknown_or_truncated_data(data):
+    assert MDex.probe_image(data) is None
+
+@pytest.mark.parametrize("case", CASES)
+def test_probe_of_truncated_headers_never_raises(case):
+    fmt, save_args = CASES[case]
+    data = encode(fmt, **save_args)
+    for end in range(0, 64):
+        MDex.probe_image(data[:end])
+
+def test_probe_page_falls_back_to_the_whole_file_for_large_jpeg_metadata(tmp_path, monkeypatch):
+    monkeypatch.setattr(MDex, "PROBE_HEAD_BYTES", 256)
+    path = tmp_path / "001.jpg"
+    path.write_bytes(encode("JPEG", exif=b"Exif\x00\x00" + bytes(2000)))
+    page = {"name": "001.jpg", "index": 0, "data": None, "path": str(path)}
+    assert MDex.probe_page(page)["size"] == (321, 123)
+    assert page["info"]["format"] == "JPEG"
+
+def test_probe_page_uses_pil_for_other_formats():
+    data = encode("BMP")
+    info = MDex.probe_page({"name": "001.bmp", "index": 0, "data": data, "path": None})
+    assert (info["format"], info["size"], info["dpi"]) == pil_info(data)
+
+def test_page_size_pt_uses_dpi_or_the_assumed_dpi():
+    assert MDex.page_size_pt({"size": (600, 300), "dpi": (300, 150)}) == (144.0, 144.0)
+    assert MDex.page_size_pt({"size": (144, 72), "dpi": None}) == (144.0 * 72 / MDex.ASSUMED_DPI, 72.0 * 72 / MDex.ASSUMED_DPI)
+    assert MDex.page_size_pt({"size": (144, 72), "dpi": (0, 0)}) == MDex.page_size_pt({"size": (144, 72), "dpi": None})
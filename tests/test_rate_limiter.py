@@ -0,0 +1,84 @@
+import pytest
+
+import MDex
+
+def test_burst_is_free_then_tokens_refill_at_rate(clock):
+    limiter = MDex.RateLimiter(rate=2.0, burst=3)
+    assert [limiter.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.reserve() == pytest.approx(0.5)
+    assert limiter.reserve() == pytest.approx(1.0)
+    clock.advance(1.0)
+    assert limiter.reserve() == pytest.approx(0.5)
+
+def test_refill_is_capped_at_burst(clock):
+    limiter = MDex.RateLimiter(rate=10.0, burst=2)
+    clock.advance(60)
+    assert [limiter.reserve() for _ in range(2)] == [0.0, 0.0]
+    assert limiter.reserve() == pytest.approx(0.1)
+
+def test_observe_remaining_lowers_tokens(clock):
+    limiter = MDex.RateLimiter(rate=1.0, burst=40)
+    limiter.observe(200, {"X-RateLimit-Remaining": "1"})
+    assert limiter.reserve() == 0.0
+    assert limiter.reserve() == pytest.approx(1.0)
+
+def test_observe_remaining_never_raises_tokens(clock):
+    limiter = MDex.RateLimiter(rate=1.0, burst=1)
+    limiter.reserve()
+    limiter.observe(200, {"X-RateLimit-Remaining": "40"})
+    assert limiter.reserve() == pytest.approx(1.0)
+
+def test_observe_ignores_malformed_remaining(clock):
+    limiter = MDex.RateLimiter(rate=1.0, burst=2)
+    limiter.observe(200, {"X-RateLimit-Remaining": "lots"})
+    assert limiter.reserve() == 0.0
+
+def test_429_retry_after_blocks_every_reservation(clock):
+    limiter = MDex.RateLimiter(rate=100.0, burst=100)
+    limiter.observe(429, {"Retry-After": "7"})
+    assert limiter.reserve() == pytest.approx(7.0)
+    clock.advance(5)
+    assert limiter.reserve() == pytest.approx(2.0)
+    clock.advance(2)
+    assert limiter.reserve() == 0.0
+
+def test_retry_after_without_429_or_exhaustion_is_ignored(clock):
+    limiter = MDex.RateLimiter(rate=100.0, burst=100)
+    limiter.observe(200, {"Retry-After": "7", "X-RateLimit-Remaining": "5"})
+    assert limiter.reserve() == 0.0
+
+def test_mangadex_retry_after_timestamp_on_exhausted_bucket(clock):
+    limiter = MDex.RateLimiter(rate=100.0, burst=100)
+    limiter.observe(200, {"X-RateLimit-Remaining": "0", "X-RateLimit-Retry-After": str(clock.now + 12)})
+    assert limiter.reserve() == pytest.approx(12.0)
+
+def test_block_is_not_shortened_by_a_later_response(clock):
+    limiter = MDex.RateLimiter(rate=100.0, burst=100)
+    limiter.observe(429, {"Retry-After": "10"})
+    limiter.observe(429, {"Retry-After": "1"})
+    assert limiter.reserve() == pytest.approx(10.0)
+
+@pytest.mark.parametrize("headers, expected", [
+    ({}, None),
+    ({"Retry-After": "3"}, 3.0),
+    ({"Retry-After": "-3"}, 0.0),
+    ({"Retry-After": "soon"}, None),
+])
+def test_parse_retry_after(headers, expected):
+    assert MDex.parse_retry_after(headers) == expected
+
+def test_unlimited_limiter_only_waits_for_retry_after(clock):
+    limiter = MDex.RateLimiter(rate=None, burst=1)
+    assert [limiter.reserve() for _ in range(1000)] == [0.0] * 1000
+    limiter.observe(200, {"X-RateLimit-Remaining": "0"})
+    assert limiter.reserve() == 0.0
+    limiter.observe(429, {"Retry-After": "3"})
+    assert limiter.reserve() == pytest.approx(3.0)
+    clock.advance(3)
+    assert limiter.reserve() == 0.0
+
+def test_image_hosts_are_not_throttled_by_default(clock, monkeypatch):
+    monkeypatch.setattr(MDex, "_rate_limiters", {})
+    url = "https://node.example.org/data/hash/p1.jpg"
+    assert max(MDex.rate_limit_wait(url) for _ in range(500)) == 0.0
+    assert MDex.rate_limit_wait("https://api.mangadex.org/at-home/server/c-1") == 0.0
@@ -0,0 +1,126 @@
+import argparse
+
+import MDex
+
+def chapter(chap_id, number, updated="2024-01-01T00:00:00+00:00", group="GroupA", publish=None):
+    return {"id": chap_id, "number": number, "display": f"Chapter {number}", "updatedAt": updated,
+            "publishAt": publish or updated, "pages": 10, "groups": [group], "group_ids": []}
+
+def synced(tmp_path, chap, pdf=True):
+    """A manifest entry for chap, with its PDF written to tmp_path unless pdf is False."""
+    entry = {"number": chap["number"], "display": chap["display"], "updatedAt": chap["updatedAt"],
+             "publishAt": chap["publishAt"], "pages": chap["pages"], "groups": chap["groups"],
+             "group_ids": chap["group_ids"], "pdf": None, "size": None}
+    if pdf:
+        name = f"Capitulo_{chap['number']}.pdf"
+        (tmp_path / name).write_bytes(b"%PDF-1.4 test")
+        entry.update(pdf=name, size=len(b"%PDF-1.4 test"))
+    return entry
+
+def state_with(tmp_path, *entries):
+    state = {"manga_id": "m-1", "lang": "en", "last_sync": None, "selection": None, "chapters": {}}
+    for chap, pdf in entries:
+        state["chapters"][chap["id"]] = synced(tmp_path, chap, pdf)
+    return state
+
+def ids(chapters):
+    return [chap["id"] for chap in chapters]
+
+def test_everything_is_new_on_the_first_sync(tmp_path):
+    chapters = [chapter("c2", "2"), chapter("c1", "1")]
+    assert ids(MDex.sync_delta(chapters, state_with(tmp_path), str(tmp_path))) == ["c1", "c2"]
+
+def test_synced_chapters_are_skipped(tmp_path):
+    c1, c2 = chapter("c1", "1"), chapter("c2", "2")
+    state = state_with(tmp_path, (c1, True))
+    assert ids(MDex.sync_delta([c1, c2], state, str(tmp_path))) == ["c2"]
+
+def test_updated_chapters_are_downloaded_again(tmp_path):
+    c1 = chapter("c1", "1")
+    state = state_with(tmp_path, (c1, True))
+    updated = dict(c1, updatedAt="2024-03-01T00:00:00+00:00")
+    assert ids(MDex.sync_delta([updated], state, str(tmp_path))) == ["c1"]
+
+def test_missing_or_resized_outputs_are_downloaded_again(tmp_path):
+    c1, c2 = chapter("c1", "1"), chapter("c2", "2")
+    state = state_with(tmp_path, (c1, True), (c2, True))
+    (tmp_path / "Capitulo_1.pdf").unlink()
+    (tmp_path / "Capitulo_2.pdf").write_bytes(b"truncated")
+    assert ids(MDex.sync_delta([c1, c2], state, str(tmp_path))) == ["c1", "c2"]
+
+def test_failed_chapters_outside_the_window_are_retried(tmp_path):
+    old_ok, old_failed, new = chapter("c1", "1"), chapter("c2", "2"), chapter("c3", "3")
+    state = state_with(tmp_path, (old_ok, True), (old_failed, False))
+    delta = MDex.sync_delta([new], state, str(tmp_path))
+    assert ids(delta) == ["c2", "c3"]
+    assert delta[0]["display"] == "Chapter 2"
+
+def test_sync_state_round_trip(tmp_path):
+    state = state_with(tmp_path, (chapter("c1", "1"), True))
+    state["last_sync"] = "2024-01-02T00:00:00"
+    MDex.save_sync_state(str(tmp_path), state)
+    assert MDex.load_sync_state(str(tmp_path), "m-1", "en") == state
+    assert not list(tmp_path.glob("*.tmp"))
+
+def test_sync_state_of_another_manga_or_language_is_ignored(tmp_path):
+    MDex.save_sync_state(str(tmp_path), state_with(tmp_path, (chapter("c1", "1"), True)))
+    assert MDex.load_sync_state(str(tmp_path), "m-2", "en")["chapters"] == {}
+    assert MDex.load_sync_state(str(tmp_path), "m-1", "pt-br")["chapters"] == {}
+
+def test_unreadable_sync_state_starts_over(tmp_path):
+    (tmp_path / MDex.SYNC_STATE_FILENAME).write_text("{not json", encoding="utf-8")
+    assert MDex.load_sync_state(str(tmp_path), "m-1", "en")["chapters"] == {}
+
+def test_selection_only_takes_a_new_upload_of_a_synced_number_if_the_policy_prefers_it(tmp_path):
+    args = argparse.Namespace(include_group=None, exclude_group=None, dedup="newest", prefer_group=["GroupA"])
+    c1 = chapter("c1", "1", group="GroupA")
+    state = state_with(tmp_path, (c1, True))
+    reupload = chapter("c1-b", "1", updated="2024-03-01T00:00:00+00:00", group="GroupB")
+    assert MDex.sync_selection([reupload], state, str(tmp_path), args) == []
+    args.prefer_group = ["GroupB"]
+    assert ids(MDex.sync_selection([reupload], state, str(tmp_path), args)) == ["c1-b"]
+
+def run_sync(tmp_path, monkeypatch, choice, feed):
+    """Runs the --sync branch over feed; returns the updatedAtSince it listed with and the pipeline's kwargs."""
+    args = argparse.Namespace(dir=str(tmp_path), bundle=False, include_group=None, exclude_group=None,
+                              dedup="newest", prefer_group=None)
+    calls = {}
+    def fake_pages(manga_id, lang, session, updated_since=None):
+        calls["since"] = updated_since
+        yield len(feed), feed
+    def fake_pipeline(session, scheduler, args, manga_download_dir, chapters, **kwargs):
+        calls["pipeline"] = dict(kwargs, chapters=ids(chapters))
+    monkeypatch.setattr(MDex, "selected_strings", MDex.STRINGS["en"])
+    monkeypatch.setattr(MDex, "iter_chapter_pages", fake_pages)
+    monkeypatch.setattr(MDex, "run_series_pipeline", fake_pipeline)
+    MDex.download_series_unattended(None, None, args, "m-1", "Manga", "en", choice, sync=True)
+    return calls
+
+def save_cursor(tmp_path, selection):
+    (tmp_path / "Manga").mkdir(exist_ok=True)
+    state = state_with(tmp_path / "Manga")
+    state.update(last_sync="2024-01-02T00:00:00", selection=selection)
+    MDex.save_sync_state(str(tmp_path / "Manga"), state)
+
+def test_narrowed_sync_keeps_the_cursor_and_records_its_selection(tmp_path, monkeypatch):
+    save_cursor(tmp_path, None)
+    calls = run_sync(tmp_path, monkeypatch, "1", [chapter("c1", "1"), chapter("c2", "2")])
+    assert calls["since"] == "2024-01-02T00:00:00"
+    assert calls["pipeline"]["chapters"] == ["c1"]
+    assert calls["pipeline"]["sync_selection_string"] == "1"
+
+def test_widened_sync_lists_the_whole_feed_again(tmp_path, monkeypatch):
+    save_cursor(tmp_path, "1")
+    calls = run_sync(tmp_path, monkeypatch, "1-2", [chapter("c1", "1"), chapter("c2", "2")])
+    assert calls["since"] is None
+    assert calls["pipeline"]["chapters"] == ["c1", "c2"]
+    assert calls["pipeline"]["sync_selection_string"] == "1-2"
+    assert run_sync(tmp_path, monkeypatch, None, [])["since"] is None
+
+def test_up_to_date_sync_keeps_its_selection(tmp_path, monkeypatch):
+    save_cursor(tmp_path, "1")
+    calls = run_sync(tmp_path, monkeypatch, "1", [])
+    assert calls["since"] == "2024-01-02T00:00:00"
+    state = MDex.load_sync_state(str(tmp_path / "Manga"), "m-1", "en")
+    assert state["selection"] == "1"
+    assert state["last_sync"] > "2024-01-02T00:00:00"
@@ -0,0 +1,31 @@
+import pytest
+
+import MDex
+
+def manga(manga_id, title, *alt_titles):
+    return {"id": manga_id, "attributes": {"title": {"en": title},
+                                           "altTitles": [{"ja": alt} for alt in alt_titles]}}
+
+@pytest.fixture
+def index(tmp_path):
+    title_index = MDex.TitleIndex(str(tmp_path / "titles.sqlite3"))
+    title_index.add([manga("aot", "Attack on Titan", "Shingeki no Kyojin"), manga("op", "One Piece"),
+                     manga("x1", "Shared Title"), manga("x2", "Shared Title")])
+    yield title_index
+    title_index.close()
+
+def test_exact_titles_resolve_ignoring_case_and_spacing(index):
+    assert index.match(["attack  ON titan", "Shingeki no Kyojin", "one piece"]) == [
+        ("aot", "Attack on Titan"), ("aot", "Attack on Titan"), ("op", "One Piece")]
+
+def test_close_titles_do_not_resolve_by_default(index):
+    assert index.match(["attack on titan 2", "One Piec"]) == [None, None]
+
+def test_titles_of_several_manga_do_not_resolve(index):
+    assert index.match(["shared title"]) == [None]
+
+def test_fuzzy_matching_is_opt_in(tmp_path):
+    title_index = MDex.TitleIndex(str(tmp_path / "titles.sqlite3"), min_score=MDex.TITLE_INDEX_MIN_SCORE)
+    title_index.add([manga("op", "One Piece")])
+    assert title_index.match(["One Piec", "Naruto"]) == [("op", "One Piece"), None]
+    title_index.close()